@@ -0,0 +1,240 @@
+#!/usr/bin/env python3
+
+# Copyright 2023 ShotaAk
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# Benchmarks for the game core, the startup and the board widget rendering.
+#
+# Usage:
+#   python3 benchmarks/run_benchmarks.py --output results.json
+#   python3 benchmarks/run_benchmarks.py --baseline results.json
+#
+# Every benchmark reports the median time of one operation in seconds.
+# The run fails if a result exceeds its limit in thresholds.json,
+# or if it is slower than the baseline by more than the tolerance.
+
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import time
+
+import numpy
+from rqt_tic_tac_toe.game import Game
+from rqt_tic_tac_toe.k_in_a_row_game import KInARowGame
+from rqt_tic_tac_toe.marker import Marker
+
+GAME_BOARD_SIZES = [2, 3, 4, 5, 6, 10, 19]
+WIDGET_SIZES = [200, 400, 800]
+WIDGET_BOARD_SIZES = [3, 6, 19]
+FILL_LEVELS = [0.0, 0.5, 1.0]
+STARTUP_MODULES = ['rqt_tic_tac_toe.game', 'rqt_tic_tac_toe.bitboard_game',
+                   'rqt_tic_tac_toe.players', 'rqt_tic_tac_toe.tournament']
+
+DEFAULT_THRESHOLDS = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'thresholds.json')
+UI_FILE = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'resource', 'TicTacToeWidget.ui')
+
+
+def _measure(function, repeat: int = 5, number: int = 100) -> float:
+    # Return the median time of one call of function
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            function()
+        samples.append((time.perf_counter() - start) / number)
+    return statistics.median(samples)
+
+
+def _shuffled_cells(board_size: int, rng: random.Random) -> list:
+    cells = [(row, col) for row in range(board_size) for col in range(board_size)]
+    rng.shuffle(cells)
+    return cells
+
+
+def _filled_game(game, fill_level: float, rng: random.Random):
+    cells = _shuffled_cells(game.get_board_size(), rng)
+    for row, col in cells[:int(len(cells) * fill_level)]:
+        game.set_marker(row, col)
+    return game
+
+
+def benchmark_game(results: dict) -> None:
+    rng = random.Random(0)
+    for board_size in GAME_BOARD_SIZES:
+        cells = _shuffled_cells(board_size, rng)
+
+        def _fill():
+            game = Game(board_size=board_size, first_marker=Marker.O)
+            for row, col in cells:
+                game.set_marker(row, col)
+
+        results['game.set_marker[size={}]'.format(board_size)] = \
+            _measure(_fill, number=10) / len(cells)
+
+        game = _filled_game(Game(board_size=board_size), 0.5, rng)
+        results['game.calc_winner[size={}]'.format(board_size)] = \
+            _measure(game.calc_winner, number=1000)
+        results['game.board_is_full[size={}]'.format(board_size)] = \
+            _measure(game.board_is_full, number=1000)
+
+        def _random_game():
+            game = Game(board_size=board_size, first_marker=Marker.O)
+            for row, col in _shuffled_cells(board_size, rng):
+                if game.calc_winner()[0] != Marker.NONE:
+                    break
+                game.set_marker(row, col)
+
+        results['game.random_game[size={}]'.format(board_size)] = _measure(_random_game, number=10)
+
+    for board_size, win_length in [(15, 5), (19, 5)]:
+        def _random_k_in_a_row_game():
+            game = KInARowGame(board_size=board_size, win_length=win_length, first_marker=Marker.O)
+            for row, col in _shuffled_cells(board_size, rng):
+                if game.calc_winner()[0] != Marker.NONE:
+                    break
+                game.set_marker(row, col)
+
+        results['k_in_a_row.random_game[size={},k={}]'.format(board_size, win_length)] = \
+            _measure(_random_k_in_a_row_game, number=10)
+
+
+def _measure_import(module: str, repeat: int = 5) -> float:
+    # Return the median import time of module in a fresh interpreter, without the interpreter startup
+    def _run(code):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, '-c', code], check=True)
+        return time.perf_counter() - start
+
+    samples = [_run('import ' + module) - _run('pass') for _ in range(repeat)]
+    return max(statistics.median(samples), 0.0)
+
+
+def benchmark_startup(results: dict) -> None:
+    for module in STARTUP_MODULES:
+        results['startup.import[{}]'.format(module)] = _measure_import(module)
+
+
+def benchmark_board_widget(results: dict) -> None:
+    os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+    try:
+        from python_qt_binding import loadUi
+        from python_qt_binding.QtWidgets import QApplication
+        from python_qt_binding.QtWidgets import QWidget
+        from rqt_tic_tac_toe.board_widget import BoardWidget
+    except ImportError as e:
+        print('Skip the board widget benchmarks: {}'.format(e), file=sys.stderr)
+        return
+
+    app = QApplication.instance() or QApplication(sys.argv)
+
+    # Building the plugin UI dominates the plugin startup
+    def _load_ui():
+        widget = QWidget()
+        loadUi(UI_FILE, widget, {'BoardWidget': BoardWidget})
+        widget.deleteLater()
+
+    results['plugin.load_ui'] = _measure(_load_ui, number=5)
+    app.processEvents()
+
+    rng = random.Random(0)
+    for board_size in WIDGET_BOARD_SIZES:
+        for widget_size in WIDGET_SIZES:
+            for fill_level in FILL_LEVELS:
+                game = _filled_game(Game(board_size=board_size), fill_level, rng)
+                widget = BoardWidget()
+                widget.resize(widget_size, widget_size)
+                widget.show()
+                widget.set_board_size(board_size)
+                widget.set_board_markers(game.get_board_markers())
+                app.processEvents()
+
+                name = 'board_widget.paintEvent[board={},widget={},fill={}]'.format(
+                    board_size, widget_size, fill_level)
+                results[name] = _measure(widget.repaint, number=20)
+
+                # Repaint after invalidating the cached board, as on resize
+                def _full_repaint():
+                    widget._board_pixmap = None
+                    widget.repaint()
+
+                results[name.replace('paintEvent', 'paintEvent_uncached')] = \
+                    _measure(_full_repaint, number=10)
+                widget.close()
+
+
+def check_results(results: dict, thresholds: dict, baseline: dict, tolerance: float) -> list:
+    failures = []
+    for name, limit in thresholds.get('limits', {}).items():
+        if name in results and results[name] > limit:
+            failures.append('{}: {:.3g} s exceeds the limit {:.3g} s'.format(
+                name, results[name], limit))
+
+    for name, baseline_time in baseline.items():
+        if name in results and results[name] > baseline_time * tolerance:
+            failures.append('{}: {:.3g} s is slower than the baseline {:.3g} s x {}'.format(
+                name, results[name], baseline_time, tolerance))
+    return failures
+
+
+def main(argv: list = None) -> int:
+    parser = argparse.ArgumentParser(description='Run the rqt_tic_tac_toe benchmarks.')
+    parser.add_argument('--output', help='write the results to this JSON file')
+    parser.add_argument('--baseline', help='compare the results with this JSON file')
+    parser.add_argument('--thresholds', default=DEFAULT_THRESHOLDS,
+                        help='JSON file of the regression thresholds')
+    parser.add_argument('--skip-widget', action='store_true', help='skip the widget benchmarks')
+    parser.add_argument('--skip-startup', action='store_true', help='skip the startup benchmarks')
+    args = parser.parse_args(argv)
+
+    results = {}
+    benchmark_game(results)
+    if not args.skip_startup:
+        benchmark_startup(results)
+    if not args.skip_widget:
+        benchmark_board_widget(results)
+
+    for name, seconds in results.items():
+        print('{:70s} {:12.3f} us'.format(name, seconds * 1e6))
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({
+                'python': platform.python_version(),
+                'numpy': numpy.__version__,
+                'machine': platform.machine(),
+                'results': results,
+            }, f, indent=2, sort_keys=True)
+
+    with open(args.thresholds) as f:
+        thresholds = json.load(f)
+    baseline = {}
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)['results']
+
+    failures = check_results(
+        results, thresholds, baseline, thresholds.get('baseline_tolerance', 1.5))
+    for failure in failures:
+        print('REGRESSION: ' + failure, file=sys.stderr)
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -33,6 +33,10 @@ setup(
     entry_points={
         'console_scripts': [
             'rqt_tic_tac_toe = ' + package_name + '.main:main',
+            'match_server = ' + package_name + '.match_server:main',
+            'tic_tac_toe_bot = ' + package_name + '.bot_node:main',
+            'tic_tac_toe_load_generator = ' + package_name + '.load_generator:main',
+            'tic_tac_toe_tournament = ' + package_name + '.tournament:main',
         ],
     },
 )
\ No newline at end of file
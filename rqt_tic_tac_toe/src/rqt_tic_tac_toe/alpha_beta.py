@@ -0,0 +1,303 @@
+# Copyright 2023 ShotaAk
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import time
+
+from rqt_tic_tac_toe.bitboard_game import board_to_bitmasks
+from rqt_tic_tac_toe.bitboard_game import cell_line_masks
+from rqt_tic_tac_toe.bitboard_game import line_masks
+from rqt_tic_tac_toe.marker import Marker
+from rqt_tic_tac_toe.solution_table import load_solution_table
+from rqt_tic_tac_toe.symmetry import board_symmetries
+from rqt_tic_tac_toe.symmetry import inverse_board_symmetries
+from rqt_tic_tac_toe.zobrist import symmetric_zobrist_keys
+
+WIN_SCORE = 1000000
+# Scores beyond this value are wins or losses in a number of moves
+WIN_THRESHOLD = WIN_SCORE - 1000
+# Heuristic scores are kept below the wins and losses, however long the lines are
+_MAX_HEURISTIC_SCORE = WIN_THRESHOLD - 1
+
+_EXACT = 0
+_LOWER_BOUND = 1
+_UPPER_BOUND = 2
+
+
+class _SearchTimeout(Exception):
+    pass
+
+
+class AlphaBetaPlayer():
+    # Negamax search with alpha-beta pruning and iterative deepening.
+    # Positions are cached in a transposition table keyed by the smallest Zobrist hash
+    # of the 8 symmetric boards, so that symmetric positions are searched only once.
+    # Positions found in a generated solution table are answered without searching.
+
+    def __init__(self, max_table_size: int = 1000000, use_solution_tables: bool = True):
+        self._max_table_size = max_table_size
+        self._use_solution_tables = use_solution_tables
+        self._table = {}
+        self._searched_nodes = 0
+        self._completed_depth = 0
+        self._deadline = 0.0
+        self._should_stop = None
+        # The board whose positions are in the table
+        self._table_root = None
+
+    def get_searched_nodes(self) -> int:
+        return self._searched_nodes
+
+    def get_completed_depth(self) -> int:
+        return self._completed_depth
+
+    def choose_move(self, game, time_limit: float = 1.0, should_stop=None):
+        # Return the best (row, col) found within time_limit seconds, or None if the game is over.
+        # The best move found so far is returned early if should_stop returns True.
+        winner, _ = game.calc_winner()
+        if winner != Marker.NONE or game.board_is_full():
+            return None
+
+        if self._use_solution_tables and game.get_win_length() == game.get_board_size():
+            solution_table = load_solution_table(game.get_board_size())
+            if solution_table is not None:
+                move = solution_table.choose_move(game)
+                if move is not None:
+                    return move
+
+        self._deadline = time.monotonic() + time_limit
+        self._should_stop = should_stop
+        self._setup(game)
+        self._table.clear()
+        self._table_root = None
+
+        empty = self._full & ~(self._root_own | self._root_opp)
+        best_move = next(self._ordered_moves(empty, -1))
+        try:
+            for depth in range(1, empty.bit_count() + 1):
+                try:
+                    score, move = self._search_root(depth, best_move)
+                except _SearchTimeout:
+                    break
+                best_move = move
+                self._completed_depth = depth
+                # Stop once the game-theoretic result is known
+                if abs(score) > WIN_THRESHOLD:
+                    break
+        finally:
+            self._should_stop = None
+
+        return divmod(best_move, self._board_size)
+
+    def analyze(self, game, depth: int, should_stop=None):
+        # Return the score of every empty cell for the side to move searched to depth,
+        # or None if should_stop returned True during the search.
+        # Each move is searched with a full window, so that the scores are exact and not bounds.
+        winner, _ = game.calc_winner()
+        if winner != Marker.NONE or game.board_is_full():
+            return {}
+
+        if self._use_solution_tables and game.get_win_length() == game.get_board_size():
+            solution_table = load_solution_table(game.get_board_size())
+            values = None if solution_table is None else solution_table.lookup_moves(game)
+            if values is not None:
+                # Solved results are known to the end of the game, but not how soon it ends
+                self._completed_depth = len(values)
+                return {move: value * (WIN_THRESHOLD + 1) for move, value in values.items()}
+
+        self._deadline = float('inf')
+        self._should_stop = should_stop
+        self._setup(game)
+        # Calls for increasing depths of the same board share the table like iterative deepening
+        root = (self._board_size, self._masks, self._root_own, self._root_opp)
+        if root != self._table_root:
+            self._table.clear()
+            self._table_root = root
+        self._completed_depth = 0
+
+        own = self._root_own
+        opp = self._root_opp
+        empty = self._full & ~(own | opp)
+        scores = {}
+        try:
+            for cell in self._ordered_moves(empty, -1):
+                score = self._play(own, opp, self._root_hashes, 0, cell, depth,
+                                   -WIN_SCORE - 1, WIN_SCORE + 1)
+                scores[divmod(cell, self._board_size)] = score
+        except _SearchTimeout:
+            return None
+        finally:
+            self._should_stop = None
+        self._completed_depth = depth
+        return scores
+
+    def _setup(self, game) -> None:
+        board_size = game.get_board_size()
+        win_length = game.get_win_length()
+
+        self._board_size = board_size
+        self._full = (1 << (board_size * board_size)) - 1
+        self._masks = tuple(mask for mask, _ in line_masks(board_size, win_length))
+        self._cell_masks = tuple(
+            tuple(mask for mask, _ in lines) for lines in cell_line_masks(board_size, win_length))
+        self._symmetries = board_symmetries(board_size)
+        self._inverse_symmetries = inverse_board_symmetries(board_size)
+        self._keys = symmetric_zobrist_keys(board_size)
+        self._weights = tuple(4 ** count for count in range(win_length + 1))
+        # Try cells on many lines, such as the center and the diagonals, first
+        self._move_order = sorted(
+            range(board_size * board_size),
+            key=lambda cell: -len(self._cell_masks[cell]))
+        first_column = sum(1 << (row * board_size) for row in range(board_size))
+        self._not_first_column = self._full & ~first_column
+        self._not_last_column = self._full & ~(first_column << (board_size - 1))
+
+        self._root_own, self._root_opp = board_to_bitmasks(
+            game.get_board_markers(), game.get_present_marker())
+
+        # Players are indexed by 0 for the side to move at the root and 1 for the other side
+        self._root_hashes = [0] * len(self._symmetries)
+        for player, stones in enumerate((self._root_own, self._root_opp)):
+            for cell in range(board_size * board_size):
+                if stones & (1 << cell):
+                    for index in range(len(self._symmetries)):
+                        self._root_hashes[index] ^= self._keys[index][player][cell]
+
+        self._searched_nodes = 0
+        self._completed_depth = 0
+
+    def _search_root(self, depth: int, first_move: int) -> tuple[int, int]:
+        own = self._root_own
+        opp = self._root_opp
+        empty = self._full & ~(own | opp)
+        alpha = -WIN_SCORE - 1
+        best_score = -WIN_SCORE - 1
+        best_move = first_move
+        for cell in self._ordered_moves(empty, first_move):
+            score = self._play(own, opp, self._root_hashes, 0, cell, depth, alpha, WIN_SCORE + 1)
+            if score > best_score:
+                best_score = score
+                best_move = cell
+            alpha = max(alpha, score)
+        return best_score, best_move
+
+    def _play(self, own: int, opp: int, hashes: list, player: int, cell: int,
+              depth: int, alpha: int, beta: int) -> int:
+        # Return the score of playing cell from the point of view of the player
+        stones = own | (1 << cell)
+        for mask in self._cell_masks[cell]:
+            if stones & mask == mask:
+                return WIN_SCORE - 1
+
+        keys = [player_keys[player][cell] for player_keys in self._keys]
+        child_hashes = [h ^ key for h, key in zip(hashes, keys)]
+        score = -self._negamax(opp, stones, child_hashes, player ^ 1, depth - 1, -beta, -alpha)
+
+        # Prefer faster wins and slower losses
+        if score > WIN_THRESHOLD:
+            return score - 1
+        if score < -WIN_THRESHOLD:
+            return score + 1
+        return score
+
+    def _negamax(self, own: int, opp: int, hashes: list, player: int,
+                 depth: int, alpha: int, beta: int) -> int:
+        self._searched_nodes += 1
+        if self._searched_nodes & 1023 == 0 and (
+                time.monotonic() > self._deadline or
+                (self._should_stop is not None and self._should_stop())):
+            raise _SearchTimeout()
+
+        empty = self._full & ~(own | opp)
+        if not empty:
+            return 0
+        if depth <= 0:
+            return self._evaluate(own, opp)
+
+        key = min(hashes)
+        symmetry = hashes.index(key)
+        table_move = -1
+        entry = self._table.get(key)
+        if entry is not None:
+            entry_depth, entry_score, entry_flag, entry_move = entry
+            table_move = self._inverse_symmetries[symmetry][entry_move]
+            if entry_depth >= depth:
+                if entry_flag == _EXACT:
+                    return entry_score
+                if entry_flag == _LOWER_BOUND:
+                    alpha = max(alpha, entry_score)
+                else:
+                    beta = min(beta, entry_score)
+                if alpha >= beta:
+                    return entry_score
+
+        original_alpha = alpha
+        best_score = -WIN_SCORE - 1
+        best_move = -1
+        for cell in self._ordered_moves(empty, table_move):
+            score = self._play(own, opp, hashes, player, cell, depth, alpha, beta)
+            if score > best_score:
+                best_score = score
+                best_move = cell
+            alpha = max(alpha, score)
+            if alpha >= beta:
+                break
+
+        if best_score <= original_alpha:
+            flag = _UPPER_BOUND
+        elif best_score >= beta:
+            flag = _LOWER_BOUND
+        else:
+            flag = _EXACT
+        if len(self._table) >= self._max_table_size:
+            self._table.clear()
+        # Store the best move in the canonical orientation of the board
+        self._table[key] = (depth, best_score, flag, self._symmetries[symmetry][best_move])
+        return best_score
+
+    def _ordered_moves(self, empty: int, first_move: int):
+        # Try the move of the table first, then the cells next to the stones,
+        # as cells far from the stones rarely matter on large boards
+        if first_move >= 0 and empty & (1 << first_move):
+            yield first_move
+            empty &= ~(1 << first_move)
+
+        near = self._neighbors(self._full & ~empty) & empty
+        if near:
+            for cell in self._move_order:
+                if near & (1 << cell):
+                    yield cell
+            empty &= ~near
+        if empty:
+            for cell in self._move_order:
+                if empty & (1 << cell):
+                    yield cell
+
+    def _neighbors(self, stones: int) -> int:
+        # Return the cells around the stones, including the stones
+        n = self._board_size
+        horizontal = stones | ((stones << 1) & self._not_first_column) | \
+            ((stones >> 1) & self._not_last_column)
+        return (horizontal | (horizontal << n) | (horizontal >> n)) & self._full
+
+    def _evaluate(self, own: int, opp: int) -> int:
+        # Score lines that are still open for only one of the players
+        score = 0
+        for mask in self._masks:
+            own_stones = own & mask
+            opp_stones = opp & mask
+            if own_stones and not opp_stones:
+                score += self._weights[own_stones.bit_count()]
+            elif opp_stones and not own_stones:
+                score -= self._weights[opp_stones.bit_count()]
+        return max(min(score, _MAX_HEURISTIC_SCORE), -_MAX_HEURISTIC_SCORE)
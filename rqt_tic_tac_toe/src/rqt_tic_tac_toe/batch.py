@@ -0,0 +1,82 @@
+# Copyright 2023 ShotaAk
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import functools
+
+import numpy
+from rqt_tic_tac_toe.marker import Marker
+
+# Number of boards evaluated at once, to bound the size of temporary arrays
+CHUNK_SIZE = 65536
+
+
+@functools.lru_cache(maxsize=None)
+def _line_indices(board_size: int) -> tuple:
+    # Return the row and column indices of every line, and the ends of each line,
+    # in the same order as Game checks them: rows, columns, diagonal and anti-diagonal
+    last = board_size - 1
+    index = numpy.arange(board_size)
+    rows = numpy.concatenate([
+        numpy.repeat(index[:, None], board_size, axis=1),
+        numpy.tile(index, (board_size, 1)),
+        index[None, :],
+        index[None, :]])
+    cols = numpy.concatenate([
+        numpy.tile(index, (board_size, 1)),
+        numpy.repeat(index[:, None], board_size, axis=1),
+        index[None, :],
+        last - index[None, :]])
+    ends = numpy.array(
+        [[(row, 0), (row, last)] for row in range(board_size)] +
+        [[(0, col), (last, col)] for col in range(board_size)] +
+        [[(0, 0), (last, last)], [(0, last), (last, 0)]])
+    return rows, cols, ends
+
+
+def evaluate_boards(boards: numpy.ndarray) -> tuple:
+    # Evaluate an (N, board_size, board_size) array of boards at once.
+    # Return the winners (N,), the winner lines (N, 2, 2) filled with -1 when there is no winner,
+    # the full-board flags (N,) and the legal-move masks (N, board_size, board_size).
+    # No move is legal once the game has a winner.
+    boards = numpy.asarray(boards)
+    if boards.ndim != 3 or boards.shape[1] != boards.shape[2]:
+        raise ValueError('boards must have the shape (N, board_size, board_size)')
+
+    count, board_size = boards.shape[0], boards.shape[1]
+    winners = numpy.full(count, Marker.NONE, dtype=numpy.int64)
+    winner_lines = numpy.full((count, 2, 2), -1, dtype=numpy.int64)
+    full = numpy.empty(count, dtype=bool)
+    legal = numpy.empty(boards.shape, dtype=bool)
+
+    rows, cols, ends = _line_indices(board_size)
+    for start in range(0, count, CHUNK_SIZE):
+        chunk = boards[start:start + CHUNK_SIZE].astype(numpy.int8)
+        stop = start + len(chunk)
+
+        cells = chunk[:, rows, cols]
+        first = cells[:, :, 0]
+        complete = (first != Marker.NONE) & numpy.all(cells == first[:, :, None], axis=2)
+        has_winner = complete.any(axis=1)
+        # argmax returns the first complete line, which has the priority
+        line = complete.argmax(axis=1)
+
+        winners[start:stop] = numpy.where(
+            has_winner, first[numpy.arange(len(chunk)), line], Marker.NONE)
+        winner_lines[start:stop] = numpy.where(has_winner[:, None, None], ends[line], -1)
+
+        empty = chunk == Marker.NONE
+        full[start:stop] = ~empty.any(axis=(1, 2))
+        legal[start:stop] = empty & ~has_winner[:, None, None]
+
+    return winners, winner_lines, full, legal
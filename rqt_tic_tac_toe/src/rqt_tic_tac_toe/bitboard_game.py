@@ -0,0 +1,166 @@
+# Copyright 2023 ShotaAk
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import functools
+
+from rqt_tic_tac_toe.marker import Marker
+
+
+@functools.lru_cache(maxsize=None)
+def line_masks(board_size: int, win_length: int = None) -> tuple:
+    # Return the bitmask and the winner line of every run of win_length cells
+    # on rows, columns, diagonals and anti-diagonals.
+    # win_length defaults to board_size, which gives the lines in the same order as Game checks them.
+    if win_length is None or win_length > board_size:
+        win_length = board_size
+    directions = ((0, 1), (1, 0), (1, 1), (1, -1))
+
+    lines = []
+    for d_row, d_col in directions:
+        for row in range(board_size):
+            for col in range(board_size):
+                end_row = row + d_row * (win_length - 1)
+                end_col = col + d_col * (win_length - 1)
+                if end_row >= board_size or end_col < 0 or end_col >= board_size:
+                    continue
+                cells = [(row + d_row * i, col + d_col * i) for i in range(win_length)]
+                lines.append((cells, [(row, col), (end_row, end_col)]))
+
+    return tuple(
+        (sum(1 << (row * board_size + col) for row, col in cells), winner_line)
+        for cells, winner_line in lines)
+
+
+@functools.lru_cache(maxsize=None)
+def cell_line_masks(board_size: int, win_length: int = None) -> tuple:
+    # Return the line masks passing through each cell
+    lines = line_masks(board_size, win_length)
+    return tuple(
+        tuple(line for line in lines if line[0] & (1 << cell))
+        for cell in range(board_size * board_size))
+
+
+def board_to_bitmasks(board: 'numpy.ndarray', marker: int) -> tuple[int, int]:
+    # Return the bitmasks of the stones of marker and of the other markers
+    own = 0
+    other = 0
+    for cell, board_marker in enumerate(board.flat):
+        if board_marker == marker:
+            own |= 1 << cell
+        elif board_marker != Marker.NONE:
+            other |= 1 << cell
+    return own, other
+
+
+class BitboardGame():
+    # A Game compatible board engine that stores the stones of each player as an int bitmask.
+
+    __slots__ = ('_BOARD_SIZE', '_MARKERS', '_stones', '_present_index',
+                 '_winner', '_winner_line', '_board_cache')
+
+    def __init__(self, board_size: int = 3,
+                 markers: list = [Marker.O, Marker.X],
+                 first_marker: int = Marker.O):
+
+        self._BOARD_SIZE = max(board_size, 2)
+        self._MARKERS = tuple(markers)
+
+        self._stones = [0, 0]
+        self._present_index = self._MARKERS.index(first_marker)
+        self._winner = Marker.NONE
+        self._winner_line = []
+        self._board_cache = None
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, BitboardGame):
+            return NotImplemented
+        return self._key() == other._key()
+
+    def __hash__(self) -> int:
+        return hash(self._key())
+
+    def create_new_game(self, board_size: int, first_marker: int) -> 'BitboardGame':
+        return BitboardGame(board_size, self._MARKERS, first_marker)
+
+    def copy(self) -> 'BitboardGame':
+        game = BitboardGame.__new__(BitboardGame)
+        game._BOARD_SIZE = self._BOARD_SIZE
+        game._MARKERS = self._MARKERS
+        game._stones = self._stones.copy()
+        game._present_index = self._present_index
+        game._winner = self._winner
+        game._winner_line = self._winner_line
+        game._board_cache = None
+        return game
+
+    def get_board_size(self) -> int:
+        return self._BOARD_SIZE
+
+    def get_win_length(self) -> int:
+        return self._BOARD_SIZE
+
+    def get_board_markers(self) -> 'numpy.ndarray':
+        # The ndarray view is built lazily because only the UI needs it.
+        # numpy is imported here too so that headless workers start without it.
+        if self._board_cache is None:
+            import numpy
+            board = numpy.full(self._BOARD_SIZE * self._BOARD_SIZE, Marker.NONE)
+            for index, marker in enumerate(self._MARKERS):
+                stones = self._stones[index]
+                while stones:
+                    bit = stones & -stones
+                    board[bit.bit_length() - 1] = marker
+                    stones ^= bit
+            self._board_cache = board.reshape((self._BOARD_SIZE, self._BOARD_SIZE))
+        return self._board_cache
+
+    def get_present_marker(self) -> int:
+        return self._MARKERS[self._present_index]
+
+    def get_stones(self) -> tuple[int, int]:
+        return self._stones[0], self._stones[1]
+
+    def set_marker(self, row: int, col: int) -> bool:
+        # Setting marker on out of range position should fail
+        if row < 0 or row >= self._BOARD_SIZE or col < 0 or col >= self._BOARD_SIZE:
+            return False
+
+        cell = row * self._BOARD_SIZE + col
+        bit = 1 << cell
+        # Setting marker on already set position should fail
+        if (self._stones[0] | self._stones[1]) & bit:
+            return False
+
+        stones = self._stones[self._present_index] | bit
+        self._stones[self._present_index] = stones
+        self._board_cache = None
+
+        if self._winner == Marker.NONE:
+            for mask, winner_line in cell_line_masks(self._BOARD_SIZE)[cell]:
+                if stones & mask == mask:
+                    self._winner = self._MARKERS[self._present_index]
+                    self._winner_line = winner_line
+                    break
+
+        self._present_index ^= 1
+        return True
+
+    def board_is_full(self) -> bool:
+        return (self._stones[0] | self._stones[1]) == (1 << (self._BOARD_SIZE * self._BOARD_SIZE)) - 1
+
+    def calc_winner(self) -> tuple[int, list]:
+        return self._winner, self._winner_line
+
+    def _key(self) -> tuple:
+        return (self._BOARD_SIZE, self._stones[0], self._stones[1], self._present_index)
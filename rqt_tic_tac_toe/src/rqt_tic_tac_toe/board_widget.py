@@ -12,84 +12,205 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import time
+
 import numpy
 
 from python_qt_binding.QtCore import QPointF
+from python_qt_binding.QtCore import QRect
 from python_qt_binding.QtCore import QRectF
 from python_qt_binding.QtCore import QSizeF
 from python_qt_binding.QtCore import Qt
+from python_qt_binding.QtCore import QTimer
+from python_qt_binding.QtCore import Signal
 from python_qt_binding.QtGui import QColor
 from python_qt_binding.QtGui import QPainter
 from python_qt_binding.QtGui import QPen
+from python_qt_binding.QtGui import QPixmap
 from python_qt_binding.QtWidgets import QWidget
-from rqt_tic_tac_toe_msgs.msg import Marker
+from rqt_tic_tac_toe.cursor_interpolator import CursorInterpolator
+from rqt_tic_tac_toe.marker import Marker
+from rqt_tic_tac_toe.profiler import Profiler
 
 
 class BoardWidget(QWidget):
 
+    # Emit the row and column of a clicked block
+    clicked = Signal(int, int)
+    # Emit the mouse position normalized to the board area
+    mouse_moved = Signal(float, float)
+
+    _CURSOR_ANIMATION_INTERVAL = 16  # ms
+
     def __init__(self, parent=None):
         super(BoardWidget, self).__init__(parent)
-        self._INVALID_POINT = QPointF(-1.0, -1.0)
         self._DRAW_METHODS = {
             Marker.O: self._draw_marker_O,
             Marker.X: self._draw_marker_X,
-            Marker.NONE: self._draw_marker_none
         }
 
-        self._board_area_size = QSizeF(self.rect().size()) 
-        self._mouse_clicked_point = self._INVALID_POINT
+        self._COLOR_BACKGROUND = QColor('floralwhite')
+        self._COLOR_BOARD = QColor('black')
+        self._COLOR_TRANSPARENT = QColor('white')
+        self._COLOR_TRANSPARENT.setAlphaF(0.0)
+        self._COLOR_SYNC_MOUSE_CURSOR = QColor('chartreuse')
+        self._COLOR_SYNC_MOUSE_CURSOR.setAlphaF(0.8)
+        self._COLOR_OVERLAY_TEXT = QColor('white')
+        self._COLOR_OVERLAY_BACKGROUND = QColor('black')
+        self._COLOR_OVERLAY_BACKGROUND.setAlphaF(0.6)
+        self._COLOR_HINT_GOOD = QColor('limegreen')
+        self._COLOR_HINT_BAD = QColor('orangered')
+
+        self._board_area_size = QSizeF(self.rect().size())
         self._mouse_present_point = QPointF(0.0, 0.0)
 
         self._board_size = 3
         self._board_markers = numpy.full((self._board_size, self._board_size), Marker.NONE)
         self._winner_line = []
         self._sync_mouse_cursor_pos = None
+        self._overlay_text = ''
+        self._hint_values = {}
+
+        # The remote cursor is animated between received samples only while it moves
+        self._sync_mouse_cursor_interpolator = CursorInterpolator()
+        self._sync_mouse_cursor_timer = QTimer(self)
+        self._sync_mouse_cursor_timer.timeout.connect(self._animate_sync_mouse_cursor)
+        self._profiler = Profiler()
+
+        # The background, the grid and the markers are cached in a pixmap
+        # and repainted only on resize or on board changes
+        self._board_pixmap = None
+        self._update_pens()
 
         self.setMouseTracking(True)
 
     def paintEvent(self, event) -> None:
-        painter = QPainter(self)
+        with self._profiler.measure('paintEvent'):
+            if self._board_pixmap is None:
+                self._render_board_pixmap()
 
-        # Set background color
-        painter.setBrush(QColor('floralwhite'))
-        painter.drawRect(self.rect())
+            painter = QPainter(self)
+            painter.drawPixmap(QPointF(0.0, 0.0), self._board_pixmap)
 
-        self._draw_board(painter)
-        self._draw_markers(painter)
-        if self._winner_line:
-            self._draw_winner_line(painter)
+            if self._hint_values:
+                self._draw_hints(painter)
 
-        if self._sync_mouse_cursor_pos:
-            self._draw_sync_mouse_cursor(painter)
+            if self._winner_line:
+                self._draw_winner_line(painter)
+
+            if self._sync_mouse_cursor_pos:
+                self._draw_sync_mouse_cursor(painter)
+
+            if self._overlay_text:
+                self._draw_overlay_text(painter)
 
     def resizeEvent(self, event) -> None:
         self._resize_board_area()
+        self._update_pens()
+        self._board_pixmap = None
 
     def mousePressEvent(self, event):
-        if event.buttons() == Qt.LeftButton:
-            self._mouse_clicked_point = event.localPos()
+        if event.buttons() != Qt.LeftButton:
+            return
+
+        row = (event.localPos().y() / self._board_area_size.height())
+        col = (event.localPos().x() / self._board_area_size.width())
+        if row < 0.0 or row >= 1.0 or col < 0.0 or col >= 1.0:
+            return
+
+        self.clicked.emit(int(row*self._board_size), int(col*self._board_size))
 
     def mouseMoveEvent(self, event):
         self._mouse_present_point = event.localPos()
+        self.mouse_moved.emit(*self.get_mouse_present_pos())
 
     def set_board_size(self, board_size: int) -> None:
+        if board_size == self._board_size:
+            return
         self._board_size = board_size
+        self._update_pens()
+        self._invalidate_board_pixmap()
 
     def set_board_markers(self, board: numpy.ndarray) -> None:
-        self._board_markers = board
+        # Keep a copy because the game updates its board in place
+        if board.shape != self._board_markers.shape:
+            self._board_markers = board.copy()
+            self._invalidate_board_pixmap()
+            return
+
+        changed = numpy.argwhere(board != self._board_markers)
+        if len(changed) == 0:
+            return
+        previous = self._board_markers[changed[:, 0], changed[:, 1]]
+        self._board_markers = board.copy()
+
+        if self._board_pixmap is None:
+            return
+
+        # Replaced or removed markers may overlap neighboring blocks, so repaint the whole board.
+        # Only markers placed on empty blocks are drawn over the cached board.
+        if numpy.any(previous != Marker.NONE):
+            self._invalidate_board_pixmap()
+            return
+
+        painter = QPainter(self._board_pixmap)
+        for row, col in changed:
+            self._DRAW_METHODS[board[row][col]](painter, row, col)
+            self.update(self._block_rect(row, col))
+        painter.end()
 
     def set_winner_line(self, winner_line: list) -> None:
+        if winner_line == self._winner_line:
+            return
+        if self._winner_line:
+            self.update(self._winner_line_rect())
         self._winner_line = winner_line
+        self.update(self._winner_line_rect())
 
     def reset_winner_line(self) -> None:
+        if self._winner_line:
+            self.update(self._winner_line_rect())
         self._winner_line = []
 
     def set_sync_mouse_cursor_pos(self, sync_mouse_cursor_pos: tuple[float, float]) -> None:
+        if self._sync_mouse_cursor_pos:
+            self.update(self._sync_mouse_cursor_rect())
         self._sync_mouse_cursor_pos = sync_mouse_cursor_pos
+        self.update(self._sync_mouse_cursor_rect())
+
+    def add_sync_mouse_cursor_sample(self, stamp: float, pos: tuple[float, float]) -> None:
+        # Buffer a position stamped by the sender and animate the cursor toward it
+        self._sync_mouse_cursor_interpolator.add_sample(stamp, pos, time.monotonic())
+        if not self._sync_mouse_cursor_timer.isActive():
+            self._sync_mouse_cursor_timer.start(self._CURSOR_ANIMATION_INTERVAL)
+            self._animate_sync_mouse_cursor()
 
     def reset_sync_mouse_cursor_pos(self) -> None:
+        self._sync_mouse_cursor_interpolator.reset()
+        self._sync_mouse_cursor_timer.stop()
+        if self._sync_mouse_cursor_pos:
+            self.update(self._sync_mouse_cursor_rect())
         self._sync_mouse_cursor_pos = None
 
+    def set_overlay_text(self, text: str) -> None:
+        if text == self._overlay_text:
+            return
+        self._overlay_text = text
+        self.update()
+
+    def set_hint_values(self, hint_values: dict) -> None:
+        # Shade the blocks of (row, col) by values in [-1, 1] for the side to move
+        if hint_values == self._hint_values:
+            return
+        self._hint_values = dict(hint_values)
+        self.update()
+
+    def reset_hint_values(self) -> None:
+        self.set_hint_values({})
+
+    def set_profiler(self, profiler: Profiler) -> None:
+        self._profiler = profiler
+
     def get_mouse_present_pos(self) -> tuple[float, float]:
         pos_x = (self._mouse_present_point.x() / self._board_area_size.width())
         pos_y = (self._mouse_present_point.y() / self._board_area_size.height())
@@ -97,17 +218,6 @@ class BoardWidget(QWidget):
         pos_y = min(max(pos_y, 0.0), 1.0)
         return pos_x, pos_y
 
-    def pop_mouse_clicked_pos(self) -> tuple[int, int]:
-        INVALID_POS = (-1, -1)
-
-        row = (self._mouse_clicked_point.y() / self._board_area_size.height())
-        col = (self._mouse_clicked_point.x() / self._board_area_size.width())
-        if row < 0.0 or row >= 1.0 or col < 0.0 or col >= 1.0:
-            return INVALID_POS
-
-        self._mouse_clicked_point = self._INVALID_POINT
-        return (int(row*self._board_size), int(col*self._board_size))
-
     def _resize_board_area(self) -> None:
         # Change the board area to fit the widget
 
@@ -115,6 +225,60 @@ class BoardWidget(QWidget):
         area_size = float(min(self.width(), self.height()))
         self._board_area_size = QSizeF(area_size, area_size)
 
+    def _update_pens(self) -> None:
+        # Pen widths depend on the board area, so they are rebuilt only when it changes
+        self._pen_grid = QPen(QColor('white'), self._to_fitted_line_size(2))
+        self._pen_marker_O = QPen(QColor('tomato'), self._to_fitted_line_size(10))
+        self._pen_marker_X = QPen(QColor('deepskyblue'), self._to_fitted_line_size(10))
+        self._pen_winner_line = QPen(QColor('gold'), self._to_fitted_line_size(20))
+        self._pen_sync_mouse_cursor = QPen(self._COLOR_SYNC_MOUSE_CURSOR, self._to_fitted_line_size(10))
+
+    def _invalidate_board_pixmap(self) -> None:
+        self._board_pixmap = None
+        self.update()
+
+    def _render_board_pixmap(self) -> None:
+        ratio = self.devicePixelRatioF()
+        self._board_pixmap = QPixmap(self.size() * ratio)
+        self._board_pixmap.setDevicePixelRatio(ratio)
+
+        painter = QPainter(self._board_pixmap)
+        # Set background color
+        painter.setBrush(self._COLOR_BACKGROUND)
+        painter.drawRect(self.rect())
+
+        self._draw_board(painter)
+        self._draw_markers(painter)
+        painter.end()
+
+    def _block_size(self) -> float:
+        return self._board_area_size.width() / self._board_size
+
+    def _block_rect(self, row: int, col: int) -> QRect:
+        # Markers are drawn with thick pens that overflow the block
+        margin = self._pen_marker_O.width()
+        return QRectF(
+            col * self._block_size(), row * self._block_size(),
+            self._block_size(), self._block_size()
+        ).adjusted(-margin, -margin, margin, margin).toAlignedRect()
+
+    def _winner_line_rect(self) -> QRect:
+        margin = self._pen_winner_line.width()
+        start = self._to_center_of_block(self._winner_line[0][0], self._winner_line[0][1])
+        end = self._to_center_of_block(self._winner_line[1][0], self._winner_line[1][1])
+        return QRectF(start, end).normalized().adjusted(
+            -margin, -margin, margin, margin).toAlignedRect()
+
+    def _sync_mouse_cursor_rect(self) -> QRect:
+        radius = self._block_size() / 2.0 + self._pen_sync_mouse_cursor.width()
+        center = QPointF(
+            self._sync_mouse_cursor_pos[0] * self._board_area_size.width(),
+            self._sync_mouse_cursor_pos[1] * self._board_area_size.height()
+        )
+        return QRectF(
+            center.x() - radius, center.y() - radius, 2.0 * radius, 2.0 * radius
+        ).toAlignedRect()
+
     def _to_center_of_block(self, row: int, col: int) -> QPointF:
         return QPointF(
             (col + 0.5) * self._board_area_size.width() / self._board_size,
@@ -128,17 +292,22 @@ class BoardWidget(QWidget):
             return 1
         return output
 
-    def _draw_board(self, painter: QPainter) -> None:
-        COLOR_BACKGROUND = QColor('black')
-        COLOR_LINE = QColor('white')
-        LINE_SIZE = self._to_line_size(2)
+    def _to_fitted_line_size(self, size: int) -> int:
+        # Thin the lines on large boards so that they fit in a block.
+        # Boards up to 6x6 keep the size relative to the board area.
+        SIZE_RATE = 200.0 / 6.0
+        output = min(self._to_line_size(size), int(size * self._block_size() / SIZE_RATE))
+        if output < 1:
+            return 1
+        return output
 
+    def _draw_board(self, painter: QPainter) -> None:
         # Draw the board
-        painter.setBrush(COLOR_BACKGROUND)
+        painter.setBrush(self._COLOR_BOARD)
         rect = QRectF(QPointF(0.0, 0.0), self._board_area_size)
         painter.drawRect(rect)
 
-        painter.setPen(QPen(COLOR_LINE, LINE_SIZE))
+        painter.setPen(self._pen_grid)
         for i in range(self._board_size - 1):
             # Draw horizontal lines
             painter.drawLine(
@@ -153,33 +322,21 @@ class BoardWidget(QWidget):
             )
 
     def _draw_markers(self, painter: QPainter) -> None:
-        for (row, col), marker in numpy.ndenumerate(self._board_markers):
-            self._DRAW_METHODS[marker](painter, row, col)
-
-    def _draw_marker_none(self, painter: QPainter, row: int, col: int) -> None:
-        pass
+        # Only visit placed markers so that sparse large boards are cheap to draw
+        for row, col in numpy.argwhere(self._board_markers != Marker.NONE):
+            self._DRAW_METHODS[self._board_markers[row][col]](painter, row, col)
 
     def _draw_marker_O(self, painter: QPainter, row: int, col: int) -> None:
-        COLOR_LINE = QColor('tomato')
-        COLOR_FILL = QColor('white')
-        COLOR_FILL.setAlphaF(0.0)
-        LINE_SIZE = self._to_line_size(10)
-
-        painter.setPen(QPen(COLOR_LINE, LINE_SIZE))
-        painter.setBrush(COLOR_FILL)
+        painter.setPen(self._pen_marker_O)
+        painter.setBrush(self._COLOR_TRANSPARENT)
 
         center = self._to_center_of_block(row, col)
         radius = self._board_area_size.width() / self._board_size / 2.0
         painter.drawEllipse(center, radius, radius)
 
     def _draw_marker_X(self, painter: QPainter, row: int, col: int) -> None:
-        COLOR_LINE = QColor('deepskyblue')
-        COLOR_FILL = QColor('white')
-        COLOR_FILL.setAlphaF(0.0)
-        LINE_SIZE = self._to_line_size(10)
-
-        painter.setPen(QPen(COLOR_LINE, LINE_SIZE))
-        painter.setBrush(COLOR_FILL)
+        painter.setPen(self._pen_marker_X)
+        painter.setBrush(self._COLOR_TRANSPARENT)
 
         start = QPointF(
             col * self._board_area_size.width() / self._board_size,
@@ -202,24 +359,23 @@ class BoardWidget(QWidget):
         painter.drawLine(start, end)
 
     def _draw_winner_line(self, painter: QPainter) -> None:
-        COLOR_LINE = QColor('gold')
-        LINE_SIZE = self._to_line_size(20)
-
-        painter.setPen(QPen(COLOR_LINE, LINE_SIZE))
+        painter.setPen(self._pen_winner_line)
 
         start = self._to_center_of_block(self._winner_line[0][0], self._winner_line[0][1])
         end = self._to_center_of_block(self._winner_line[1][0], self._winner_line[1][1])
         painter.drawLine(start, end)
 
-    def _draw_sync_mouse_cursor(self, painter: QPainter) -> None:
-        COLOR_LINE = QColor('chartreuse')
-        COLOR_LINE.setAlphaF(0.8)
-        COLOR_FILL = QColor('chartreuse')
-        COLOR_FILL.setAlphaF(0.8)
-        LINE_SIZE = self._to_line_size(10)
+    def _animate_sync_mouse_cursor(self) -> None:
+        now = time.monotonic()
+        pos = self._sync_mouse_cursor_interpolator.position(now)
+        if pos is not None and pos != self._sync_mouse_cursor_pos:
+            self.set_sync_mouse_cursor_pos(pos)
+        if not self._sync_mouse_cursor_interpolator.is_animating(now):
+            self._sync_mouse_cursor_timer.stop()
 
-        painter.setPen(QPen(COLOR_LINE, LINE_SIZE))
-        painter.setBrush(COLOR_FILL)
+    def _draw_sync_mouse_cursor(self, painter: QPainter) -> None:
+        painter.setPen(self._pen_sync_mouse_cursor)
+        painter.setBrush(self._COLOR_SYNC_MOUSE_CURSOR)
 
         center = QPointF(
             self._sync_mouse_cursor_pos[0] * self._board_area_size.width(),
@@ -227,3 +383,25 @@ class BoardWidget(QWidget):
         )
         radius = self._board_area_size.width() / self._board_size / 2.0
         painter.drawEllipse(center, radius, radius)
+
+    def _draw_hints(self, painter: QPainter) -> None:
+        MAX_ALPHA = 0.7
+        painter.setPen(Qt.NoPen)
+        for (row, col), value in self._hint_values.items():
+            color = QColor(self._COLOR_HINT_GOOD if value >= 0.0 else self._COLOR_HINT_BAD)
+            color.setAlphaF(MAX_ALPHA * min(abs(value), 1.0))
+            painter.fillRect(QRectF(
+                col * self._block_size(), row * self._block_size(),
+                self._block_size(), self._block_size()), color)
+
+    def _draw_overlay_text(self, painter: QPainter) -> None:
+        OVERLAY_FONT_SIZE = 7
+        font = painter.font()
+        font.setPointSize(OVERLAY_FONT_SIZE)
+        painter.setFont(font)
+
+        flags = Qt.AlignLeft | Qt.AlignTop
+        rect = painter.boundingRect(QRectF(self.rect()), flags, self._overlay_text)
+        painter.fillRect(rect, self._COLOR_OVERLAY_BACKGROUND)
+        painter.setPen(self._COLOR_OVERLAY_TEXT)
+        painter.drawText(rect, flags, self._overlay_text)
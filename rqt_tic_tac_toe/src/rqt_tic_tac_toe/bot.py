@@ -0,0 +1,153 @@
+# Copyright 2023 ShotaAk
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import time
+
+import numpy
+from rqt_tic_tac_toe.marker import Marker
+from rqt_tic_tac_toe.match import create_game
+from rqt_tic_tac_toe.match import MAX_BOARD_SIZE
+from rqt_tic_tac_toe.match import MIN_BOARD_SIZE
+from rqt_tic_tac_toe.match import MIN_WIN_LENGTH
+from rqt_tic_tac_toe.match import player_marker
+from rqt_tic_tac_toe.players import RandomPlayer
+from rqt_tic_tac_toe.profiler import LatencyHistogram
+from rqt_tic_tac_toe.snapshot import classify_delta
+from rqt_tic_tac_toe.snapshot import classify_history_delta
+from rqt_tic_tac_toe.snapshot import DELTA_APPLY
+from rqt_tic_tac_toe.snapshot import DELTA_GAP
+from rqt_tic_tac_toe.snapshot import is_newer_snapshot
+from rqt_tic_tac_toe.snapshot import unpack_board_state
+
+# Same values as rqt_tic_tac_toe_msgs/msg/Command
+_PLACE = 0
+_UNDO = 1
+
+
+class Bot():
+    # A player that syncs with one opponent over the command protocol like a human peer does.
+    # It plays the marker that the match server would give it against the opponent.
+
+    def __init__(self, frame_id: str, opponent_id: str, player, time_limit: float,
+                 board_size: int = 3, win_length: int = 3):
+        self._frame_id = frame_id
+        self._opponent_id = opponent_id
+        self._player = player
+        self._time_limit = time_limit
+        self._fallback_player = RandomPlayer()
+        self._marker = player_marker(frame_id, opponent_id)
+        self._game = create_game(board_size, win_length)
+        self._epoch = 0
+        self._latency = LatencyHistogram(budget=time_limit)
+
+    def get_frame_id(self) -> str:
+        return self._frame_id
+
+    def get_opponent_id(self) -> str:
+        return self._opponent_id
+
+    def get_marker(self) -> int:
+        return self._marker
+
+    def get_epoch(self) -> int:
+        return self._epoch
+
+    def get_game(self):
+        return self._game
+
+    def get_latency(self) -> LatencyHistogram:
+        # Decision latency of each move. Moves over the time limit are counted as missed.
+        return self._latency
+
+    def is_over(self) -> bool:
+        winner, _ = self._game.calc_winner()
+        return winner != Marker.NONE or self._game.board_is_full()
+
+    def is_to_move(self) -> bool:
+        return not self.is_over() and self._game.get_present_marker() == self._marker
+
+    def reset(self, board_size: int, win_length: int) -> None:
+        self._epoch += 1
+        self._game = create_game(board_size, win_length)
+
+    def apply_command(self, command) -> int:
+        # Apply a Command of the opponent and return how it was handled as a DELTA_* value
+        if command.action != _PLACE:
+            return self._apply_history_command(command)
+
+        delta = classify_delta(command.epoch, command.sequence,
+                               self._epoch, self._game.get_move_count())
+        if delta != DELTA_APPLY:
+            return delta
+
+        if command.marker != self._game.get_present_marker() or self.is_over() or \
+           not self._game.set_marker(command.row, command.column):
+            return DELTA_GAP
+        return DELTA_APPLY if command.board_hash == self._game.get_hash() else DELTA_GAP
+
+    def _apply_history_command(self, command) -> int:
+        undo = command.action == _UNDO
+        delta = classify_history_delta(command.epoch, command.sequence, self._epoch,
+                                       self._game.get_move_count(), -1 if undo else 1)
+        if delta != DELTA_APPLY:
+            return delta
+
+        move = self._game.get_last_move() if undo else self._game.get_next_move()
+        if move != (command.row, command.column):
+            return DELTA_GAP
+
+        if undo:
+            self._game.undo()
+        else:
+            self._game.redo()
+        self._epoch = command.epoch
+        return DELTA_APPLY if command.board_hash == self._game.get_hash() else DELTA_GAP
+
+    def apply_state(self, state) -> bool:
+        # Load a BoardState of the opponent if it is newer, and return True if the board changed.
+        # States that can not be loaded are ignored.
+        local = (self._epoch, self._game.get_move_count())
+        if not is_newer_snapshot(state.epoch, state.sequence, *local):
+            # Both sides may have moved at once. Break the tie by frame_id as the plugin does.
+            if (state.epoch, state.sequence) != local or self._opponent_id > self._frame_id:
+                return False
+
+        try:
+            board = unpack_board_state(state, range(MIN_BOARD_SIZE, MAX_BOARD_SIZE + 1),
+                                       range(MIN_WIN_LENGTH, MAX_BOARD_SIZE + 1))
+        except ValueError:
+            return False
+        self._epoch = state.epoch
+        if numpy.array_equal(board, self._game.get_board_markers()) and \
+           state.present_marker == self._game.get_present_marker():
+            return False
+
+        self._game = create_game(state.board_size, state.win_length)
+        self._game.load_board_markers(board, state.present_marker)
+        return True
+
+    def play(self) -> tuple[int, int]:
+        # Make a move if it is the bot's turn, and return it or None
+        if not self.is_to_move():
+            return None
+
+        start = time.perf_counter()
+        move = self._player.choose_move(self._game, self._time_limit)
+        self._latency.record(time.perf_counter() - start)
+
+        # Never pass, even if the engine gives up or returns an illegal move
+        if move is None or not self._game.set_marker(int(move[0]), int(move[1])):
+            move = self._fallback_player.choose_move(self._game)
+            self._game.set_marker(move[0], move[1])
+        return int(move[0]), int(move[1])
@@ -0,0 +1,189 @@
+# Copyright 2023 ShotaAk
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import sys
+
+import rclpy
+from rclpy.node import Node
+from rqt_tic_tac_toe.bot import Bot
+from rqt_tic_tac_toe.marker import Marker
+from rqt_tic_tac_toe.players import create_player
+from rqt_tic_tac_toe.qos import COMMAND_STREAM
+from rqt_tic_tac_toe.qos import DEFAULT_STREAM_QOS
+from rqt_tic_tac_toe.qos import STATE_STREAM
+from rqt_tic_tac_toe.snapshot import DELTA_APPLY
+from rqt_tic_tac_toe.snapshot import DELTA_GAP
+from rqt_tic_tac_toe.snapshot import fill_board_state
+from rqt_tic_tac_toe_msgs.msg import BoardState
+from rqt_tic_tac_toe_msgs.msg import Command
+from rqt_tic_tac_toe_msgs.msg import StateRequest
+
+_TOPIC_NAMESPACE = 'tic_tac_toe'
+_TICK_INTERVAL = 0.1  # s
+
+
+class BotNode(Node):
+    # Play many bots in one process. They share the game topics, the engine and the executor,
+    # and each bot only handles the messages of its own opponent.
+
+    def __init__(self):
+        super().__init__('tic_tac_toe_bot')
+
+        bot_ids = self.declare_parameter('bot_ids', ['bot']).value
+        opponent_ids = self.declare_parameter('opponent_ids', ['player']).value
+        engine = self.declare_parameter('engine', 'alphabeta').value
+        time_limit = self.declare_parameter('time_limit', 0.1).value
+        board_size = self.declare_parameter('board_size', 3).value
+        win_length = self.declare_parameter('win_length', 3).value
+        # Seconds before a bot playing O starts the next game. Negative never resets.
+        self._reset_delay = self.declare_parameter('reset_delay', 1.0).value
+        self._report_interval = self.declare_parameter('report_interval', 10.0).value
+        if len(bot_ids) != len(opponent_ids) or '' in bot_ids or '' in opponent_ids:
+            raise ValueError('bot_ids and opponent_ids must be non-empty names of the same length')
+
+        # Callbacks run one at a time, so the bots can share one engine and its tables
+        player = create_player(engine)
+        self._bots = {}
+        for bot_id, opponent_id in zip(bot_ids, opponent_ids):
+            self._bots.setdefault(opponent_id, []).append(
+                Bot(bot_id, opponent_id, player, time_limit, board_size, win_length))
+        self._over_times = {}
+        self._last_report = self.get_clock().now()
+
+        self._command_publisher = self.create_publisher(
+            Command, _TOPIC_NAMESPACE + '/command',
+            DEFAULT_STREAM_QOS[COMMAND_STREAM].to_profile())
+        self._state_publisher = self.create_publisher(
+            BoardState, _TOPIC_NAMESPACE + '/state', DEFAULT_STREAM_QOS[STATE_STREAM].to_profile())
+        self._state_request_publisher = self.create_publisher(
+            StateRequest, _TOPIC_NAMESPACE + '/state_request', 10)
+        self._subscriptions = [
+            self.create_subscription(
+                Command, _TOPIC_NAMESPACE + '/command', self._command_callback,
+                DEFAULT_STREAM_QOS[COMMAND_STREAM].to_profile()),
+            self.create_subscription(
+                BoardState, _TOPIC_NAMESPACE + '/state', self._state_callback,
+                DEFAULT_STREAM_QOS[STATE_STREAM].to_profile()),
+            self.create_subscription(
+                StateRequest, _TOPIC_NAMESPACE + '/state_request', self._state_request_callback,
+                10),
+        ]
+        self._tick_timer = self.create_timer(_TICK_INTERVAL, self._tick)
+
+        # Announce the bots to the players, and catch up with games that started before them
+        for bot in self.get_bots():
+            self._publish_state(bot)
+            self._request_state(bot)
+        self.get_logger().info('Started {} bots playing {}'.format(len(bot_ids), engine))
+
+    def get_bots(self) -> list:
+        return [bot for bots in self._bots.values() for bot in bots]
+
+    def _command_callback(self, command: Command):
+        for bot in self._bots.get(command.header.frame_id, []):
+            delta = bot.apply_command(command)
+            if delta == DELTA_APPLY:
+                self._play(bot)
+            elif delta == DELTA_GAP:
+                self._request_state(bot)
+
+    def _state_callback(self, state: BoardState):
+        for bot in self._bots.get(state.header.frame_id, []):
+            if bot.apply_state(state):
+                self._play(bot)
+
+    def _state_request_callback(self, request: StateRequest):
+        for bot in self.get_bots():
+            if bot.get_frame_id() == request.target_id:
+                self._publish_state(bot)
+
+    def _tick(self):
+        # Start the game when a bot moves first, and the next game after the delay
+        now = self.get_clock().now()
+        for bot in self.get_bots():
+            if not bot.is_over():
+                self._over_times.pop(bot, None)
+                self._play(bot)
+                continue
+
+            over_time = self._over_times.setdefault(bot, now)
+            if self._reset_delay >= 0 and bot.get_marker() == Marker.O and \
+               (now - over_time).nanoseconds * 1e-9 >= self._reset_delay:
+                game = bot.get_game()
+                bot.reset(game.get_board_size(), game.get_win_length())
+                self._publish_state(bot)
+                self._play(bot)
+
+        if (now - self._last_report).nanoseconds * 1e-9 >= self._report_interval:
+            self._last_report = now
+            self._report_latency()
+
+    def _play(self, bot: Bot):
+        move = bot.play()
+        if move is None:
+            return
+
+        game = bot.get_game()
+        command = Command()
+        command.header.stamp = self.get_clock().now().to_msg()
+        command.header.frame_id = bot.get_frame_id()
+        command.row, command.column = move
+        command.marker = bot.get_marker()
+        command.epoch = bot.get_epoch()
+        command.sequence = game.get_move_count()
+        command.board_hash = game.get_hash()
+        command.action = Command.PLACE
+        self._command_publisher.publish(command)
+        self._publish_state(bot)
+
+    def _publish_state(self, bot: Bot):
+        state = BoardState()
+        state.header.stamp = self.get_clock().now().to_msg()
+        state.header.frame_id = bot.get_frame_id()
+        fill_board_state(state, bot.get_game(), bot.get_epoch())
+        self._state_publisher.publish(state)
+
+    def _request_state(self, bot: Bot):
+        request = StateRequest()
+        request.header.stamp = self.get_clock().now().to_msg()
+        request.header.frame_id = bot.get_frame_id()
+        request.target_id = bot.get_opponent_id()
+        self._state_request_publisher.publish(request)
+
+    def _report_latency(self):
+        for bot in self.get_bots():
+            latency = bot.get_latency()
+            if latency.get_count() == 0:
+                continue
+            self.get_logger().info(
+                '{}: {} moves, p50 {:.2f} ms, p99 {:.2f} ms, max {:.2f} ms, {} over the limit'
+                .format(bot.get_frame_id(), latency.get_count(), latency.percentile(50) * 1e3,
+                        latency.percentile(99) * 1e3, latency.get_max() * 1e3,
+                        latency.get_missed()))
+
+
+def main(argv: list = None):
+    rclpy.init(args=argv)
+    node = BotNode()
+    try:
+        rclpy.spin(node)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        node.destroy_node()
+        rclpy.try_shutdown()
+
+
+if __name__ == '__main__':
+    sys.exit(main())
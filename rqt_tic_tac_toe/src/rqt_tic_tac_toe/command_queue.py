@@ -0,0 +1,58 @@
+# Copyright 2023 ShotaAk
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from collections import deque
+
+
+class CommandQueue():
+    # Hand received commands over from the ROS thread to the Qt thread in batches.
+    # push runs on the ROS thread and drain on the Qt thread. deque appends and pops are atomic,
+    # so no lock is needed. When the queue is full the oldest commands are dropped,
+    # which the receiver sees as a gap in the sequence and recovers from with a snapshot.
+
+    def __init__(self, max_size: int = 1024):
+        self._commands = deque(maxlen=max(max_size, 1))
+        self._drain_pending = False
+        self._dropped_count = 0
+
+    def get_max_size(self) -> int:
+        return self._commands.maxlen
+
+    def get_dropped_count(self) -> int:
+        return self._dropped_count
+
+    def push(self, command) -> bool:
+        # Return True if a drain has to be scheduled
+        if len(self._commands) == self._commands.maxlen:
+            self._dropped_count += 1
+        self._commands.append(command)
+        if self._drain_pending:
+            return False
+        self._drain_pending = True
+        return True
+
+    def drain(self) -> list:
+        # Return the queued commands in arrival order without duplicates.
+        # Clear the flag first so that a command pushed while draining schedules the next drain.
+        self._drain_pending = False
+        commands = []
+        keys = set()
+        while self._commands:
+            command = self._commands.popleft()
+            key = (command.header.frame_id, command.epoch, command.sequence, command.action,
+                   command.row, command.column)
+            if key not in keys:
+                keys.add(key)
+                commands.append(command)
+        return commands
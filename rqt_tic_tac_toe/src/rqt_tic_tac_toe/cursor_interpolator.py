@@ -0,0 +1,100 @@
+# Copyright 2023 ShotaAk
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from collections import deque
+
+from rqt_tic_tac_toe.cursor_throttle import DEFAULT_MAX_RATE
+
+
+class CursorInterpolator():
+    # Render a remote cursor smoothly from sparse timestamped samples.
+    # Samples are replayed a short delay behind the sender, interpolated between samples
+    # and extrapolated for a short horizon past the last one.
+    # The delay should be at least the interval between the samples, or the cursor is
+    # extrapolated until the next sample arrives.
+
+    def __init__(self, delay: float = 1.0 / DEFAULT_MAX_RATE, max_extrapolation: float = 0.1,
+                 smoothing: float = 0.1, reset_gap: float = 1.0, max_samples: int = 16):
+        self._delay = max(delay, 0.0)
+        self._max_extrapolation = max(max_extrapolation, 0.0)
+        self._smoothing = min(max(smoothing, 0.0), 1.0)
+        self._reset_gap = reset_gap
+        self._samples = deque(maxlen=max(max_samples, 2))
+        # Estimated local time minus sender time, smoothed to absorb the network jitter
+        self._offset = None
+
+    def reset(self) -> None:
+        self._samples.clear()
+        self._offset = None
+
+    def add_sample(self, stamp: float, pos: tuple[float, float], now: float) -> None:
+        if self._samples and stamp <= self._samples[-1][0]:
+            # Drop samples that arrived out of order
+            if stamp < self._samples[-1][0] - self._reset_gap:
+                self.reset()
+            else:
+                return
+
+        # Start over after a long pause so that old samples are not interpolated
+        if self._samples and stamp - self._samples[-1][0] > self._reset_gap:
+            self.reset()
+
+        offset = now - stamp
+        if self._offset is None:
+            self._offset = offset
+        elif offset < self._offset:
+            # A sample that arrived early shows the latency better than the late ones
+            self._offset = offset
+        else:
+            self._offset += self._smoothing * (offset - self._offset)
+        self._samples.append((stamp, pos))
+
+    def position(self, now: float):
+        # Return the cursor position to render at local time now, or None
+        if not self._samples:
+            return None
+
+        render_time = now - self._offset - self._delay
+        stamp, pos = self._samples[-1]
+        if len(self._samples) == 1 or render_time >= stamp:
+            return self._extrapolate(render_time)
+
+        if render_time <= self._samples[0][0]:
+            return self._samples[0][1]
+
+        for (stamp0, pos0), (stamp1, pos1) in zip(self._samples, list(self._samples)[1:]):
+            if stamp0 <= render_time <= stamp1:
+                return self._lerp(pos0, pos1, (render_time - stamp0) / (stamp1 - stamp0))
+        return pos
+
+    def is_animating(self, now: float) -> bool:
+        # Return True while the rendered position can still change
+        if not self._samples:
+            return False
+        render_time = now - self._offset - self._delay
+        return render_time < self._samples[-1][0] + self._max_extrapolation
+
+    def _extrapolate(self, render_time: float) -> tuple[float, float]:
+        stamp1, pos1 = self._samples[-1]
+        if len(self._samples) == 1:
+            return pos1
+
+        stamp0, pos0 = self._samples[-2]
+        horizon = min(render_time - stamp1, self._max_extrapolation)
+        return self._lerp(pos1, pos0, -horizon / (stamp1 - stamp0))
+
+    def _lerp(self, pos0: tuple[float, float], pos1: tuple[float, float],
+              ratio: float) -> tuple[float, float]:
+        return (pos0[0] + (pos1[0] - pos0[0]) * ratio,
+                pos0[1] + (pos1[1] - pos0[1]) * ratio)
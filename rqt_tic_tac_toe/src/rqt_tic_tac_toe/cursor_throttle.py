@@ -0,0 +1,67 @@
+# Copyright 2023 ShotaAk
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+# Cursor positions per second published by default
+DEFAULT_MAX_RATE = 10.0
+
+
+class CursorThrottle():
+    # Decide which cursor positions are worth publishing.
+    # Moves inside the dead band or faster than the max rate are dropped,
+    # and the last position is published once the cursor settles.
+
+    def __init__(self, max_rate: float = DEFAULT_MAX_RATE, dead_band: float = 0.01,
+                 settle_time: float = 0.2):
+        self._max_rate = max(max_rate, 0.1)
+        self._dead_band = max(dead_band, 0.0)
+        self._settle_time = max(settle_time, 0.0)
+
+        self._published_pos = None
+        self._published_time = None
+        self._latest_pos = None
+
+    def get_max_rate(self) -> float:
+        return self._max_rate
+
+    def get_dead_band(self) -> float:
+        return self._dead_band
+
+    def get_settle_time(self) -> float:
+        return self._settle_time
+
+    def update(self, pos: tuple[float, float], now: float) -> bool:
+        # Return True if pos should be published now
+        self._latest_pos = pos
+        if self._published_pos is not None:
+            if self._distance(pos, self._published_pos) < self._dead_band:
+                return False
+            if now - self._published_time < 1.0 / self._max_rate:
+                return False
+
+        self._published_pos = pos
+        self._published_time = now
+        return True
+
+    def settle(self, now: float):
+        # Return the position to publish after the cursor has stopped, or None
+        if self._latest_pos is None or self._latest_pos == self._published_pos:
+            return None
+
+        self._published_pos = self._latest_pos
+        self._published_time = now
+        return self._latest_pos
+
+    def _distance(self, pos_a: tuple[float, float], pos_b: tuple[float, float]) -> float:
+        return max(abs(pos_a[0] - pos_b[0]), abs(pos_a[1] - pos_b[1]))
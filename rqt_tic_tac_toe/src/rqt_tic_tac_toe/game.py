@@ -13,7 +13,8 @@
 # limitations under the License.
 
 import numpy
-from rqt_tic_tac_toe_msgs.msg import Marker
+from rqt_tic_tac_toe.marker import Marker
+from rqt_tic_tac_toe.zobrist import ZobristHash
 
 
 class Game():
@@ -28,19 +29,69 @@ class Game():
         self._board = numpy.full((self._BOARD_SIZE, self._BOARD_SIZE), Marker.NONE)
         self._present_marker = first_marker
 
+        # Count markers on each line so that the winner can be updated in O(1) per move.
+        # Lines are indexed as rows, columns, diagonal and anti-diagonal.
+        self._line_counts = {marker: [0] * (2 * self._BOARD_SIZE + 2) for marker in self._MARKERS}
+        self._filled_count = 0
+        self._winner = Marker.NONE
+        self._winner_line = []
+        self._hash = ZobristHash(self._BOARD_SIZE, len(self._MARKERS))
+
+        # Each move keeps the winner before it, so that unmaking a move restores it in O(1)
+        self._moves = []
+        self._undone_moves = []
+
     def create_new_game(self, board_size: int, first_marker: int) -> 'Game':
         return Game(board_size, self._MARKERS, first_marker)
 
     def get_board_size(self) -> int:
         return self._BOARD_SIZE
 
+    def get_win_length(self) -> int:
+        return self._BOARD_SIZE
+
     def get_board_markers(self) -> numpy.ndarray:
         return self._board
 
     def get_present_marker(self) -> int:
         return self._present_marker
 
+    def get_move_count(self) -> int:
+        return self._filled_count
+
+    def get_hash(self) -> int:
+        # 64-bit Zobrist hash of the board
+        return self._hash.get_hash()
+
+    def get_symmetric_hash(self) -> int:
+        return self._hash.get_symmetric_hash()
+
+    def load_board_markers(self, board: numpy.ndarray, present_marker: int) -> None:
+        # Replace the board, for example with a snapshot received from another player
+        self._board = numpy.array(board).reshape((self._BOARD_SIZE, self._BOARD_SIZE))
+        self._present_marker = present_marker
+        self._line_counts = {marker: [0] * (2 * self._BOARD_SIZE + 2) for marker in self._MARKERS}
+        self._filled_count = 0
+        self._winner = Marker.NONE
+        self._winner_line = []
+        self._hash.reset()
+        for (row, col), marker in numpy.ndenumerate(self._board):
+            if marker in self._line_counts:
+                self._filled_count += 1
+                self._update_winner(row, col, marker)
+                self._hash.toggle(row, col, self._MARKERS.index(marker))
+        # The moves that led to the board are unknown
+        self._moves = []
+        self._undone_moves = []
+
     def set_marker(self, row: int, col: int) -> bool:
+        # A new move discards the undone moves
+        if not self.make_move(row, col):
+            return False
+        self._undone_moves.clear()
+        return True
+
+    def make_move(self, row: int, col: int) -> bool:
         # Setting marker on out of range position should fail
         if row < 0 or row >= self._BOARD_SIZE or col < 0 or col >= self._BOARD_SIZE:
             return False
@@ -49,38 +100,90 @@ class Game():
         if self._board[row][col] != Marker.NONE:
             return False
 
+        self._moves.append((row, col, self._winner, self._winner_line))
         self._board[row][col] = self._present_marker
+        self._filled_count += 1
+        self._update_winner(row, col, self._present_marker)
+        self._hash.toggle(row, col, self._MARKERS.index(self._present_marker))
         self._switch_present_marker()
         return True
 
+    def unmake_move(self) -> tuple[int, int]:
+        # Take back the last move and return its position, or None without moves
+        if not self._moves:
+            return None
+
+        row, col, self._winner, self._winner_line = self._moves.pop()
+        marker = int(self._board[row][col])
+        self._board[row][col] = Marker.NONE
+        self._filled_count -= 1
+        counts = self._line_counts[marker]
+        for line in self._lines_through(row, col):
+            counts[line] -= 1
+        self._hash.toggle(row, col, self._MARKERS.index(marker))
+        self._present_marker = marker
+        return row, col
+
+    def undo(self) -> tuple[int, int]:
+        move = self.unmake_move()
+        if move is not None:
+            self._undone_moves.append(move)
+        return move
+
+    def redo(self) -> tuple[int, int]:
+        if not self._undone_moves:
+            return None
+        move = self._undone_moves.pop()
+        self.make_move(*move)
+        return move
+
+    def can_undo(self) -> bool:
+        return len(self._moves) > 0
+
+    def can_redo(self) -> bool:
+        return len(self._undone_moves) > 0
+
+    def get_last_move(self) -> tuple[int, int]:
+        return self._moves[-1][:2] if self._moves else None
+
+    def get_next_move(self) -> tuple[int, int]:
+        # The move that redo would make
+        return self._undone_moves[-1] if self._undone_moves else None
+
     def board_is_full(self) -> bool:
-        return bool(numpy.all(self._board != Marker.NONE))
+        return self._filled_count == self._BOARD_SIZE * self._BOARD_SIZE
 
     def calc_winner(self) -> tuple[int, list]:
-        winner_line = []  # Start and end positions of the winner line
-
-        # Check rows
-        for row in range(self._BOARD_SIZE):
-            if self._board[row][0] != Marker.NONE and numpy.all(self._board[row] == self._board[row][0]):
-                winner_line = [(row, 0), (row, self._BOARD_SIZE - 1)]
-                return self._board[row][0], winner_line
-
-        # Check columns
-        for col in range(self._BOARD_SIZE):
-            if self._board[0][col] != Marker.NONE and numpy.all(self._board[:, col] == self._board[0][col]):
-                winner_line = [(0, col), (self._BOARD_SIZE - 1, col)]
-                return self._board[0][col], winner_line
-
-        # Check diagonals
-        if self._board[0][0] != Marker.NONE and numpy.all(numpy.diag(self._board) == self._board[0][0]):
-            winner_line = [(0, 0), (self._BOARD_SIZE - 1, self._BOARD_SIZE - 1)]
-            return self._board[0][0], winner_line
-
-        if self._board[0][self._BOARD_SIZE - 1] != Marker.NONE and numpy.all(numpy.diag(numpy.fliplr(self._board)) == self._board[0][self._BOARD_SIZE - 1]):
-            winner_line = [(0, self._BOARD_SIZE - 1), (self._BOARD_SIZE - 1, 0)]
-            return self._board[0][self._BOARD_SIZE - 1], winner_line
-
-        return Marker.NONE, winner_line
+        # Return the winner and the start and end positions of the winner line
+        return self._winner, self._winner_line
+
+    def _lines_through(self, row: int, col: int) -> list:
+        lines = [row, self._BOARD_SIZE + col]
+        if row == col:
+            lines.append(2 * self._BOARD_SIZE)
+        if row + col == self._BOARD_SIZE - 1:
+            lines.append(2 * self._BOARD_SIZE + 1)
+        return lines
+
+    def _line_ends(self, line: int) -> list:
+        last = self._BOARD_SIZE - 1
+        if line < self._BOARD_SIZE:
+            return [(line, 0), (line, last)]
+        if line < 2 * self._BOARD_SIZE:
+            col = line - self._BOARD_SIZE
+            return [(0, col), (last, col)]
+        if line == 2 * self._BOARD_SIZE:
+            return [(0, 0), (last, last)]
+        return [(0, last), (last, 0)]
+
+    def _update_winner(self, row: int, col: int, marker: int) -> None:
+        counts = self._line_counts[marker]
+        for line in self._lines_through(row, col):
+            counts[line] += 1
+            # The first completed line wins the game
+            if counts[line] == self._BOARD_SIZE and self._winner == Marker.NONE:
+                self._winner = marker
+                self._winner_line = self._line_ends(line)
 
     def _switch_present_marker(self) -> None:
         self._present_marker = self._MARKERS[
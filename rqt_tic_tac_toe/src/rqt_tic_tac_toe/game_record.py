@@ -0,0 +1,255 @@
+# Copyright 2023 ShotaAk
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import argparse
+import itertools
+import os
+import struct
+import sys
+import time
+
+import numpy
+from rqt_tic_tac_toe.marker import Marker
+from rqt_tic_tac_toe.match import create_game
+from rqt_tic_tac_toe.solution_table import default_directory
+
+try:
+    import fcntl
+except ImportError:
+    # Recorders do not lock their files where fcntl is not available
+    fcntl = None
+
+# A game record file is a header followed by fixed-size records appended one per event.
+# Each game starts with a record of Marker.NONE whose row and col hold the board size
+# and the win length. It is the snapshot of the empty board that seeking replays from,
+# so that any move is reached by replaying at most one game.
+MAGIC = b'TTTR'
+VERSION = 1
+HEADER_FORMAT = '<4sIII'
+HEADER_SIZE = struct.calcsize(HEADER_FORMAT)
+RECORD_DTYPE = numpy.dtype([('stamp', '<f8'), ('game_id', '<u4'),
+                            ('row', 'u1'), ('col', 'u1'), ('marker', 'u1'), ('reserved', 'u1')])
+
+
+def default_path(directory: str = None) -> str:
+    return os.path.join(directory or default_directory(), 'game_records.ttr')
+
+
+def _read_header(f, path: str) -> None:
+    header = f.read(HEADER_SIZE)
+    if len(header) < HEADER_SIZE:
+        raise ValueError('{} is not a game record'.format(path))
+    magic, version, record_size, _ = struct.unpack(HEADER_FORMAT, header)
+    if magic != MAGIC or version != VERSION or record_size != RECORD_DTYPE.itemsize:
+        raise ValueError('{} is not a game record'.format(path))
+
+
+def _try_lock(f) -> bool:
+    # Lock the file for one recorder. The lock is released when the file is closed.
+    if fcntl is None:
+        return True
+    try:
+        fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        return False
+    return True
+
+
+class GameRecorder():
+    # Append the moves of games to a game record file.
+    # Each recorder locks its file, and a recorder whose file is locked by another one, such as
+    # another rqt instance, appends to path_1, path_2 and so on instead. The records and the
+    # game ids of concurrent recorders never mix.
+
+    def __init__(self, path: str):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        root, ext = os.path.splitext(path)
+        for index in itertools.count():
+            self._path = path if index == 0 else '{}_{}{}'.format(root, index, ext)
+            self._file = open(self._path, 'a+b')
+            if _try_lock(self._file):
+                break
+            self._file.close()
+        path = self._path
+
+        self._file.seek(0)
+        if self._file.read(1):
+            self._file.seek(0)
+            _read_header(self._file, path)
+        else:
+            self._file.write(struct.pack(HEADER_FORMAT, MAGIC, VERSION, RECORD_DTYPE.itemsize, 0))
+            self._file.flush()
+
+        # Drop a record that was partially written by a crash
+        size = os.fstat(self._file.fileno()).st_size
+        records = (size - HEADER_SIZE) // RECORD_DTYPE.itemsize
+        if HEADER_SIZE + records * RECORD_DTYPE.itemsize != size:
+            self._file.truncate(HEADER_SIZE + records * RECORD_DTYPE.itemsize)
+
+        self._game_id = 0
+        if records > 0:
+            self._file.seek(HEADER_SIZE + (records - 1) * RECORD_DTYPE.itemsize)
+            last = numpy.frombuffer(self._file.read(RECORD_DTYPE.itemsize), dtype=RECORD_DTYPE)
+            self._game_id = int(last['game_id'][0])
+        self._recording = False
+
+    def close(self) -> None:
+        self._file.close()
+
+    def get_path(self) -> str:
+        return self._path
+
+    def is_recording(self) -> bool:
+        return self._recording
+
+    def start_game(self, board_size: int, win_length: int, stamp: float = None) -> int:
+        # Return the id of the new game
+        self._game_id += 1
+        self._recording = True
+        self._append(stamp, board_size, win_length, Marker.NONE)
+        return self._game_id
+
+    def stop_game(self) -> None:
+        # Ignore moves until the next game starts
+        self._recording = False
+
+    def record_move(self, row: int, col: int, marker: int, stamp: float = None) -> None:
+        if self._recording:
+            self._append(stamp, row, col, marker)
+
+    def _append(self, stamp: float, row: int, col: int, marker: int) -> None:
+        record = numpy.zeros(1, dtype=RECORD_DTYPE)
+        record[0] = (time.time() if stamp is None else stamp, self._game_id, row, col, marker, 0)
+        # Flush every record so that a crash loses at most the record being written
+        self._file.write(record.tobytes())
+        self._file.flush()
+
+
+class GameReplay():
+    # Random access to the games of a memory-mapped game record file
+
+    def __init__(self, path: str):
+        with open(path, 'rb') as f:
+            _read_header(f, path)
+        count = (os.path.getsize(path) - HEADER_SIZE) // RECORD_DTYPE.itemsize
+        if count > 0:
+            self._records = numpy.memmap(
+                path, dtype=RECORD_DTYPE, mode='r', offset=HEADER_SIZE, shape=(count,))
+        else:
+            self._records = numpy.zeros(0, dtype=RECORD_DTYPE)
+        self._game_starts = numpy.flatnonzero(self._records['marker'] == Marker.NONE)
+
+    def get_record_count(self) -> int:
+        return len(self._records)
+
+    def get_game_count(self) -> int:
+        return len(self._game_starts)
+
+    def get_records(self) -> numpy.ndarray:
+        return self._records
+
+    def get_game_range(self, game_index: int) -> tuple[int, int]:
+        # Return the first and the end record indices of a game
+        start = int(self._game_starts[game_index])
+        if game_index + 1 < len(self._game_starts):
+            return start, int(self._game_starts[game_index + 1])
+        return start, len(self._records)
+
+    def find_game(self, record_index: int) -> int:
+        # Return the index of the game that the record belongs to
+        if not 0 <= record_index < len(self._records) or len(self._game_starts) == 0 or \
+           record_index < self._game_starts[0]:
+            raise IndexError('record {} is out of the games'.format(record_index))
+        return int(numpy.searchsorted(self._game_starts, record_index, side='right')) - 1
+
+    def seek(self, record_index: int):
+        # Return the game after the moves up to and including the record
+        start, _ = self.get_game_range(self.find_game(record_index))
+        header = self._records[start]
+        game = create_game(int(header['row']), int(header['col']))
+        for index in range(start + 1, record_index + 1):
+            self._play_record(game, index)
+        return game
+
+    def replay(self, game_index: int):
+        # Yield the record and the game after each move of a game.
+        # Raise ValueError at the first record that is not a legal move.
+        start, end = self.get_game_range(game_index)
+        game = self.seek(start)
+        yield self._records[start], game
+        for index in range(start + 1, end):
+            self._play_record(game, index)
+            yield self._records[index], game
+
+    def _play_record(self, game, record_index: int) -> None:
+        record = self._records[record_index]
+        if record['marker'] != game.get_present_marker() or \
+           not game.set_marker(int(record['row']), int(record['col'])):
+            raise ValueError('record {} is not a legal move'.format(record_index))
+
+
+def _board_text(board: numpy.ndarray) -> str:
+    symbols = {Marker.NONE: '.', Marker.O: 'O', Marker.X: 'X'}
+    return '\n'.join(' '.join(symbols.get(marker, '?') for marker in row) for row in board)
+
+
+def main(argv: list = None):
+    parser = argparse.ArgumentParser(description='Replay recorded Tic-Tac-Toe games.')
+    parser.add_argument('path', nargs='?', default=None,
+                        help='game record file (default: {})'.format(default_path()))
+    parser.add_argument('--game', type=int, default=None,
+                        help='index of the game to replay; negative counts from the last game')
+    parser.add_argument('--move', type=int, default=None,
+                        help='show the board after this move of the game and exit')
+    parser.add_argument('--speed', type=float, default=0.0,
+                        help='moves per second; 0 replays without waiting')
+    args = parser.parse_args(argv)
+
+    path = args.path or default_path()
+    replay = GameReplay(path)
+    if args.game is None:
+        print('{} games, {} records'.format(replay.get_game_count(), replay.get_record_count()))
+        return 0
+
+    if replay.get_game_count() == 0:
+        print('{} has no games'.format(path), file=sys.stderr)
+        return 1
+
+    game_index = args.game % replay.get_game_count()
+    start, end = replay.get_game_range(game_index)
+    try:
+        if args.move is not None:
+            game = replay.seek(min(start + max(args.move, 0), end - 1))
+            print(_board_text(game.get_board_markers()))
+            return 0
+
+        for record, game in replay.replay(game_index):
+            print('{:.3f} game {} move {}'.format(
+                record['stamp'], record['game_id'], game.get_move_count()))
+            print(_board_text(game.get_board_markers()))
+            if args.speed > 0.0:
+                time.sleep(1.0 / args.speed)
+    except ValueError as e:
+        print('{}: {}'.format(path, e), file=sys.stderr)
+        return 1
+    winner, _ = game.calc_winner()
+    print('Winner: {}'.format(winner) if winner != Marker.NONE else 'No winner')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,79 @@
+# Copyright 2023 ShotaAk
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import math
+
+from rqt_tic_tac_toe.alpha_beta import AlphaBetaPlayer
+from rqt_tic_tac_toe.alpha_beta import WIN_THRESHOLD
+from rqt_tic_tac_toe.search_worker import HINTS
+from rqt_tic_tac_toe.search_worker import load_board_snapshot
+from rqt_tic_tac_toe.search_worker import SearchWorker
+
+# Heuristic scores of this size are shown at half of the strength of a known result
+_HEURISTIC_SCALE = 32.0
+DEFAULT_MAX_DEPTH = 12
+
+
+def hint_value(score: int) -> float:
+    # Map a search score to [-1, 1] for the side to move.
+    # Known wins and losses are -1 and 1, and heuristic scores stay within (-0.5, 0.5).
+    if score > WIN_THRESHOLD:
+        return 1.0
+    if score < -WIN_THRESHOLD:
+        return -1.0
+    return 0.5 * math.tanh(score / _HEURISTIC_SCALE)
+
+
+def analyze_progressively(snapshot: tuple, max_depth: int, should_stop, player=None):
+    # Yield the depth and the scores of every move of a board for each finished depth,
+    # until the results of all moves are known or should_stop returns True
+    game = load_board_snapshot(snapshot)
+    if player is None:
+        player = AlphaBetaPlayer()
+
+    for depth in range(1, max_depth + 1):
+        scores = player.analyze(game, depth, should_stop)
+        if scores is None:
+            return
+        # Boards in a solution table are searched to the end at once
+        completed_depth = player.get_completed_depth()
+        yield completed_depth, scores
+        if completed_depth >= len(scores) or \
+           all(abs(score) > WIN_THRESHOLD for score in scores.values()):
+            return
+
+
+class HintAnalyzer():
+    # Search every move of a board in a worker process one depth after another,
+    # and pass the scores of each finished depth to callback(generation, depth, scores).
+    # callback is called from a reader thread, not from the thread calling analyze.
+    # A new board or cancel() abandons the running search, even in the middle of a depth.
+
+    def __init__(self, callback, max_depth: int = DEFAULT_MAX_DEPTH):
+        self._max_depth = max_depth
+        self._worker = SearchWorker(
+            lambda generation, result: callback(generation, *result))
+
+    def get_generation(self) -> int:
+        return self._worker.get_generation()
+
+    def analyze(self, game) -> int:
+        # Start analyzing a copy of the game and return the generation of the results
+        return self._worker.search(HINTS, game, self._max_depth)
+
+    def cancel(self) -> None:
+        self._worker.cancel()
+
+    def shutdown(self) -> None:
+        self._worker.shutdown()
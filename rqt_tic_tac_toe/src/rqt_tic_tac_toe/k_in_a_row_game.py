@@ -0,0 +1,197 @@
+# Copyright 2023 ShotaAk
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from rqt_tic_tac_toe.marker import Marker
+from rqt_tic_tac_toe.zobrist import ZobristHash
+
+
+class KInARowGame():
+    # A Game compatible engine where win_length markers in a row win, such as gomoku.
+    # Only placed markers are stored, and wins are checked around the last move.
+
+    _DIRECTIONS = ((0, 1), (1, 0), (1, 1), (1, -1))
+
+    def __init__(self, board_size: int = 15, win_length: int = 5,
+                 markers: list = [Marker.O, Marker.X],
+                 first_marker: int = Marker.O):
+
+        self._BOARD_SIZE = max(board_size, 2)
+        self._WIN_LENGTH = min(max(win_length, 2), self._BOARD_SIZE)
+        self._MARKERS = markers
+
+        self._stones = {}
+        self._present_marker = first_marker
+        self._winner = Marker.NONE
+        self._winner_line = []
+        self._board_cache = None
+        self._hash = ZobristHash(self._BOARD_SIZE, len(self._MARKERS))
+
+        # Each move keeps the winner before it, so that unmaking a move restores it in O(1)
+        self._moves = []
+        self._undone_moves = []
+
+    def create_new_game(self, board_size: int, first_marker: int) -> 'KInARowGame':
+        return KInARowGame(board_size, self._WIN_LENGTH, self._MARKERS, first_marker)
+
+    def copy(self) -> 'KInARowGame':
+        game = KInARowGame(self._BOARD_SIZE, self._WIN_LENGTH, self._MARKERS, self._present_marker)
+        game._stones = self._stones.copy()
+        game._winner = self._winner
+        game._winner_line = self._winner_line
+        game._hash = self._hash.copy()
+        game._moves = self._moves.copy()
+        game._undone_moves = self._undone_moves.copy()
+        return game
+
+    def get_board_size(self) -> int:
+        return self._BOARD_SIZE
+
+    def get_win_length(self) -> int:
+        return self._WIN_LENGTH
+
+    def get_board_markers(self) -> 'numpy.ndarray':
+        # The ndarray view is built once and then updated per move
+        if self._board_cache is None:
+            # Imported on demand so that headless workers start without numpy
+            import numpy
+            self._board_cache = numpy.full((self._BOARD_SIZE, self._BOARD_SIZE), Marker.NONE)
+            for (row, col), marker in self._stones.items():
+                self._board_cache[row][col] = marker
+        return self._board_cache
+
+    def get_stones(self) -> dict:
+        return self._stones
+
+    def get_present_marker(self) -> int:
+        return self._present_marker
+
+    def get_move_count(self) -> int:
+        return len(self._stones)
+
+    def get_hash(self) -> int:
+        # 64-bit Zobrist hash of the board
+        return self._hash.get_hash()
+
+    def get_symmetric_hash(self) -> int:
+        return self._hash.get_symmetric_hash()
+
+    def load_board_markers(self, board: 'numpy.ndarray', present_marker: int) -> None:
+        import numpy
+        # Replace the board, for example with a snapshot received from another player
+        self._stones = {}
+        self._present_marker = present_marker
+        self._winner = Marker.NONE
+        self._winner_line = []
+        self._board_cache = None
+        self._hash.reset()
+        for row, col in numpy.argwhere(numpy.asarray(board) != Marker.NONE):
+            marker = int(board[row][col])
+            self._stones[(int(row), int(col))] = marker
+            self._hash.toggle(int(row), int(col), self._MARKERS.index(marker))
+            if self._winner == Marker.NONE:
+                self._update_winner(int(row), int(col), marker)
+        # The moves that led to the board are unknown
+        self._moves = []
+        self._undone_moves = []
+
+    def set_marker(self, row: int, col: int) -> bool:
+        # A new move discards the undone moves
+        if not self.make_move(row, col):
+            return False
+        self._undone_moves.clear()
+        return True
+
+    def make_move(self, row: int, col: int) -> bool:
+        # Setting marker on out of range position should fail
+        if row < 0 or row >= self._BOARD_SIZE or col < 0 or col >= self._BOARD_SIZE:
+            return False
+
+        # Setting marker on already set position should fail
+        if (row, col) in self._stones:
+            return False
+
+        self._moves.append((row, col, self._winner, self._winner_line))
+        self._stones[(row, col)] = self._present_marker
+        if self._board_cache is not None:
+            self._board_cache[row][col] = self._present_marker
+        if self._winner == Marker.NONE:
+            self._update_winner(row, col, self._present_marker)
+        self._hash.toggle(row, col, self._MARKERS.index(self._present_marker))
+        self._switch_present_marker()
+        return True
+
+    def unmake_move(self) -> tuple[int, int]:
+        # Take back the last move and return its position, or None without moves
+        if not self._moves:
+            return None
+
+        row, col, self._winner, self._winner_line = self._moves.pop()
+        self._present_marker = self._stones.pop((row, col))
+        self._hash.toggle(row, col, self._MARKERS.index(self._present_marker))
+        if self._board_cache is not None:
+            self._board_cache[row][col] = Marker.NONE
+        return row, col
+
+    def undo(self) -> tuple[int, int]:
+        move = self.unmake_move()
+        if move is not None:
+            self._undone_moves.append(move)
+        return move
+
+    def redo(self) -> tuple[int, int]:
+        if not self._undone_moves:
+            return None
+        move = self._undone_moves.pop()
+        self.make_move(*move)
+        return move
+
+    def can_undo(self) -> bool:
+        return len(self._moves) > 0
+
+    def can_redo(self) -> bool:
+        return len(self._undone_moves) > 0
+
+    def get_last_move(self) -> tuple[int, int]:
+        return self._moves[-1][:2] if self._moves else None
+
+    def get_next_move(self) -> tuple[int, int]:
+        # The move that redo would make
+        return self._undone_moves[-1] if self._undone_moves else None
+
+    def board_is_full(self) -> bool:
+        return len(self._stones) == self._BOARD_SIZE * self._BOARD_SIZE
+
+    def calc_winner(self) -> tuple[int, list]:
+        return self._winner, self._winner_line
+
+    def _run_end(self, row: int, col: int, d_row: int, d_col: int, marker: int) -> tuple[int, int]:
+        # Return the last position of the run of marker from (row, col) toward (d_row, d_col)
+        while self._stones.get((row + d_row, col + d_col)) == marker:
+            row += d_row
+            col += d_col
+        return row, col
+
+    def _update_winner(self, row: int, col: int, marker: int) -> None:
+        for d_row, d_col in self._DIRECTIONS:
+            start = self._run_end(row, col, -d_row, -d_col, marker)
+            end = self._run_end(row, col, d_row, d_col, marker)
+            length = max(abs(end[0] - start[0]), abs(end[1] - start[1])) + 1
+            if length >= self._WIN_LENGTH:
+                self._winner = marker
+                self._winner_line = [start, end]
+                return
+
+    def _switch_present_marker(self) -> None:
+        self._present_marker = self._MARKERS[
+            (self._MARKERS.index(self._present_marker) + 1) % len(self._MARKERS)]
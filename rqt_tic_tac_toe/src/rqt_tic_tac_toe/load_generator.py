@@ -0,0 +1,286 @@
+# Copyright 2023 ShotaAk
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import math
+import sys
+import time
+
+import rclpy
+from rclpy.node import Node
+from rclpy.utilities import remove_ros_args
+from rqt_tic_tac_toe.match import create_game
+from rqt_tic_tac_toe.players import RandomPlayer
+from rqt_tic_tac_toe.profiler import StreamStats
+from rqt_tic_tac_toe.qos import COMMAND_STREAM
+from rqt_tic_tac_toe.qos import CURSOR_POS_STREAM
+from rqt_tic_tac_toe.qos import DEFAULT_STREAM_QOS
+from rqt_tic_tac_toe.qos import STATE_STREAM
+from rqt_tic_tac_toe.snapshot import fill_board_state
+from rqt_tic_tac_toe_msgs.msg import BoardState
+from rqt_tic_tac_toe_msgs.msg import Command
+from rqt_tic_tac_toe_msgs.msg import CursorPos
+
+LOAD_PLAYER_PREFIX = 'load_'
+_TOPIC_NAMESPACE = 'tic_tac_toe'
+_TICK_INTERVAL = 0.005  # s
+# Publish at most this many ticks of messages at once when the generator falls behind
+_MAX_CATCH_UP_TICKS = 4
+_CURSOR_RADIUS = 0.4
+_CURSOR_PERIOD = 2.0  # s
+
+
+class _VirtualPlayer():
+    # Play both sides of a game with random moves and start the next game when one is over
+
+    def __init__(self, frame_id: str, board_size: int, win_length: int, seed: int):
+        self._frame_id = frame_id
+        self._board_size = board_size
+        self._win_length = win_length
+        self._player = RandomPlayer(seed)
+        self._game = create_game(board_size, win_length)
+        self._epoch = 0
+        # Spread the cursors of the players around the path
+        self._phase = seed * 0.618
+
+    def get_frame_id(self) -> str:
+        return self._frame_id
+
+    def get_game(self):
+        return self._game
+
+    def get_epoch(self) -> int:
+        return self._epoch
+
+    def fill_command(self, command: Command) -> bool:
+        # Place a random marker and fill the command with it.
+        # Return False when the game was over and the next game was started instead.
+        move = self._player.choose_move(self._game)
+        if move is None:
+            self._game = create_game(self._board_size, self._win_length)
+            self._epoch += 1
+            return False
+
+        # Message fields accept only Python ints, not numpy integers
+        command.marker = int(self._game.get_present_marker())
+        self._game.set_marker(*move)
+        command.header.frame_id = self._frame_id
+        command.row, command.column = int(move[0]), int(move[1])
+        command.epoch = self._epoch
+        command.sequence = self._game.get_move_count()
+        command.board_hash = self._game.get_hash()
+        command.action = Command.PLACE
+        return True
+
+    def get_cursor_pos(self, seconds: float) -> tuple[float, float]:
+        angle = 2.0 * math.pi * seconds / _CURSOR_PERIOD + self._phase
+        return (0.5 + _CURSOR_RADIUS * math.cos(angle), 0.5 + _CURSOR_RADIUS * math.sin(angle))
+
+
+class LoadGenerator(Node):
+    # Publish the commands and cursor positions of virtual players at fixed rates,
+    # and measure the latency from their stamps to their arrival back at this node.
+
+    def __init__(self, players: int, command_rate: float, cursor_rate: float,
+                 board_size: int = 3, win_length: int = 3):
+        super().__init__('tic_tac_toe_load_generator')
+
+        self._players = [
+            _VirtualPlayer('{}{}'.format(LOAD_PLAYER_PREFIX, i), board_size, win_length, i)
+            for i in range(players)]
+        # Rates of all players together, in messages per second
+        self._rates = {
+            COMMAND_STREAM: command_rate * players,
+            CURSOR_POS_STREAM: cursor_rate * players,
+        }
+        self._publishers = {
+            COMMAND_STREAM: self._publish_command,
+            CURSOR_POS_STREAM: self._publish_cursor_pos,
+        }
+        self._stats = {stream: StreamStats() for stream in self._rates}
+        self._scheduled = {stream: 0 for stream in self._rates}
+        self._next_player = {stream: 0 for stream in self._rates}
+        self._start = None
+        self._stop = None
+        self._publishing = False
+
+        self._command_publisher = self.create_publisher(
+            Command, _TOPIC_NAMESPACE + '/command',
+            DEFAULT_STREAM_QOS[COMMAND_STREAM].to_profile())
+        self._cursor_pos_publisher = self.create_publisher(
+            CursorPos, _TOPIC_NAMESPACE + '/cursor_pos',
+            DEFAULT_STREAM_QOS[CURSOR_POS_STREAM].to_profile())
+        self._state_publisher = self.create_publisher(
+            BoardState, _TOPIC_NAMESPACE + '/state', DEFAULT_STREAM_QOS[STATE_STREAM].to_profile())
+        self._subscriptions = [
+            self.create_subscription(
+                Command, _TOPIC_NAMESPACE + '/command', self._command_callback,
+                DEFAULT_STREAM_QOS[COMMAND_STREAM].to_profile()),
+            self.create_subscription(
+                CursorPos, _TOPIC_NAMESPACE + '/cursor_pos', self._cursor_pos_callback,
+                DEFAULT_STREAM_QOS[CURSOR_POS_STREAM].to_profile()),
+        ]
+        self._tick_timer = self.create_timer(_TICK_INTERVAL, self._tick)
+
+    def get_stats(self) -> dict:
+        return self._stats
+
+    def get_players(self) -> list:
+        return self._players
+
+    def get_elapsed(self) -> float:
+        # Return the seconds spent publishing
+        if self._start is None:
+            return 0.0
+        if self._publishing:
+            return time.perf_counter() - self._start
+        return self._stop - self._start
+
+    def set_publishing(self, publishing: bool) -> None:
+        if publishing and not self._publishing:
+            self._start = time.perf_counter()
+            self._scheduled = {stream: 0 for stream in self._rates}
+        elif not publishing and self._publishing:
+            self._stop = time.perf_counter()
+        self._publishing = publishing
+
+    def _tick(self):
+        if not self._publishing:
+            return
+
+        # Publish the messages due since the start. Messages that could not be published in
+        # time are skipped, so the sent rate shows what the generator achieved.
+        elapsed = self.get_elapsed()
+        for stream, rate in self._rates.items():
+            due = int(elapsed * rate) - self._scheduled[stream]
+            limit = max(int(rate * _TICK_INTERVAL * _MAX_CATCH_UP_TICKS), 1)
+            self._scheduled[stream] += due
+            for _ in range(min(due, limit)):
+                player = self._players[self._next_player[stream]]
+                self._next_player[stream] = (self._next_player[stream] + 1) % len(self._players)
+                self._publishers[stream](player, elapsed)
+
+    def _publish_command(self, player: _VirtualPlayer, elapsed: float):
+        command = Command()
+        if not player.fill_command(command):
+            # Reset the boards of the peers that sync with the player, like a reset does
+            state = BoardState()
+            state.header.stamp = self.get_clock().now().to_msg()
+            state.header.frame_id = player.get_frame_id()
+            fill_board_state(state, player.get_game(), player.get_epoch())
+            self._state_publisher.publish(state)
+            return
+
+        command.header.stamp = self.get_clock().now().to_msg()
+        self._command_publisher.publish(command)
+        self._stats[COMMAND_STREAM].add_sent()
+
+    def _publish_cursor_pos(self, player: _VirtualPlayer, elapsed: float):
+        cursor_pos = CursorPos()
+        cursor_pos.header.frame_id = player.get_frame_id()
+        cursor_pos.x, cursor_pos.y = player.get_cursor_pos(elapsed)
+        cursor_pos.header.stamp = self.get_clock().now().to_msg()
+        self._cursor_pos_publisher.publish(cursor_pos)
+        self._stats[CURSOR_POS_STREAM].add_sent()
+
+    def _command_callback(self, command: Command):
+        self._receive(COMMAND_STREAM, command.header)
+
+    def _cursor_pos_callback(self, pos: CursorPos):
+        self._receive(CURSOR_POS_STREAM, pos.header)
+
+    def _receive(self, stream: str, header):
+        # Only the own players are measured, as the clocks of other machines may differ
+        if not header.frame_id.startswith(LOAD_PLAYER_PREFIX):
+            return
+        now = self.get_clock().now().nanoseconds
+        latency = (now - header.stamp.sec * 1000000000 - header.stamp.nanosec) * 1e-9
+        self._stats[stream].add_received(latency, time.perf_counter())
+
+
+def format_stats(stream: str, stats: StreamStats, elapsed: float) -> str:
+    sent = stats.get_sent()
+    latency = stats.get_latency()
+    lines = ['{}: sent {} ({:.0f}/s), received {} ({:.0f}/s), dropped {} ({:.2%})'.format(
+        stream, sent, sent / max(elapsed, 1e-9), stats.get_received(), stats.get_throughput(),
+        stats.get_dropped(), stats.get_dropped() / max(sent, 1))]
+    lines.append('  latency mean/p50/p90/p99/max={:.2f}/{:.2f}/{:.2f}/{:.2f}/{:.2f}ms, '
+                 '{} over a frame'.format(
+                     latency.get_mean() * 1e3, latency.percentile(50) * 1e3,
+                     latency.percentile(90) * 1e3, latency.percentile(99) * 1e3,
+                     latency.get_max() * 1e3, latency.get_missed()))
+    return '\n'.join(lines)
+
+
+def main(argv: list = None):
+    import argparse
+    parser = argparse.ArgumentParser(
+        description='Publish the commands and cursor positions of virtual Tic-Tac-Toe players '
+                    'and measure their latency.')
+    parser.add_argument('--players', type=int, default=10, help='virtual players')
+    parser.add_argument('--command-rate', type=float, default=2.0,
+                        help='commands per second of each player')
+    parser.add_argument('--cursor-rate', type=float, default=30.0,
+                        help='cursor positions per second of each player')
+    parser.add_argument('--duration', type=float, default=10.0, help='seconds to publish')
+    parser.add_argument('--settle-time', type=float, default=1.0,
+                        help='seconds to wait for messages in flight after publishing')
+    parser.add_argument('--report-interval', type=float, default=1.0,
+                        help='seconds between progress reports')
+    parser.add_argument('--board-size', type=int, default=3)
+    parser.add_argument('--win-length', type=int, default=None,
+                        help='markers in a row to win (default: board size)')
+    args = parser.parse_args(remove_ros_args(args=sys.argv if argv is None else argv)[1:])
+
+    if args.players < 1:
+        parser.error('at least one player is needed')
+
+    rclpy.init(args=argv)
+    node = LoadGenerator(args.players, args.command_rate, args.cursor_rate,
+                         args.board_size, args.win_length or args.board_size)
+    stats = node.get_stats()
+    try:
+        # Let the publishers and subscriptions discover each other first
+        for _ in range(10):
+            rclpy.spin_once(node, timeout_sec=0.01)
+
+        node.set_publishing(True)
+        next_report = args.report_interval
+        while node.get_elapsed() < args.duration:
+            rclpy.spin_once(node, timeout_sec=_TICK_INTERVAL)
+            if node.get_elapsed() >= next_report:
+                next_report += args.report_interval
+                print('{:.1f}s: '.format(node.get_elapsed()) + ', '.join(
+                    '{} {}/{} p99 {:.2f}ms'.format(
+                        stream, stream_stats.get_received(), stream_stats.get_sent(),
+                        stream_stats.get_latency().percentile(99) * 1e3)
+                    for stream, stream_stats in stats.items()), flush=True)
+        node.set_publishing(False)
+
+        settle_end = time.perf_counter() + args.settle_time
+        while time.perf_counter() < settle_end:
+            rclpy.spin_once(node, timeout_sec=_TICK_INTERVAL)
+    except KeyboardInterrupt:
+        node.set_publishing(False)
+    finally:
+        node.destroy_node()
+        rclpy.try_shutdown()
+
+    print()
+    for stream, stream_stats in stats.items():
+        print(format_stats(stream, stream_stats, node.get_elapsed()))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,153 @@
+# Copyright 2023 ShotaAk
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from collections import OrderedDict
+import re
+import zlib
+
+from rqt_tic_tac_toe.game import Game
+from rqt_tic_tac_toe.k_in_a_row_game import KInARowGame
+from rqt_tic_tac_toe.marker import Marker
+from rqt_tic_tac_toe.snapshot import classify_delta
+from rqt_tic_tac_toe.snapshot import DELTA_APPLY
+
+MATCH_TOPIC_PREFIX = 'tic_tac_toe/match'
+LOBBY_TOPIC = 'tic_tac_toe/lobby'
+# Boards the plugin offers. The win length of a request is at most the board size.
+MIN_BOARD_SIZE = 3
+MAX_BOARD_SIZE = 25
+MIN_WIN_LENGTH = 3
+
+
+def create_game(board_size: int, win_length: int):
+    if win_length < board_size:
+        return KInARowGame(board_size=board_size, win_length=win_length, first_marker=Marker.O)
+    return Game(board_size=board_size, first_marker=Marker.O)
+
+
+def match_players(player_id: str, opponent_id: str) -> tuple[str, str]:
+    # The same pair of players always makes the same match regardless of who joins first
+    return tuple(sorted([player_id, opponent_id]))
+
+
+def player_marker(player_id: str, opponent_id: str) -> int:
+    # The first player in the sorted pair places O
+    if match_players(player_id, opponent_id)[0] == player_id:
+        return Marker.O
+    return Marker.X
+
+
+def match_namespace(player_id: str, opponent_id: str) -> str:
+    # frame_id may contain characters that topic names can not,
+    # so sanitize them and append a checksum to keep the names unique
+    players = match_players(player_id, opponent_id)
+    names = [re.sub('[^0-9A-Za-z_]', '_', player) for player in players]
+    checksum = zlib.crc32('\0'.join(players).encode('utf-8'))
+    return '{}/{}_{}_{:08x}'.format(MATCH_TOPIC_PREFIX, names[0], names[1], checksum)
+
+
+class Match():
+
+    def __init__(self, player_id: str, opponent_id: str, board_size: int, win_length: int):
+        self._players = match_players(player_id, opponent_id)
+        self._namespace = match_namespace(player_id, opponent_id)
+        self._epoch = 0
+        self._game = create_game(board_size, win_length)
+
+    def get_players(self) -> tuple[str, str]:
+        return self._players
+
+    def get_namespace(self) -> str:
+        return self._namespace
+
+    def get_epoch(self) -> int:
+        return self._epoch
+
+    def get_game(self):
+        return self._game
+
+    def is_over(self) -> bool:
+        winner, _ = self._game.calc_winner()
+        return winner != Marker.NONE or self._game.board_is_full()
+
+    def reset(self, board_size: int, win_length: int) -> None:
+        self._epoch += 1
+        self._game = create_game(board_size, win_length)
+
+    def play(self, player_id: str, row: int, col: int, epoch: int, sequence: int) -> bool:
+        # Validate the move authoritatively. Only the player to move may place a marker,
+        # and only on top of the board the server holds.
+        if player_id not in self._players or self.is_over():
+            return False
+
+        opponent_id = self._players[1] if player_id == self._players[0] else self._players[0]
+        if player_marker(player_id, opponent_id) != self._game.get_present_marker():
+            return False
+
+        if classify_delta(epoch, sequence, self._epoch, self._game.get_move_count()) != DELTA_APPLY:
+            return False
+
+        return self._game.set_marker(row, col)
+
+
+class MatchRegistry():
+
+    def __init__(self, max_matches: int = 1000, on_removed=None):
+        self._max_matches = max(max_matches, 1)
+        self._on_removed = on_removed
+        # Matches indexed by namespace in least recently used order
+        self._matches = OrderedDict()
+
+    def join(self, player_id: str, opponent_id: str, board_size: int, win_length: int,
+             reset: bool = False) -> tuple[Match, bool]:
+        # Return the match of the pair and whether it has been created.
+        # Boards the plugin does not offer raise ValueError before any match is changed.
+        if not MIN_BOARD_SIZE <= board_size <= MAX_BOARD_SIZE:
+            raise ValueError('Unsupported board size: {}'.format(board_size))
+        if not MIN_WIN_LENGTH <= win_length <= board_size:
+            raise ValueError('Unsupported win length: {} on a board of {}'.format(
+                win_length, board_size))
+
+        namespace = match_namespace(player_id, opponent_id)
+        match = self._matches.get(namespace)
+        if match is not None:
+            self._matches.move_to_end(namespace)
+            if reset or match.is_over():
+                match.reset(board_size, win_length)
+            return match, False
+
+        match = Match(player_id, opponent_id, board_size, win_length)
+        self._matches[namespace] = match
+        while len(self._matches) > self._max_matches:
+            _, removed = self._matches.popitem(last=False)
+            if self._on_removed is not None:
+                self._on_removed(removed)
+        return match, True
+
+    def get_match(self, namespace: str) -> Match:
+        match = self._matches.get(namespace)
+        if match is not None:
+            self._matches.move_to_end(namespace)
+        return match
+
+    def get_match_count(self) -> int:
+        return len(self._matches)
+
+    def remove(self, namespace: str) -> bool:
+        match = self._matches.pop(namespace, None)
+        if match is None:
+            return False
+        if self._on_removed is not None:
+            self._on_removed(match)
+        return True
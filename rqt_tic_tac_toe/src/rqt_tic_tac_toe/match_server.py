@@ -0,0 +1,124 @@
+# Copyright 2023 ShotaAk
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import sys
+
+import rclpy
+from rclpy.node import Node
+from rqt_tic_tac_toe.match import LOBBY_TOPIC
+from rqt_tic_tac_toe.match import MatchRegistry
+from rqt_tic_tac_toe.qos import COMMAND_STREAM
+from rqt_tic_tac_toe.qos import DEFAULT_STREAM_QOS
+from rqt_tic_tac_toe.qos import STATE_STREAM
+from rqt_tic_tac_toe.snapshot import fill_board_state
+from rqt_tic_tac_toe_msgs.msg import BoardState
+from rqt_tic_tac_toe_msgs.msg import Command
+from rqt_tic_tac_toe_msgs.msg import MatchRequest
+from rqt_tic_tac_toe_msgs.msg import StateRequest
+
+
+class MatchServer(Node):
+
+    def __init__(self):
+        super().__init__('tic_tac_toe_match_server')
+
+        max_matches = self.declare_parameter('max_matches', 1000).value
+        self._registry = MatchRegistry(max_matches, on_removed=self._destroy_match_interfaces)
+
+        # Publishers and subscriptions of each match, indexed by namespace
+        self._interfaces = {}
+
+        self._lobby_subscription = self.create_subscription(
+            MatchRequest, LOBBY_TOPIC, self._lobby_callback, 10)
+
+    def _lobby_callback(self, request: MatchRequest):
+        player_id = request.header.frame_id
+        # Requests without an opponent only announce the player to the others
+        if player_id == '' or request.opponent_id == '' or player_id == request.opponent_id:
+            return
+
+        try:
+            match, created = self._registry.join(
+                player_id, request.opponent_id, request.board_size, request.win_length,
+                request.reset)
+        except ValueError as e:
+            self.get_logger().warning('Rejected the request of {}: {}'.format(player_id, e))
+            return
+        if created:
+            self._create_match_interfaces(match.get_namespace())
+            self.get_logger().info('Created match {} ({} matches)'.format(
+                match.get_namespace(), self._registry.get_match_count()))
+        self._publish_state(match.get_namespace())
+
+    def _create_match_interfaces(self, namespace: str):
+        self._interfaces[namespace] = [
+            self.create_publisher(
+                BoardState, namespace + '/state', DEFAULT_STREAM_QOS[STATE_STREAM].to_profile()),
+            self.create_subscription(
+                Command, namespace + '/command',
+                lambda command: self._command_callback(namespace, command),
+                DEFAULT_STREAM_QOS[COMMAND_STREAM].to_profile()),
+            self.create_subscription(
+                StateRequest, namespace + '/state_request',
+                lambda request: self._publish_state(namespace), 10),
+        ]
+
+    def _destroy_match_interfaces(self, match):
+        publisher, *subscriptions = self._interfaces.pop(match.get_namespace())
+        self.destroy_publisher(publisher)
+        for subscription in subscriptions:
+            self.destroy_subscription(subscription)
+
+    def _command_callback(self, namespace: str, command: Command):
+        match = self._registry.get_match(namespace)
+        if match is None:
+            return
+
+        # Moves of a match can not be taken back
+        if command.action != Command.PLACE or \
+           not match.play(command.header.frame_id, command.row, command.column,
+                          command.epoch, command.sequence):
+            self.get_logger().debug('Rejected a move of {} in {}'.format(
+                command.header.frame_id, namespace))
+
+        # Publish the board either way so that a rejected client rolls back
+        self._publish_state(namespace)
+
+    def _publish_state(self, namespace: str):
+        match = self._registry.get_match(namespace)
+        # Requests may still be queued for a match that has been removed
+        if match is None:
+            return
+
+        state = BoardState()
+        state.header.stamp = self.get_clock().now().to_msg()
+        state.header.frame_id = self.get_name()
+        fill_board_state(state, match.get_game(), match.get_epoch())
+        self._interfaces[namespace][0].publish(state)
+
+
+def main(argv: list = None):
+    rclpy.init(args=argv)
+    server = MatchServer()
+    try:
+        rclpy.spin(server)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.destroy_node()
+        rclpy.try_shutdown()
+
+
+if __name__ == '__main__':
+    sys.exit(main())
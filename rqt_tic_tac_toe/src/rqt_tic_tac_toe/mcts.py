@@ -0,0 +1,197 @@
+# Copyright 2023 ShotaAk
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import concurrent.futures
+import math
+import os
+import random
+import time
+
+from rqt_tic_tac_toe.bitboard_game import board_to_bitmasks
+from rqt_tic_tac_toe.bitboard_game import cell_line_masks
+from rqt_tic_tac_toe.marker import Marker
+
+# Time reserved for sending the task to the workers and merging the results
+_OVERHEAD_TIME = 0.02
+
+
+class _Node():
+
+    __slots__ = ('move', 'parent', 'children', 'untried', 'visits', 'wins', 'winner')
+
+    def __init__(self, move: int, parent: '_Node', untried: list, winner: int):
+        self.move = move
+        self.parent = parent
+        self.children = []
+        self.untried = untried
+        self.visits = 0
+        # Reward of the player who played move
+        self.wins = 0.0
+        # Player index of the winner for terminal nodes: 0, 1, or -1 for a draw
+        self.winner = winner
+
+
+def _empty_cells(empty: int) -> list:
+    cells = []
+    while empty:
+        bit = empty & -empty
+        cells.append(bit.bit_length() - 1)
+        empty ^= bit
+    return cells
+
+
+def _is_win(stones: int, cell: int, cell_masks: tuple) -> bool:
+    for mask in cell_masks[cell]:
+        if stones & mask == mask:
+            return True
+    return False
+
+
+def _rollout(stones: list, player: int, empty: int, cell_masks: tuple, rng: random.Random) -> int:
+    # Play random moves until the end and return the winner, or -1 for a draw
+    cells = _empty_cells(empty)
+    rng.shuffle(cells)
+    for cell in cells:
+        stones[player] |= 1 << cell
+        if _is_win(stones[player], cell, cell_masks):
+            return player
+        player ^= 1
+    return -1
+
+
+def search(board_size: int, own: int, opp: int, time_limit: float,
+           exploration: float = math.sqrt(2.0), seed: int = None,
+           win_length: int = None) -> tuple[dict, int]:
+    # Run UCT from a position where the player 0 (own) is to move.
+    # win_length defaults to the board size.
+    # Return the visit count of each root move and the number of playouts.
+    deadline = time.monotonic() + time_limit
+    rng = random.Random(seed)
+    full = (1 << (board_size * board_size)) - 1
+    cell_masks = tuple(
+        tuple(mask for mask, _ in lines) for lines in cell_line_masks(board_size, win_length))
+
+    root = _Node(-1, None, _empty_cells(full & ~(own | opp)), None)
+    playouts = 0
+    while not playouts or time.monotonic() < deadline:
+        node = root
+        stones = [own, opp]
+        player = 0
+
+        # Selection
+        while not node.untried and node.children:
+            log_visits = math.log(node.visits)
+            node = max(
+                node.children,
+                key=lambda child: child.wins / child.visits +
+                exploration * math.sqrt(log_visits / child.visits))
+            stones[player] |= 1 << node.move
+            player ^= 1
+
+        # Expansion
+        if node.untried:
+            move = node.untried.pop(rng.randrange(len(node.untried)))
+            stones[player] |= 1 << move
+            empty = full & ~(stones[0] | stones[1])
+            if _is_win(stones[player], move, cell_masks):
+                child = _Node(move, node, [], player)
+            elif not empty:
+                child = _Node(move, node, [], -1)
+            else:
+                child = _Node(move, node, _empty_cells(empty), None)
+            node.children.append(child)
+            node = child
+            player ^= 1
+
+        # Simulation
+        if node.winner is not None:
+            winner = node.winner
+        else:
+            winner = _rollout(stones, player, full & ~(stones[0] | stones[1]), cell_masks, rng)
+
+        # Backpropagation
+        mover = player ^ 1
+        while node is not None:
+            node.visits += 1
+            if winner == mover:
+                node.wins += 1.0
+            elif winner < 0:
+                node.wins += 0.5
+            node = node.parent
+            mover ^= 1
+
+        playouts += 1
+        # Stop early when there is only one move to play
+        if len(root.children) == 1 and not root.untried:
+            break
+
+    return {child.move: child.visits for child in root.children}, playouts
+
+
+def _search_worker(args: tuple) -> tuple[dict, int]:
+    return search(*args)
+
+
+class MCTSPlayer():
+    # Monte Carlo Tree Search with root parallelism.
+    # Each worker process grows its own tree from the same root,
+    # and the visit counts of the root moves are summed to pick the move.
+
+    def __init__(self, workers: int = None, exploration: float = math.sqrt(2.0), seed: int = None):
+        self._workers = workers if workers else (os.cpu_count() or 1)
+        self._exploration = exploration
+        self._rng = random.Random(seed)
+        self._executor = None
+        self._playouts = 0
+
+    def get_workers(self) -> int:
+        return self._workers
+
+    def get_playouts(self) -> int:
+        return self._playouts
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    def choose_move(self, game, time_limit: float = 1.0):
+        # Return the best (row, col) found within time_limit seconds, or None if the game is over
+        winner, _ = game.calc_winner()
+        if winner != Marker.NONE or game.board_is_full():
+            return None
+
+        board_size = game.get_board_size()
+        own, opp = board_to_bitmasks(game.get_board_markers(), game.get_present_marker())
+        search_time = max(time_limit - _OVERHEAD_TIME, 0.0)
+        tasks = [
+            (board_size, own, opp, search_time, self._exploration, self._rng.getrandbits(64),
+             game.get_win_length())
+            for _ in range(self._workers)]
+
+        if self._workers == 1:
+            results = [_search_worker(tasks[0])]
+        else:
+            if self._executor is None:
+                self._executor = concurrent.futures.ProcessPoolExecutor(max_workers=self._workers)
+            results = list(self._executor.map(_search_worker, tasks))
+
+        visits = {}
+        self._playouts = 0
+        for move_visits, playouts in results:
+            self._playouts += playouts
+            for move, count in move_visits.items():
+                visits[move] = visits.get(move, 0) + count
+
+        return divmod(max(visits, key=visits.get), board_size)
@@ -0,0 +1,144 @@
+# Copyright 2023 ShotaAk
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import importlib
+import random
+
+from rqt_tic_tac_toe.bitboard_game import BitboardGame
+from rqt_tic_tac_toe.bitboard_game import cell_line_masks
+from rqt_tic_tac_toe.marker import Marker
+
+
+def _empty_cells(game) -> list:
+    if isinstance(game, BitboardGame):
+        # Walk the empty bits instead of building the board array
+        board_size = game.get_board_size()
+        own, opp = game.get_stones()
+        empty = ~(own | opp) & ((1 << (board_size * board_size)) - 1)
+        cells = []
+        while empty:
+            bit = empty & -empty
+            cells.append(divmod(bit.bit_length() - 1, board_size))
+            empty ^= bit
+        return cells
+
+    import numpy
+    return [(int(row), int(col))
+            for row, col in numpy.argwhere(game.get_board_markers() == Marker.NONE)]
+
+
+def _game_is_over(game) -> bool:
+    winner, _ = game.calc_winner()
+    return winner != Marker.NONE or game.board_is_full()
+
+
+class RandomPlayer():
+    # Place a marker on a random empty block
+
+    def __init__(self, seed: int = None):
+        self._rng = random.Random(seed)
+
+    def choose_move(self, game, time_limit: float = 0.0):
+        if _game_is_over(game):
+            return None
+        return self._rng.choice(_empty_cells(game))
+
+
+class GreedyPlayer():
+    # Win if possible, otherwise block the opponent's win, otherwise play randomly
+
+    def __init__(self, seed: int = None):
+        self._rng = random.Random(seed)
+
+    def choose_move(self, game, time_limit: float = 0.0):
+        if _game_is_over(game):
+            return None
+
+        cells = _empty_cells(game)
+        if isinstance(game, BitboardGame):
+            return self._choose_bitboard_move(game, cells)
+
+        present_marker = game.get_present_marker()
+        blocks = []
+        for row, col in cells:
+            child = self._copy(game)
+            child.set_marker(row, col)
+            if child.calc_winner()[0] == present_marker:
+                return row, col
+
+            # Let the opponent move here instead to see if it would win
+            opponent = self._copy(game)
+            opponent.load_board_markers(opponent.get_board_markers(), child.get_present_marker())
+            opponent.set_marker(row, col)
+            if opponent.calc_winner()[0] != Marker.NONE:
+                blocks.append((row, col))
+
+        return self._rng.choice(blocks or cells)
+
+    def _choose_bitboard_move(self, game, cells: list):
+        board_size = game.get_board_size()
+        stones = game.get_stones()
+        own = stones[0] if game.get_present_marker() == Marker.O else stones[1]
+        opp = stones[0] ^ stones[1] ^ own
+        line_masks = cell_line_masks(board_size)
+        blocks = []
+        for row, col in cells:
+            cell = row * board_size + col
+            bit = 1 << cell
+            for mask, _ in line_masks[cell]:
+                if (own | bit) & mask == mask:
+                    return row, col
+                if (opp | bit) & mask == mask:
+                    blocks.append((row, col))
+        return self._rng.choice(blocks or cells)
+
+    def _copy(self, game):
+        if hasattr(game, 'copy'):
+            return game.copy()
+        child = game.create_new_game(game.get_board_size(), game.get_present_marker())
+        child.load_board_markers(game.get_board_markers().copy(), game.get_present_marker())
+        return child
+
+
+def _alpha_beta_player(seed: int = None):
+    from rqt_tic_tac_toe.alpha_beta import AlphaBetaPlayer
+    return AlphaBetaPlayer()
+
+
+def _mcts_player(seed: int = None):
+    # Tournaments already run games in parallel, so search in the calling process
+    from rqt_tic_tac_toe.mcts import MCTSPlayer
+    return MCTSPlayer(workers=1, seed=seed)
+
+
+PLAYERS = {
+    'random': RandomPlayer,
+    'greedy': GreedyPlayer,
+    'alphabeta': _alpha_beta_player,
+    'mcts': _mcts_player,
+}
+
+
+def create_player(name: str, seed: int = None):
+    # Create a registered player, or a pluggable engine given as 'module:factory'.
+    # Players provide choose_move(game, time_limit) and return (row, col).
+    if name in PLAYERS:
+        return PLAYERS[name](seed=seed)
+
+    if ':' not in name:
+        raise ValueError('Unknown player: {} (choose from {} or module:factory)'.format(
+            name, ', '.join(PLAYERS)))
+    module_name, factory_name = name.split(':', 1)
+    factory = getattr(importlib.import_module(module_name), factory_name)
+    return factory()
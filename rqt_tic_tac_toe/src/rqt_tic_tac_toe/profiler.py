@@ -0,0 +1,180 @@
+# Copyright 2023 ShotaAk
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import contextlib
+import math
+import threading
+import time
+
+FRAME_BUDGET = 1.0 / 60.0
+
+
+class LatencyHistogram():
+    # Histogram of latencies with log-spaced buckets from 1 us to 10 s
+
+    _MIN_LATENCY = 1e-6
+    _BUCKETS_PER_DECADE = 20
+    _DECADES = 7
+
+    def __init__(self, budget: float = FRAME_BUDGET):
+        self._budget = budget
+        self._counts = [0] * (self._BUCKETS_PER_DECADE * self._DECADES + 1)
+        self._count = 0
+        self._total = 0.0
+        self._max = 0.0
+        self._missed = 0
+
+    def record(self, seconds: float) -> None:
+        if seconds > self._MIN_LATENCY:
+            bucket = int(math.log10(seconds / self._MIN_LATENCY) * self._BUCKETS_PER_DECADE) + 1
+            bucket = min(bucket, len(self._counts) - 1)
+        else:
+            bucket = 0
+        self._counts[bucket] += 1
+        self._count += 1
+        self._total += seconds
+        self._max = max(self._max, seconds)
+        if seconds > self._budget:
+            self._missed += 1
+
+    def merge(self, other: 'LatencyHistogram') -> None:
+        # Add the samples of a histogram recorded elsewhere, such as in another process
+        self._counts = [a + b for a, b in zip(self._counts, other._counts)]
+        self._count += other._count
+        self._total += other._total
+        self._max = max(self._max, other._max)
+        self._missed += other._missed
+
+    def get_count(self) -> int:
+        return self._count
+
+    def get_mean(self) -> float:
+        return self._total / self._count if self._count else 0.0
+
+    def get_max(self) -> float:
+        return self._max
+
+    def get_missed(self) -> int:
+        # Return the number of samples over the budget
+        return self._missed
+
+    def percentile(self, percent: float) -> float:
+        # Return the upper bound of the bucket that contains the percentile
+        if not self._count:
+            return 0.0
+        rank = math.ceil(self._count * percent / 100.0)
+        accumulated = 0
+        for bucket, count in enumerate(self._counts):
+            accumulated += count
+            if accumulated >= rank:
+                upper = self._MIN_LATENCY * 10.0 ** (bucket / self._BUCKETS_PER_DECADE)
+                return min(upper, self._max)
+        return self._max
+
+
+class StreamStats():
+    # Count the messages of a stream and the latency from their stamps to their arrival
+
+    def __init__(self, budget: float = FRAME_BUDGET):
+        self._sent = 0
+        self._received = 0
+        self._latency = LatencyHistogram(budget)
+        self._first_received = None
+        self._last_received = None
+
+    def add_sent(self, count: int = 1) -> None:
+        self._sent += count
+
+    def add_received(self, latency: float, now: float) -> None:
+        self._received += 1
+        self._latency.record(max(latency, 0.0))
+        if self._first_received is None:
+            self._first_received = now
+        self._last_received = now
+
+    def get_sent(self) -> int:
+        return self._sent
+
+    def get_received(self) -> int:
+        return self._received
+
+    def get_dropped(self) -> int:
+        # Messages still in flight count as dropped until they arrive
+        return max(self._sent - self._received, 0)
+
+    def get_latency(self) -> LatencyHistogram:
+        return self._latency
+
+    def get_throughput(self) -> float:
+        # Return the received messages per second
+        if self._received < 2 or self._last_received == self._first_received:
+            return 0.0
+        return (self._received - 1) / (self._last_received - self._first_received)
+
+
+class Profiler():
+    # Record latency histograms of named sections.
+    # A disabled profiler returns a shared null context, so instrumentation can stay in hot paths.
+
+    _NULL_CONTEXT = contextlib.nullcontext()
+
+    def __init__(self, budget: float = FRAME_BUDGET):
+        self._budget = budget
+        self._enabled = False
+        self._histograms = {}
+        self._lock = threading.Lock()
+
+    def is_enabled(self) -> bool:
+        return self._enabled
+
+    def set_enabled(self, enabled: bool) -> None:
+        self._enabled = enabled
+
+    def measure(self, name: str):
+        if not self._enabled:
+            return self._NULL_CONTEXT
+        return self._measure(name)
+
+    @contextlib.contextmanager
+    def _measure(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - start)
+
+    def record(self, name: str, seconds: float) -> None:
+        # Subscription callbacks record from the executor thread
+        with self._lock:
+            histogram = self._histograms.get(name)
+            if histogram is None:
+                histogram = self._histograms[name] = LatencyHistogram(self._budget)
+            histogram.record(seconds)
+
+    def get_histograms(self) -> dict:
+        with self._lock:
+            return dict(self._histograms)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._histograms = {}
+
+    def summary_text(self) -> str:
+        lines = []
+        for name, histogram in sorted(self.get_histograms().items()):
+            lines.append('{} n={} p50/p99/max={:.1f}/{:.1f}/{:.1f}ms missed={}'.format(
+                name.lstrip('_'), histogram.get_count(),
+                histogram.percentile(50) * 1e3, histogram.percentile(99) * 1e3,
+                histogram.get_max() * 1e3, histogram.get_missed()))
+        return '\n'.join(lines)
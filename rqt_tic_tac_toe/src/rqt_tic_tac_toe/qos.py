@@ -0,0 +1,97 @@
+# Copyright 2023 ShotaAk
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from rclpy.qos import DurabilityPolicy
+from rclpy.qos import HistoryPolicy
+from rclpy.qos import QoSProfile
+from rclpy.qos import ReliabilityPolicy
+
+RELIABILITIES = {
+    'reliable': ReliabilityPolicy.RELIABLE,
+    'best_effort': ReliabilityPolicy.BEST_EFFORT,
+}
+DURABILITIES = {
+    'volatile': DurabilityPolicy.VOLATILE,
+    'transient_local': DurabilityPolicy.TRANSIENT_LOCAL,
+}
+MAX_DEPTH = 1000
+
+COMMAND_STREAM = 'command'
+CURSOR_POS_STREAM = 'cursor_pos'
+STATE_STREAM = 'state'
+STREAMS = [COMMAND_STREAM, CURSOR_POS_STREAM, STATE_STREAM]
+
+
+class StreamQos():
+
+    def __init__(self, reliability: str = 'reliable', durability: str = 'volatile', depth: int = 10):
+        if reliability not in RELIABILITIES:
+            raise ValueError('Unknown reliability: {}'.format(reliability))
+        if durability not in DURABILITIES:
+            raise ValueError('Unknown durability: {}'.format(durability))
+
+        self._reliability = reliability
+        self._durability = durability
+        self._depth = min(max(int(depth), 1), MAX_DEPTH)
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, StreamQos) and \
+            (self._reliability, self._durability, self._depth) == \
+            (other._reliability, other._durability, other._depth)
+
+    def get_reliability(self) -> str:
+        return self._reliability
+
+    def get_durability(self) -> str:
+        return self._durability
+
+    def get_depth(self) -> int:
+        return self._depth
+
+    def to_profile(self) -> QoSProfile:
+        return QoSProfile(
+            history=HistoryPolicy.KEEP_LAST,
+            depth=self._depth,
+            reliability=RELIABILITIES[self._reliability],
+            durability=DURABILITIES[self._durability])
+
+
+# Only the latest cursor position matters, so drop stale ones instead of retransmitting them.
+# Commands and the board are kept for late joiners.
+DEFAULT_STREAM_QOS = {
+    COMMAND_STREAM: StreamQos('reliable', 'transient_local', 10),
+    CURSOR_POS_STREAM: StreamQos('best_effort', 'volatile', 1),
+    STATE_STREAM: StreamQos('reliable', 'transient_local', 1),
+}
+
+
+def save_stream_qos(stream_qos: dict, settings) -> None:
+    for stream, qos in stream_qos.items():
+        settings.set_value('qos_{}_reliability'.format(stream), qos.get_reliability())
+        settings.set_value('qos_{}_durability'.format(stream), qos.get_durability())
+        settings.set_value('qos_{}_depth'.format(stream), qos.get_depth())
+
+
+def restore_stream_qos(settings) -> dict:
+    # Fall back to the default of each stream whose settings are missing or broken
+    stream_qos = {}
+    for stream, default in DEFAULT_STREAM_QOS.items():
+        try:
+            stream_qos[stream] = StreamQos(
+                settings.value('qos_{}_reliability'.format(stream), default.get_reliability()),
+                settings.value('qos_{}_durability'.format(stream), default.get_durability()),
+                int(settings.value('qos_{}_depth'.format(stream), default.get_depth())))
+        except (TypeError, ValueError):
+            stream_qos[stream] = default
+    return stream_qos
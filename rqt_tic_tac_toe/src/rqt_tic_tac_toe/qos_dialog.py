@@ -0,0 +1,72 @@
+# Copyright 2023 ShotaAk
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from python_qt_binding.QtWidgets import QComboBox
+from python_qt_binding.QtWidgets import QDialog
+from python_qt_binding.QtWidgets import QDialogButtonBox
+from python_qt_binding.QtWidgets import QGridLayout
+from python_qt_binding.QtWidgets import QLabel
+from python_qt_binding.QtWidgets import QSpinBox
+from python_qt_binding.QtWidgets import QVBoxLayout
+from rqt_tic_tac_toe.qos import DURABILITIES
+from rqt_tic_tac_toe.qos import MAX_DEPTH
+from rqt_tic_tac_toe.qos import RELIABILITIES
+from rqt_tic_tac_toe.qos import StreamQos
+
+
+class QosDialog(QDialog):
+
+    def __init__(self, stream_qos: dict, parent=None):
+        super(QosDialog, self).__init__(parent)
+        self.setWindowTitle('QoS Settings')
+
+        layout = QGridLayout()
+        for col, title in enumerate(['Topic', 'Reliability', 'Durability', 'Depth']):
+            layout.addWidget(QLabel(title), 0, col)
+
+        # Widgets of each stream in the order of reliability, durability and depth
+        self._widgets = {}
+        for row, (stream, qos) in enumerate(sorted(stream_qos.items()), start=1):
+            reliability = QComboBox()
+            reliability.addItems(list(RELIABILITIES))
+            reliability.setCurrentText(qos.get_reliability())
+            durability = QComboBox()
+            durability.addItems(list(DURABILITIES))
+            durability.setCurrentText(qos.get_durability())
+            depth = QSpinBox()
+            depth.setRange(1, MAX_DEPTH)
+            depth.setValue(qos.get_depth())
+
+            layout.addWidget(QLabel(stream), row, 0)
+            layout.addWidget(reliability, row, 1)
+            layout.addWidget(durability, row, 2)
+            layout.addWidget(depth, row, 3)
+            self._widgets[stream] = (reliability, durability, depth)
+
+        note = QLabel('Every player and the match server need compatible settings.')
+        note.setWordWrap(True)
+
+        buttons = QDialogButtonBox(QDialogButtonBox.Ok | QDialogButtonBox.Cancel)
+        buttons.accepted.connect(self.accept)
+        buttons.rejected.connect(self.reject)
+
+        main_layout = QVBoxLayout()
+        main_layout.addLayout(layout)
+        main_layout.addWidget(note)
+        main_layout.addWidget(buttons)
+        self.setLayout(main_layout)
+
+    def get_stream_qos(self) -> dict:
+        return {stream: StreamQos(reliability.currentText(), durability.currentText(), depth.value())
+                for stream, (reliability, durability, depth) in self._widgets.items()}
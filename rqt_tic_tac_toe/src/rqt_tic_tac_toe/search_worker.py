@@ -0,0 +1,178 @@
+# Copyright 2023 ShotaAk
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+import pickle
+import subprocess
+import sys
+import threading
+
+# Kinds of searches
+HINTS = 'hints'
+MOVE = 'move'
+
+# The worker yields the CPU to the plugin when they share a core
+_WORKER_NICENESS = 10
+
+
+def board_snapshot(game) -> tuple:
+    # The board is copied when a search starts, as the game keeps changing in the plugin
+    return (game.get_board_size(), game.get_win_length(),
+            game.get_board_markers().tolist(), game.get_present_marker())
+
+
+def load_board_snapshot(snapshot: tuple):
+    from rqt_tic_tac_toe.match import create_game
+    board_size, win_length, board, present_marker = snapshot
+    game = create_game(board_size, win_length)
+    game.load_board_markers(board, present_marker)
+    return game
+
+
+def _run_search(kind: str, snapshot: tuple, argument, should_stop, player):
+    # Yield the results of a search as they improve
+    if kind == HINTS:
+        from rqt_tic_tac_toe.hint import analyze_progressively
+        yield from analyze_progressively(snapshot, argument, should_stop, player)
+    elif kind == MOVE:
+        move = player.choose_move(load_board_snapshot(snapshot), argument, should_stop)
+        if not should_stop():
+            yield move
+
+
+class SearchWorker():
+    # Search boards in a worker process and pass each result to callback(generation, result).
+    # callback is called from a reader thread, not from the thread calling search.
+    # A new search or cancel() abandons the running search, even in the middle of a depth.
+
+    def __init__(self, callback):
+        self._callback = callback
+        self._lock = threading.Lock()
+        self._generation = 0
+        self._process = None
+
+    def get_generation(self) -> int:
+        with self._lock:
+            return self._generation
+
+    def search(self, kind: str, game, argument) -> int:
+        # Start searching a copy of the game and return the generation of the results
+        with self._lock:
+            self._generation += 1
+            self._send((self._generation, kind, board_snapshot(game), argument))
+            return self._generation
+
+    def cancel(self) -> None:
+        with self._lock:
+            self._generation += 1
+            if self._process is not None:
+                self._send((self._generation, None, None, None))
+
+    def shutdown(self) -> None:
+        with self._lock:
+            self._generation += 1
+            if self._process is None:
+                return
+            # The worker exits when its requests are closed
+            try:
+                self._process.stdin.close()
+            except OSError:
+                pass
+            self._process = None
+
+    def _send(self, request: tuple) -> None:
+        if self._process is None or self._process.poll() is not None:
+            self._start_worker()
+        try:
+            pickle.dump(request, self._process.stdin)
+            self._process.stdin.flush()
+        except OSError:
+            # The worker died, and the next request starts a new one
+            self._process = None
+
+    def _start_worker(self) -> None:
+        # The worker runs in its own interpreter, as forking is unsafe with the threads of
+        # rclpy and Qt, and multiprocessing would run the main script of rqt again
+        self._process = subprocess.Popen(
+            [sys.executable, '-m', 'rqt_tic_tac_toe.search_worker'],
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE)
+        thread = threading.Thread(
+            target=self._read_results, args=(self._process.stdout,), daemon=True)
+        thread.start()
+
+    def _read_results(self, results) -> None:
+        while True:
+            try:
+                generation, result = pickle.load(results)
+            except (EOFError, OSError, pickle.UnpicklingError):
+                return
+            # Drop the results of boards that have changed since
+            if generation == self.get_generation():
+                self._callback(generation, result)
+
+
+def _worker_main() -> int:
+    # Search the latest requested board, and abandon it as soon as another request arrives
+    from rqt_tic_tac_toe.alpha_beta import AlphaBetaPlayer
+    requests = sys.stdin.buffer
+    results = sys.stdout.buffer
+    # Keep anything printed off the results
+    sys.stdout = sys.stderr
+    if hasattr(os, 'nice'):
+        os.nice(_WORKER_NICENESS)
+
+    condition = threading.Condition()
+    latest = [None]
+    closed = [False]
+
+    def read_requests():
+        while True:
+            try:
+                request = pickle.load(requests)
+            except (EOFError, OSError, pickle.UnpicklingError):
+                request = None
+            with condition:
+                if request is None:
+                    closed[0] = True
+                else:
+                    latest[0] = request
+                condition.notify()
+            if request is None:
+                return
+
+    threading.Thread(target=read_requests, daemon=True).start()
+
+    player = AlphaBetaPlayer()
+    handled = None
+    while True:
+        with condition:
+            condition.wait_for(lambda: closed[0] or latest[0] is not handled)
+            if closed[0]:
+                return 0
+            request = handled = latest[0]
+
+        generation, kind, snapshot, argument = request
+        if kind is None:
+            continue
+
+        def should_stop():
+            return closed[0] or latest[0] is not request
+
+        for result in _run_search(kind, snapshot, argument, should_stop, player):
+            pickle.dump((generation, result), results)
+            results.flush()
+
+
+if __name__ == '__main__':
+    sys.exit(_worker_main())
@@ -0,0 +1,101 @@
+# Copyright 2023 ShotaAk
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import numpy
+from rqt_tic_tac_toe.marker import Marker
+
+# How to handle a received command
+DELTA_APPLY = 0
+DELTA_STALE = 1
+DELTA_GAP = 2
+
+_CELLS_PER_BYTE = 4
+_BITS_PER_CELL = 2
+
+
+def pack_cells(board: numpy.ndarray) -> bytes:
+    # Pack markers in 2 bits per cell, row-major, 4 cells per byte from the low bits
+    cells = numpy.asarray(board, dtype=numpy.uint8).ravel()
+    padding = (-len(cells)) % _CELLS_PER_BYTE
+    cells = numpy.concatenate([cells, numpy.zeros(padding, dtype=numpy.uint8)])
+    cells = cells.reshape(-1, _CELLS_PER_BYTE)
+    packed = numpy.zeros(len(cells), dtype=numpy.uint8)
+    for i in range(_CELLS_PER_BYTE):
+        packed |= cells[:, i] << (i * _BITS_PER_CELL)
+    return packed.tobytes()
+
+
+def unpack_cells(data: bytes, board_size: int) -> numpy.ndarray:
+    packed = numpy.frombuffer(bytes(data), dtype=numpy.uint8)
+    count = board_size * board_size
+    if len(packed) * _CELLS_PER_BYTE < count:
+        raise ValueError('{} bytes are too short for a board size of {}'.format(
+            len(packed), board_size))
+
+    cells = numpy.empty((len(packed), _CELLS_PER_BYTE), dtype=numpy.uint8)
+    for i in range(_CELLS_PER_BYTE):
+        cells[:, i] = (packed >> (i * _BITS_PER_CELL)) & 0b11
+    return cells.ravel()[:count].astype(int).reshape((board_size, board_size))
+
+
+def unpack_board_state(state, board_sizes: range, win_lengths: range) -> numpy.ndarray:
+    # Check a BoardState received from the network and return its board.
+    # Raise ValueError if it can not be loaded.
+    if state.board_size not in board_sizes:
+        raise ValueError('unsupported board size {}'.format(state.board_size))
+    if state.win_length not in win_lengths:
+        raise ValueError('unsupported win length {}'.format(state.win_length))
+    if state.present_marker not in (Marker.O, Marker.X):
+        raise ValueError('invalid present marker {}'.format(state.present_marker))
+    board = unpack_cells(state.cells, state.board_size)
+    if not numpy.isin(board, (Marker.NONE, Marker.O, Marker.X)).all():
+        raise ValueError('invalid markers on the board')
+    return board
+
+
+def classify_delta(epoch: int, sequence: int, local_epoch: int, local_sequence: int) -> int:
+    # A command can be applied only if it is the next move of the same game.
+    # Commands of a newer game or beyond the next move mean that messages were lost.
+    if epoch > local_epoch:
+        return DELTA_GAP
+    if epoch < local_epoch or sequence <= local_sequence:
+        return DELTA_STALE
+    if sequence > local_sequence + 1:
+        return DELTA_GAP
+    return DELTA_APPLY
+
+
+def classify_history_delta(epoch: int, sequence: int, local_epoch: int,
+                           local_sequence: int, step: int) -> int:
+    # Undo and redo start a new epoch, so they apply only to the epoch right before them.
+    # step is the change of the number of markers, -1 for undo and 1 for redo.
+    if epoch <= local_epoch:
+        return DELTA_STALE
+    if epoch > local_epoch + 1 or sequence != local_sequence + step:
+        return DELTA_GAP
+    return DELTA_APPLY
+
+
+def is_newer_snapshot(epoch: int, sequence: int, local_epoch: int, local_sequence: int) -> bool:
+    return (epoch, sequence) > (local_epoch, local_sequence)
+
+
+def fill_board_state(state, game, epoch: int) -> None:
+    # Fill a BoardState message with the present game
+    state.epoch = epoch
+    state.sequence = game.get_move_count()
+    state.board_size = game.get_board_size()
+    state.win_length = game.get_win_length()
+    state.present_marker = game.get_present_marker()
+    state.cells = pack_cells(game.get_board_markers())
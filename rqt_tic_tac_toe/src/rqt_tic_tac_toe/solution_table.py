@@ -0,0 +1,299 @@
+# Copyright 2023 ShotaAk
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import argparse
+import functools
+import os
+import struct
+import sys
+
+import numpy
+from rqt_tic_tac_toe.bitboard_game import board_to_bitmasks
+from rqt_tic_tac_toe.bitboard_game import cell_line_masks
+from rqt_tic_tac_toe.marker import Marker
+from rqt_tic_tac_toe.symmetry import board_symmetries
+from rqt_tic_tac_toe.symmetry import inverse_board_symmetries
+
+# A solution table file is a header followed by an open addressing hash table.
+# Keys are base-3 codes of the canonical board, where 1 is a stone of the first player
+# and 2 is a stone of the second player. Values are the game-theoretic value for the
+# player to move (1: win, 0: draw, -1: loss) and the bitmask of the best moves
+# on the canonical board.
+MAGIC = b'TTTS'
+VERSION = 1
+HEADER_FORMAT = '<4sIIIQ'
+HEADER_SIZE = struct.calcsize(HEADER_FORMAT)
+ENTRY_DTYPE = numpy.dtype([('key', '<u8'), ('value', 'i1'), ('moves', '<u8')])
+EMPTY_KEY = 0xFFFFFFFFFFFFFFFF
+
+# Keys and move bitmasks must fit in 64 bits
+MAX_BOARD_SIZE = 6
+
+_HASH_MULTIPLIER = 0x9E3779B97F4A7C15
+_UINT64_MASK = 0xFFFFFFFFFFFFFFFF
+
+
+def default_directory() -> str:
+    ros_home = os.environ.get('ROS_HOME', os.path.join(os.path.expanduser('~'), '.ros'))
+    return os.path.join(ros_home, 'rqt_tic_tac_toe')
+
+
+def default_path(board_size: int, directory: str = None) -> str:
+    return os.path.join(
+        directory or default_directory(), 'solution_{0}x{0}.bin'.format(board_size))
+
+
+def _slot(key: int, capacity: int) -> int:
+    # Fibonacci hashing; capacity is a power of two
+    return ((key * _HASH_MULTIPLIER) & _UINT64_MASK) >> (64 - capacity.bit_length() + 1)
+
+
+@functools.lru_cache(maxsize=None)
+def _code_weights(board_size: int) -> tuple:
+    # Return the base-3 weight of each cell, indexed by [symmetry][cell]
+    return tuple(
+        tuple(3 ** permutation[cell] for cell in range(board_size * board_size))
+        for permutation in board_symmetries(board_size))
+
+
+def _codes(board_size: int, first: int, second: int) -> list:
+    weights = _code_weights(board_size)
+    codes = [0] * len(weights)
+    for color, stones in ((1, first), (2, second)):
+        while stones:
+            bit = stones & -stones
+            cell = bit.bit_length() - 1
+            for index, symmetry_weights in enumerate(weights):
+                codes[index] += color * symmetry_weights[cell]
+            stones ^= bit
+    return codes
+
+
+def solve(board_size: int) -> dict:
+    # Solve every position reachable from the empty board.
+    # Return a dict of canonical key to (value, canonical best-move bitmask).
+    if board_size < 2 or board_size > MAX_BOARD_SIZE:
+        raise ValueError('board_size must be between 2 and {}'.format(MAX_BOARD_SIZE))
+
+    full = (1 << (board_size * board_size)) - 1
+    cell_masks = tuple(
+        tuple(mask for mask, _ in lines) for lines in cell_line_masks(board_size))
+    weights = _code_weights(board_size)
+    symmetries = board_symmetries(board_size)
+    solutions = {}
+
+    def _solve(own: int, opp: int, codes: list, color: int, lost: bool) -> int:
+        # own is the player to move with the color (1 or 2) in the codes
+        key = min(codes)
+        solution = solutions.get(key)
+        if solution is not None:
+            return solution[0]
+
+        if lost:
+            solutions[key] = (-1, 0)
+            return -1
+        empty = full & ~(own | opp)
+        if not empty:
+            solutions[key] = (0, 0)
+            return 0
+
+        symmetry = codes.index(key)
+        best_value = -2
+        best_moves = 0
+        while empty:
+            bit = empty & -empty
+            cell = bit.bit_length() - 1
+            empty ^= bit
+
+            stones = own | bit
+            won = any(stones & mask == mask for mask in cell_masks[cell])
+            child_codes = [
+                code + color * symmetry_weights[cell]
+                for code, symmetry_weights in zip(codes, weights)]
+            value = -_solve(opp, stones, child_codes, 3 - color, won)
+
+            canonical_bit = 1 << symmetries[symmetry][cell]
+            if value > best_value:
+                best_value = value
+                best_moves = canonical_bit
+            elif value == best_value:
+                best_moves |= canonical_bit
+
+        solutions[key] = (best_value, best_moves)
+        return best_value
+
+    _solve(0, 0, [0] * len(symmetries), 1, False)
+    return solutions
+
+
+def write_solution_table(path: str, board_size: int, solutions: dict = None) -> int:
+    # Write the solution table of board_size to path and return the number of positions
+    if solutions is None:
+        solutions = solve(board_size)
+
+    # Keep the load factor at or below 0.5
+    capacity = 1 << max(len(solutions) * 2 - 1, 1).bit_length()
+    entries = numpy.zeros(capacity, dtype=ENTRY_DTYPE)
+    entries['key'] = EMPTY_KEY
+    for key, (value, moves) in solutions.items():
+        slot = _slot(key, capacity)
+        while entries['key'][slot] != EMPTY_KEY:
+            slot = (slot + 1) & (capacity - 1)
+        entries[slot] = (key, value, moves)
+
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    # Write to a temporary file so that readers never map a partial table
+    temporary_path = path + '.tmp'
+    with open(temporary_path, 'wb') as f:
+        f.write(struct.pack(HEADER_FORMAT, MAGIC, VERSION, board_size, 0, capacity))
+        entries.tofile(f)
+    os.replace(temporary_path, path)
+    return len(solutions)
+
+
+class SolutionTable():
+    # Perfect-play lookup backed by a memory-mapped solution table file
+
+    def __init__(self, path: str):
+        with open(path, 'rb') as f:
+            magic, version, board_size, _, capacity = struct.unpack(
+                HEADER_FORMAT, f.read(HEADER_SIZE))
+        if magic != MAGIC or version != VERSION:
+            raise ValueError('{} is not a solution table'.format(path))
+
+        self._BOARD_SIZE = board_size
+        self._capacity = capacity
+        self._entries = numpy.memmap(
+            path, dtype=ENTRY_DTYPE, mode='r', offset=HEADER_SIZE, shape=(capacity,))
+        self._inverse_symmetries = inverse_board_symmetries(board_size)
+        self._cell_masks = tuple(
+            tuple(mask for mask, _ in lines) for lines in cell_line_masks(board_size))
+
+    def get_board_size(self) -> int:
+        return self._BOARD_SIZE
+
+    def _find(self, own: int, opp: int) -> tuple:
+        # Return the slot of the position with own to move, or None, and its symmetric codes.
+        # The first player is to move when both players have the same number of stones.
+        if own.bit_count() == opp.bit_count():
+            codes = _codes(self._BOARD_SIZE, own, opp)
+        else:
+            codes = _codes(self._BOARD_SIZE, opp, own)
+        key = min(codes)
+
+        slot = _slot(key, self._capacity)
+        while True:
+            entry_key = int(self._entries['key'][slot])
+            if entry_key == EMPTY_KEY:
+                return None, codes
+            if entry_key == key:
+                return slot, codes
+            slot = (slot + 1) & (self._capacity - 1)
+
+    def lookup(self, game):
+        # Return the value for the player to move and the list of best (row, col) moves,
+        # or None if the position is not in the table
+        if game.get_board_size() != self._BOARD_SIZE:
+            return None
+
+        own, opp = board_to_bitmasks(game.get_board_markers(), game.get_present_marker())
+        slot, codes = self._find(own, opp)
+        if slot is None:
+            return None
+
+        inverse = self._inverse_symmetries[codes.index(min(codes))]
+        moves = int(self._entries['moves'][slot])
+        best_moves = []
+        while moves:
+            bit = moves & -moves
+            best_moves.append(divmod(inverse[bit.bit_length() - 1], self._BOARD_SIZE))
+            moves ^= bit
+        return int(self._entries['value'][slot]), sorted(best_moves)
+
+    def lookup_moves(self, game):
+        # Return the value of every empty (row, col) for the player to move,
+        # or None if a position after them is not in the table
+        if game.get_board_size() != self._BOARD_SIZE:
+            return None
+
+        own, opp = board_to_bitmasks(game.get_board_markers(), game.get_present_marker())
+        full = (1 << (self._BOARD_SIZE * self._BOARD_SIZE)) - 1
+        values = {}
+        for cell in range(self._BOARD_SIZE * self._BOARD_SIZE):
+            if (own | opp) & (1 << cell):
+                continue
+            stones = own | (1 << cell)
+            if any(stones & mask == mask for mask in self._cell_masks[cell]):
+                value = 1
+            elif stones | opp == full:
+                value = 0
+            else:
+                slot, _ = self._find(opp, stones)
+                if slot is None:
+                    return None
+                value = -int(self._entries['value'][slot])
+            values[divmod(cell, self._BOARD_SIZE)] = value
+        return values
+
+    def choose_move(self, game, time_limit: float = 0.0):
+        # Return a best (row, col) move, preferring moves that win at once
+        winner, _ = game.calc_winner()
+        if winner != Marker.NONE or game.board_is_full():
+            return None
+
+        solution = self.lookup(game)
+        if solution is None or not solution[1]:
+            return None
+
+        own, _ = board_to_bitmasks(game.get_board_markers(), game.get_present_marker())
+        for row, col in solution[1]:
+            cell = row * self._BOARD_SIZE + col
+            stones = own | (1 << cell)
+            if any(stones & mask == mask for mask in self._cell_masks[cell]):
+                return row, col
+        return solution[1][0]
+
+
+def load_solution_table(board_size: int, directory: str = None):
+    # Return the solution table of board_size in directory, or None if it has not been generated.
+    # Only loaded tables are cached, so that a table generated later is found on the next call.
+    path = default_path(board_size, directory)
+    if not os.path.exists(path):
+        return None
+    return _open_solution_table(path)
+
+
+@functools.lru_cache(maxsize=None)
+def _open_solution_table(path: str) -> SolutionTable:
+    return SolutionTable(path)
+
+
+def main(argv: list = None):
+    parser = argparse.ArgumentParser(
+        description='Generate perfect-play solution tables for Tic-Tac-Toe.')
+    parser.add_argument('board_sizes', type=int, nargs='+', help='board sizes to solve')
+    parser.add_argument('--output-dir', default=None,
+                        help='output directory (default: {})'.format(default_directory()))
+    args = parser.parse_args(argv)
+
+    for board_size in args.board_sizes:
+        path = default_path(board_size, args.output_dir)
+        positions = write_solution_table(path, board_size)
+        print('{}x{}: {} positions -> {}'.format(board_size, board_size, positions, path))
+
+
+if __name__ == '__main__':
+    sys.exit(main())
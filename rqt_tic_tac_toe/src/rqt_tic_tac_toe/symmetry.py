@@ -0,0 +1,54 @@
+# Copyright 2023 ShotaAk
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import functools
+
+
+@functools.lru_cache(maxsize=None)
+def board_symmetries(board_size: int) -> tuple:
+    # Return the 8 symmetries of a square board (rotations and reflections)
+    # as permutations that map a cell index (row * board_size + col) to its transformed index.
+    # The first permutation is the identity.
+    last = board_size - 1
+    transforms = [
+        lambda row, col: (row, col),
+        lambda row, col: (col, last - row),
+        lambda row, col: (last - row, last - col),
+        lambda row, col: (last - col, row),
+        lambda row, col: (row, last - col),
+        lambda row, col: (last - row, col),
+        lambda row, col: (col, row),
+        lambda row, col: (last - col, last - row),
+    ]
+
+    permutations = []
+    for transform in transforms:
+        permutation = [0] * (board_size * board_size)
+        for row in range(board_size):
+            for col in range(board_size):
+                t_row, t_col = transform(row, col)
+                permutation[row * board_size + col] = t_row * board_size + t_col
+        permutations.append(tuple(permutation))
+    return tuple(permutations)
+
+
+@functools.lru_cache(maxsize=None)
+def inverse_board_symmetries(board_size: int) -> tuple:
+    inverses = []
+    for permutation in board_symmetries(board_size):
+        inverse = [0] * len(permutation)
+        for cell, transformed in enumerate(permutation):
+            inverse[transformed] = cell
+        inverses.append(tuple(inverse))
+    return tuple(inverses)
@@ -15,21 +15,67 @@
 # limitations under the License.
 
 import os
+import time
 
 from ament_index_python.packages import get_package_share_directory
+from diagnostic_msgs.msg import DiagnosticArray
+from diagnostic_msgs.msg import DiagnosticStatus
+from diagnostic_msgs.msg import KeyValue
+import numpy
 from python_qt_binding import loadUi
 from python_qt_binding.QtCore import QTimer
+from python_qt_binding.QtCore import Signal
+from python_qt_binding.QtWidgets import QFileDialog
 from python_qt_binding.QtWidgets import QWidget
 from rqt_gui_py.plugin import Plugin
 from rqt_tic_tac_toe.board_widget import BoardWidget
-from rqt_tic_tac_toe.game import Game
+from rqt_tic_tac_toe.command_queue import CommandQueue
+from rqt_tic_tac_toe.cursor_throttle import CursorThrottle
+from rqt_tic_tac_toe.marker import Marker
+from rqt_tic_tac_toe.match import create_game
+from rqt_tic_tac_toe.match import LOBBY_TOPIC
+from rqt_tic_tac_toe.match import match_namespace
+from rqt_tic_tac_toe.match import player_marker
+from rqt_tic_tac_toe.profiler import Profiler
+from rqt_tic_tac_toe.qos import COMMAND_STREAM
+from rqt_tic_tac_toe.qos import CURSOR_POS_STREAM
+from rqt_tic_tac_toe.qos import DEFAULT_STREAM_QOS
+from rqt_tic_tac_toe.qos import restore_stream_qos
+from rqt_tic_tac_toe.qos import save_stream_qos
+from rqt_tic_tac_toe.qos import STATE_STREAM
+from rqt_tic_tac_toe.snapshot import classify_delta
+from rqt_tic_tac_toe.snapshot import classify_history_delta
+from rqt_tic_tac_toe.snapshot import DELTA_APPLY
+from rqt_tic_tac_toe.snapshot import DELTA_GAP
+from rqt_tic_tac_toe.snapshot import fill_board_state
+from rqt_tic_tac_toe.snapshot import is_newer_snapshot
+from rqt_tic_tac_toe.snapshot import unpack_board_state
+from rqt_tic_tac_toe_msgs.msg import BoardState
 from rqt_tic_tac_toe_msgs.msg import Command
 from rqt_tic_tac_toe_msgs.msg import CursorPos
-from rqt_tic_tac_toe_msgs.msg import Marker
+from rqt_tic_tac_toe_msgs.msg import MatchRequest
+from rqt_tic_tac_toe_msgs.msg import StateRequest
 
 
 class TicTacToe(Plugin):
 
+    _AI_OPPONENT = 'AI'
+    _SERVER_OPPONENT = 'Server'
+    _NO_SYNC_ID = 'NONE'
+    _TOPIC_NAMESPACE = 'tic_tac_toe'
+    _AI_TIME_LIMIT = 0.5
+    _PROFILE_REPORT_INTERVAL = 1000  # ms
+    _COMMAND_DRAIN_INTERVAL = 16  # ms, once per frame
+
+    # Subscription callbacks run outside the Qt thread, so hand received messages over via signals
+    _commands_received = Signal()
+    _cursor_pos_received = Signal(object)
+    _state_received = Signal(object)
+    _state_request_received = Signal(object)
+    _match_request_received = Signal(object)
+    _hints_received = Signal(int, int, object)
+    _ai_move_received = Signal(int, object)
+
     def __init__(self, context):
         super(TicTacToe, self).__init__(context)
         self.setObjectName('TicTacToe')
@@ -37,6 +83,9 @@ class TicTacToe(Plugin):
         self._node = context.node
         self._logger = self._node.get_logger()
 
+        # Profiling is off by default and costs a null context per section
+        self._profiler = Profiler()
+
         self._widget = QWidget()
         ui_file = os.path.join(get_package_share_directory('rqt_tic_tac_toe'),
                                'resource', 'TicTacToeWidget.ui')
@@ -48,56 +97,259 @@ class TicTacToe(Plugin):
                 self._widget.windowTitle() + (' (%d)' % context.serial_number()))
         context.add_widget(self._widget)
 
-        self._game = Game(
-            board_size=self._widget.BoardSizeSpinBox.value(),
-            first_marker=Marker.O)
+        self._game = self._create_game()
+        # Incremented on every reset, undo and redo so that moves of an old board are never applied
+        self._epoch = 0
         self._widget.BoardWidget.set_board_size(self._game.get_board_size())
+        self._widget.BoardWidget.set_profiler(self._profiler)
 
         self._widget.ResetButton.clicked.connect(self._reset_game)
-
-        self._command_publisher = self._node.create_publisher(Command, 'tic_tac_toe/command', 10)
-        self._cursor_pos_publisher = self._node.create_publisher(CursorPos, 'tic_tac_toe/cursor_pos', 10)
-        self._command_subscription = self._node.create_subscription(
-            Command, 'tic_tac_toe/command', self._command_callback, 10)
-        self._cursor_pos_subscription = self._node.create_subscription(
-            CursorPos, 'tic_tac_toe/cursor_pos', self._cursor_pos_callback, 10)
-
-        # Update board_widget at 60 Hz
-        self._timer = QTimer()
-        self._timer.timeout.connect(self._update_game)
-        self._timer.timeout.connect(self._widget.BoardWidget.update)
-        self._timer.timeout.connect(self._update_ui)
-        self._timer.timeout.connect(self._publish_cursor_pos)
-        self._timer.start(16)
+        self._widget.UndoButton.clicked.connect(self._undo_move)
+        self._widget.RedoButton.clicked.connect(self._redo_move)
+        self._widget.BoardWidget.clicked.connect(self._board_clicked)
+        self._widget.BoardWidget.mouse_moved.connect(self._mouse_moved)
+        self._widget.FrameIDLineEdit.textChanged.connect(self._set_frame_id)
+        self._widget.ProfilingCheckBox.toggled.connect(self._set_profiling_enabled)
+        self._widget.HintsCheckBox.toggled.connect(self._set_hints_enabled)
+        self._widget.SyncIDComboBox.currentTextChanged.connect(self._sync_id_changed)
+        self._widget.OpponentComboBox.currentTextChanged.connect(self._opponent_changed)
+        self._frame_id = self._widget.FrameIDLineEdit.text()
+        self._commands_received.connect(self._schedule_command_drain)
+        self._cursor_pos_received.connect(self._apply_cursor_pos)
+        self._state_received.connect(self._apply_state)
+        self._state_request_received.connect(self._apply_state_request)
+        self._match_request_received.connect(self._apply_match_request)
+        self._hints_received.connect(self._apply_hints)
+        self._ai_move_received.connect(self._apply_ai_move)
+
+        # Game topics live in the global namespace, or in the namespace of a match on a server
+        self._namespace = None
+        self._command_publisher = None
+        self._cursor_pos_publisher = None
+        self._state_publisher = None
+        self._state_request_publisher = None
+        self._subscriptions = []
+        self._stream_qos = dict(DEFAULT_STREAM_QOS)
+
+        # Received commands are applied in batches so that bursts do not block the Qt thread
+        self._command_queue = CommandQueue()
+        self._command_drain_timer = QTimer()
+        self._command_drain_timer.setSingleShot(True)
+        self._command_drain_timer.setInterval(self._COMMAND_DRAIN_INTERVAL)
+        self._command_drain_timer.timeout.connect(self._drain_commands)
+
+        self._create_ros_interfaces(self._TOPIC_NAMESPACE)
+        self._lobby_publisher = self._node.create_publisher(MatchRequest, LOBBY_TOPIC, 10)
+        self._lobby_subscription = self._node.create_subscription(
+            MatchRequest, LOBBY_TOPIC, self._lobby_callback, 10)
+        self._diagnostics_publisher = self._node.create_publisher(DiagnosticArray, 'diagnostics', 10)
+
+        # The AI, the QoS dialog and the game records are loaded on first use to keep startup fast.
+        # The AI thinks in a worker process, so the board keeps running meanwhile.
+        self._ai_worker = None
+        # The board the AI is thinking about
+        self._ai_board = None
+
+        # Moves are analyzed in a worker process, so the board never waits for the search
+        self._hint_analyzer = None
+        self._hint_board = None
+
+        # Publish the cursor position only when the mouse moves, and once more when it settles
+        self._cursor_throttle = CursorThrottle()
+        self._cursor_settle_timer = QTimer()
+        self._cursor_settle_timer.setSingleShot(True)
+        self._cursor_settle_timer.timeout.connect(self._settle_cursor_pos)
+
+        self._profile_report_timer = QTimer()
+        self._profile_report_timer.timeout.connect(self._report_profile)
+
+        self._recorder = None
+        self._widget.RecordCheckBox.toggled.connect(self._set_recording_enabled)
+
+        # The board shows a recorded game instead of the present game while replaying
+        self._replay = None
+        self._replay_timer = QTimer()
+        self._replay_timer.timeout.connect(self._step_replay)
+        self._widget.ReplayButton.clicked.connect(self._open_replay)
+        self._widget.ReplaySlider.valueChanged.connect(self._seek_replay)
+        self._widget.ReplaySpeedSpinBox.valueChanged.connect(self._set_replay_speed)
+
+        self._update_game()
 
     def shutdown_plugin(self):
-        pass
+        self._command_drain_timer.stop()
+        if self._ai_worker is not None:
+            self._ai_worker.shutdown()
+            self._ai_worker = None
+        if self._hint_analyzer is not None:
+            self._hint_analyzer.shutdown()
+            self._hint_analyzer = None
+        self._replay_timer.stop()
+        if self._recorder is not None:
+            self._recorder.close()
+            self._recorder = None
+
+    def has_configuration(self):
+        return True
+
+    def trigger_configuration(self):
+        from rqt_tic_tac_toe.qos_dialog import QosDialog
+        dialog = QosDialog(self._stream_qos, self._widget)
+        if dialog.exec_():
+            self._set_stream_qos(dialog.get_stream_qos())
+
+    def _set_stream_qos(self, stream_qos: dict):
+        if stream_qos == self._stream_qos:
+            return
+        self._stream_qos = stream_qos
+        self._create_ros_interfaces(self._namespace)
 
     def save_settings(self, plugin_settings, instance_settings):
-        pass
+        save_stream_qos(self._stream_qos, instance_settings)
+        instance_settings.set_value('cursor_max_rate', self._cursor_throttle.get_max_rate())
+        instance_settings.set_value('cursor_dead_band', self._cursor_throttle.get_dead_band())
+        instance_settings.set_value('cursor_settle_time', self._cursor_throttle.get_settle_time())
+        instance_settings.set_value('profiling', self._profiler.is_enabled())
+        instance_settings.set_value('hints', self._widget.HintsCheckBox.isChecked())
+        instance_settings.set_value('recording', self._recorder is not None)
+        instance_settings.set_value('replay_speed', self._widget.ReplaySpeedSpinBox.value())
 
     def restore_settings(self, plugin_settings, instance_settings):
-        pass
+        self._cursor_throttle = CursorThrottle(
+            max_rate=float(instance_settings.value(
+                'cursor_max_rate', self._cursor_throttle.get_max_rate())),
+            dead_band=float(instance_settings.value(
+                'cursor_dead_band', self._cursor_throttle.get_dead_band())),
+            settle_time=float(instance_settings.value(
+                'cursor_settle_time', self._cursor_throttle.get_settle_time())))
+        # QSettings may return booleans as strings
+        profiling = instance_settings.value('profiling', False) in [True, 'true']
+        self._widget.ProfilingCheckBox.setChecked(profiling)
+        hints = instance_settings.value('hints', False) in [True, 'true']
+        self._widget.HintsCheckBox.setChecked(hints)
+        recording = instance_settings.value('recording', False) in [True, 'true']
+        self._widget.RecordCheckBox.setChecked(recording)
+        self._widget.ReplaySpeedSpinBox.setValue(float(instance_settings.value(
+            'replay_speed', self._widget.ReplaySpeedSpinBox.value())))
+        self._set_stream_qos(restore_stream_qos(instance_settings))
 
     def _update_ui(self):
-        self._widget.GameStatusLabel.setText(
-            self._game_status_text())
+        with self._profiler.measure('_update_ui'):
+            self._widget.GameStatusLabel.setText(
+                self._game_status_text())
+            # The match server holds the board of the match, so its moves can not be taken back
+            editable = not self._on_server() and self._replay is None
+            self._widget.UndoButton.setEnabled(editable and self._game.can_undo())
+            self._widget.RedoButton.setEnabled(editable and self._game.can_redo())
 
     def _update_game(self):
-        winner, winner_line = self._game.calc_winner()
-        if winner != Marker.NONE:
-            self._widget.BoardWidget.set_winner_line(winner_line)
-        self._widget.BoardWidget.set_board_markers(self._game.get_board_markers())
+        with self._profiler.measure('_update_game'):
+            winner, winner_line = self._game.calc_winner()
+            if winner != Marker.NONE:
+                self._widget.BoardWidget.set_winner_line(winner_line)
+            self._widget.BoardWidget.set_board_markers(self._game.get_board_markers())
+            self._update_hints()
+            self._update_ui()
+
+    def _board_clicked(self, row: int, col: int):
+        winner, _ = self._game.calc_winner()
+        if winner != Marker.NONE or self._game.board_is_full() or self._replay is not None or \
+           self._ai_is_thinking():
+            return
 
-        if winner != Marker.NONE or self._game.board_is_full():
+        present_marker = self._game.get_present_marker()
+        # The match server accepts only the moves of the player's own marker
+        if self._on_server() and present_marker != player_marker(
+                self._frame_id, self._widget.SyncIDComboBox.currentText()):
+            return
+
+        if self._game.set_marker(row, col):
+            self._record_move(row, col, present_marker)
+            self._publish_command(row, col, present_marker)
+            self._publish_state()
+            self._update_game()
+
+            if self._widget.OpponentComboBox.currentText() == self._AI_OPPONENT:
+                self._play_ai_move()
+
+    def _ai_board_key(self) -> tuple:
+        return (self._epoch, self._game.get_board_size(), self._game.get_win_length(),
+                self._game.get_move_count(), self._game.get_hash())
+
+    def _ai_is_thinking(self) -> bool:
+        return self._ai_board is not None and self._ai_board == self._ai_board_key()
+
+    def _play_ai_move(self):
+        winner, _ = self._game.calc_winner()
+        if winner != Marker.NONE or self._game.board_is_full() or self._replay is not None:
             return
 
-        clicked_pos = self._widget.BoardWidget.pop_mouse_clicked_pos()
-        if clicked_pos[0] < 0 or clicked_pos[1] < 0:
+        if self._ai_worker is None:
+            from rqt_tic_tac_toe.search_worker import SearchWorker
+            self._ai_worker = SearchWorker(self._ai_move_received.emit)
+        from rqt_tic_tac_toe.search_worker import MOVE
+        self._ai_board = self._ai_board_key()
+        self._ai_worker.search(MOVE, self._game, self._AI_TIME_LIMIT)
+
+    def _apply_ai_move(self, generation: int, move: tuple):
+        # The board may have changed while the AI was thinking, such as by a reset or an undo
+        if self._ai_worker is None or generation != self._ai_worker.get_generation() or \
+           not self._ai_is_thinking():
             return
+        self._ai_board = None
+        if move is None or self._replay is not None or \
+           self._widget.OpponentComboBox.currentText() != self._AI_OPPONENT:
+            return
+
         present_marker = self._game.get_present_marker()
-        if self._game.set_marker(clicked_pos[0], clicked_pos[1]):
-            self._publish_command(clicked_pos[0], clicked_pos[1], present_marker)
+        if self._game.set_marker(move[0], move[1]):
+            self._record_move(move[0], move[1], present_marker)
+            self._publish_command(move[0], move[1], present_marker)
+            self._publish_state()
+            self._update_game()
+
+    def _history_steps(self) -> int:
+        # The player moves first against the AI, so its replies follow the player's moves.
+        # Take back or set again both so that the player moves next.
+        if self._widget.OpponentComboBox.currentText() == self._AI_OPPONENT and \
+           self._game.get_move_count() % 2 == 0:
+            return 2
+        return 1
+
+    def _undo_move(self):
+        if self._on_server() or self._replay is not None or not self._game.can_undo():
+            return
+
+        for _ in range(self._history_steps()):
+            move = self._game.undo()
+            if move is None:
+                break
+            self._epoch += 1
+            self._publish_command(move[0], move[1], self._game.get_present_marker(), Command.UNDO)
+        self._publish_state()
+        self._history_changed()
+        self._update_game()
+
+    def _redo_move(self):
+        if self._on_server() or self._replay is not None or not self._game.can_redo():
+            return
+
+        for _ in range(self._history_steps()):
+            present_marker = self._game.get_present_marker()
+            move = self._game.redo()
+            if move is None:
+                break
+            self._epoch += 1
+            self._publish_command(move[0], move[1], present_marker, Command.REDO)
+        self._publish_state()
+        self._history_changed()
+        self._update_game()
+
+    def _history_changed(self):
+        # A game record has no way to take back moves, so it ends at the first undo
+        if self._recorder is not None:
+            self._recorder.stop_game()
+        self._widget.BoardWidget.reset_winner_line()
 
     def _game_status_text(self):
         winner, winner_line = self._game.calc_winner()
@@ -111,56 +363,557 @@ class TicTacToe(Plugin):
 
         return 'Present: {}'.format(present_marker)
 
+    def _create_game(self):
+        return create_game(self._widget.BoardSizeSpinBox.value(),
+                           self._widget.WinLengthSpinBox.value())
+
     def _reset_game(self):
-        self._game = self._game.create_new_game(
-            board_size=self._widget.BoardSizeSpinBox.value(),
-            first_marker=Marker.O)
+        self._stop_replay()
+        self._game = self._create_game()
+        self._epoch += 1
+        self._start_recording_game()
+        self._publish_state()
+        if self._on_server():
+            self._publish_match_request(reset=True)
         self._widget.BoardWidget.set_board_size(self._game.get_board_size())
         self._widget.BoardWidget.set_board_markers(self._game.get_board_markers())
         self._widget.BoardWidget.reset_winner_line()
-        self._widget.BoardWidget.pop_mouse_clicked_pos()
         self._widget.BoardWidget.reset_sync_mouse_cursor_pos()
+        self._update_game()
+
+    def _set_frame_id(self, frame_id: str):
+        self._frame_id = frame_id
+        self._update_match()
+
+    def _on_server(self) -> bool:
+        return self._widget.OpponentComboBox.currentText() == self._SERVER_OPPONENT
+
+    def _create_ros_interfaces(self, namespace: str):
+        # Recreate the game topics in the given namespace
+        for publisher in [self._command_publisher, self._cursor_pos_publisher,
+                          self._state_publisher, self._state_request_publisher]:
+            if publisher is not None:
+                self._node.destroy_publisher(publisher)
+        for subscription in self._subscriptions:
+            self._node.destroy_subscription(subscription)
+        self._namespace = namespace
+        self._subscriptions = []
+        self._command_publisher = None
+        self._cursor_pos_publisher = None
+        self._state_publisher = None
+        self._state_request_publisher = None
+        if namespace is None:
+            return
+
+        command_qos = self._stream_qos[COMMAND_STREAM].to_profile()
+        cursor_pos_qos = self._stream_qos[CURSOR_POS_STREAM].to_profile()
+        state_qos = self._stream_qos[STATE_STREAM].to_profile()
+        self._command_publisher = self._node.create_publisher(
+            Command, namespace + '/command', command_qos)
+        self._cursor_pos_publisher = self._node.create_publisher(
+            CursorPos, namespace + '/cursor_pos', cursor_pos_qos)
+        self._state_publisher = self._node.create_publisher(
+            BoardState, namespace + '/state', state_qos)
+        self._state_request_publisher = self._node.create_publisher(
+            StateRequest, namespace + '/state_request', 10)
+        self._subscriptions = [
+            self._node.create_subscription(
+                Command, namespace + '/command', self._command_callback, command_qos),
+            self._node.create_subscription(
+                CursorPos, namespace + '/cursor_pos', self._cursor_pos_callback, cursor_pos_qos),
+            self._node.create_subscription(
+                BoardState, namespace + '/state', self._state_callback, state_qos),
+            self._node.create_subscription(
+                StateRequest, namespace + '/state_request', self._state_request_callback, 10),
+        ]
+
+    def _opponent_changed(self, opponent: str):
+        if opponent != self._AI_OPPONENT and self._ai_worker is not None:
+            self._ai_worker.cancel()
+            self._ai_board = None
+        self._update_match()
+
+    def _update_match(self):
+        if not self._on_server():
+            if self._namespace != self._TOPIC_NAMESPACE:
+                self._create_ros_interfaces(self._TOPIC_NAMESPACE)
+            return
+
+        # Only the topics of the match are subscribed on a server,
+        # so the traffic does not grow with the number of players
+        opponent_id = self._widget.SyncIDComboBox.currentText()
+        namespace = None
+        if opponent_id not in ['', self._NO_SYNC_ID, self._frame_id]:
+            namespace = match_namespace(self._frame_id, opponent_id)
+        if namespace != self._namespace:
+            self._create_ros_interfaces(namespace)
+        self._publish_match_request(reset=False)
+
+    def _publish_match_request(self, reset: bool):
+        opponent_id = self._widget.SyncIDComboBox.currentText()
+        request = MatchRequest()
+        request.header.stamp = self._node.get_clock().now().to_msg()
+        request.header.frame_id = self._frame_id
+        # A request without an opponent announces the player to the others
+        if self._namespace is not None:
+            request.opponent_id = opponent_id
+        request.board_size = self._widget.BoardSizeSpinBox.value()
+        # A win length of the board size or more needs the whole row alike
+        request.win_length = min(self._widget.WinLengthSpinBox.value(), request.board_size)
+        request.reset = reset
+        self._lobby_publisher.publish(request)
+
+    def _lobby_callback(self, request: MatchRequest):
+        self._match_request_received.emit(request)
+
+    def _apply_match_request(self, request: MatchRequest):
+        if request.header.frame_id != self._frame_id and request.header.frame_id != '':
+            self._append_sync_id(request.header.frame_id)
 
     def _append_sync_id(self, frame_id: str) -> str:
         if self._widget.SyncIDComboBox.findText(frame_id) < 0:
             self._widget.SyncIDComboBox.addItem(frame_id)
 
-    def _publish_command(self, row: int, col: int, marker: Marker):
+    def _publish_command(self, row: int, col: int, marker: Marker, action: int = Command.PLACE):
         command = Command()
         command.header.stamp = self._node.get_clock().now().to_msg()
-        command.header.frame_id = self._widget.FrameIDLineEdit.text()
+        command.header.frame_id = self._frame_id
         command.row = row
         command.column = col
         command.marker = marker
-        self._command_publisher.publish(command)
+        command.epoch = self._epoch
+        command.sequence = self._game.get_move_count()
+        command.action = action
+        command.board_hash = self._game.get_hash()
+        if self._command_publisher is not None:
+            self._command_publisher.publish(command)
 
     def _command_callback(self, command: Command):
-        if command.header.frame_id != self._widget.FrameIDLineEdit.text() and \
-           command.header.frame_id != '':
-            self._append_sync_id(command.header.frame_id)
+        with self._profiler.measure('_command_callback'):
+            if self._command_queue.push(command):
+                self._commands_received.emit()
+
+    def _schedule_command_drain(self):
+        # Wait for the rest of a burst and apply it at once in the next frame
+        if not self._command_drain_timer.isActive():
+            self._command_drain_timer.start()
+
+    def _drain_commands(self):
+        commands = self._command_queue.drain()
+        if not commands:
+            return
+
+        with self._profiler.measure('_drain_commands'):
+            for command in commands:
+                self._record_stamp_latency('command_latency', command.header.stamp)
+            for frame_id in {command.header.frame_id for command in commands}:
+                if frame_id != self._frame_id and frame_id != '':
+                    self._append_sync_id(frame_id)
+
+            # The match server validates the commands and publishes the board instead
+            if self._on_server() or self._replay is not None:
+                return
+
+            sync_id = self._widget.SyncIDComboBox.currentText()
+            changed = False
+            for command in commands:
+                if command.header.frame_id != sync_id:
+                    continue
+
+                delta = self._apply_command(command)
+                if delta == DELTA_APPLY:
+                    changed = True
+                elif delta == DELTA_GAP:
+                    # A command was lost or the boards differ, and the board replaces the rest
+                    self._request_state()
+                    break
+
+            if changed:
+                self._update_game()
+
+    def _apply_command(self, command: Command) -> int:
+        # Apply a command of the sync ID to the game and return how it was handled
+        if command.action != Command.PLACE:
+            return self._apply_history_command(command)
+
+        delta = classify_delta(command.epoch, command.sequence,
+                               self._epoch, self._game.get_move_count())
+        if delta != DELTA_APPLY:
+            return delta
 
-        if command.header.frame_id != self._widget.SyncIDComboBox.currentText():
+        winner, _ = self._game.calc_winner()
+        if command.marker != self._game.get_present_marker() or winner != Marker.NONE or \
+           not self._game.set_marker(command.row, command.column):
+            return DELTA_GAP
+
+        self._record_move(command.row, command.column, command.marker)
+        return self._verify_board_hash(command)
+
+    def _apply_history_command(self, command: Command) -> int:
+        undo = command.action == Command.UNDO
+        delta = classify_history_delta(command.epoch, command.sequence, self._epoch,
+                                       self._game.get_move_count(), -1 if undo else 1)
+        if delta != DELTA_APPLY:
+            return delta
+
+        # Both sides must take back or set again the same move, otherwise the histories differ
+        move = self._game.get_last_move() if undo else self._game.get_next_move()
+        if move != (command.row, command.column):
+            return DELTA_GAP
+
+        if undo:
+            self._game.undo()
+        else:
+            self._game.redo()
+        self._epoch = command.epoch
+        self._history_changed()
+        return self._verify_board_hash(command)
+
+    def _verify_board_hash(self, command: Command) -> int:
+        # The same move on boards that had already diverged leaves them different
+        if command.board_hash != self._game.get_hash():
+            self._logger.warning('The board differs from {}'.format(command.header.frame_id))
+            return DELTA_GAP
+        return DELTA_APPLY
+
+    def _publish_state(self):
+        # The match server holds the board of the match
+        if self._state_publisher is None or self._on_server():
             return
 
-        if command.marker != self._game.get_present_marker():
+        state = BoardState()
+        state.header.stamp = self._node.get_clock().now().to_msg()
+        state.header.frame_id = self._frame_id
+        fill_board_state(state, self._game, self._epoch)
+        self._state_publisher.publish(state)
+
+    def _sync_id_changed(self, frame_id: str):
+        self._update_match()
+        # Catch up with a game that started before joining it
+        self._request_state()
+
+    def _request_state(self):
+        target_id = self._widget.SyncIDComboBox.currentText()
+        if target_id == '' or self._state_request_publisher is None:
             return
 
-        winner, _ = self._game.calc_winner()
-        if winner != Marker.NONE:
+        request = StateRequest()
+        request.header.stamp = self._node.get_clock().now().to_msg()
+        request.header.frame_id = self._frame_id
+        request.target_id = target_id
+        self._state_request_publisher.publish(request)
+
+    def _state_callback(self, state: BoardState):
+        with self._profiler.measure('_state_callback'):
+            self._state_received.emit(state)
+
+    def _state_request_callback(self, request: StateRequest):
+        self._state_request_received.emit(request)
+
+    def _apply_state_request(self, request: StateRequest):
+        if request.target_id == self._frame_id and request.header.frame_id != self._frame_id:
+            self._publish_state()
+
+    def _apply_state(self, state: BoardState):
+        with self._profiler.measure('_apply_state'):
+            # Apply the commands received before the state first, as they were sent before it
+            self._drain_commands()
+
+            if self._replay is not None:
+                return
+
+            # Only the match server publishes on the topics of a match and its board always wins
+            if self._on_server():
+                self._sync_state(state)
+                return
+
+            if state.header.frame_id != self._frame_id and \
+               state.header.frame_id != '':
+                self._append_sync_id(state.header.frame_id)
+
+            if state.header.frame_id != self._widget.SyncIDComboBox.currentText() or \
+               state.header.frame_id == self._frame_id:
+                return
+
+            if not is_newer_snapshot(state.epoch, state.sequence,
+                                     self._epoch, self._game.get_move_count()):
+                # Both sides may have moved at once. Break the tie by frame_id
+                # so that both converge to the same board.
+                if (state.epoch, state.sequence) != (self._epoch, self._game.get_move_count()) or \
+                   state.header.frame_id > self._frame_id:
+                    return
+
+            self._sync_state(state)
+
+    def _sync_state(self, state: BoardState):
+        board_size_spin_box = self._widget.BoardSizeSpinBox
+        win_length_spin_box = self._widget.WinLengthSpinBox
+        try:
+            board = unpack_board_state(
+                state,
+                range(board_size_spin_box.minimum(), board_size_spin_box.maximum() + 1),
+                range(win_length_spin_box.minimum(), win_length_spin_box.maximum() + 1))
+        except ValueError as e:
+            self._logger.warning('Dropped the board of {}: {}'.format(state.header.frame_id, e))
             return
 
-        # Sync command
-        self._game.set_marker(command.row, command.column)
+        if numpy.array_equal(board, self._game.get_board_markers()) and \
+           state.present_marker == self._game.get_present_marker():
+            self._epoch = state.epoch
+            return
 
-    def _publish_cursor_pos(self):
-        pos = self._widget.BoardWidget.get_mouse_present_pos()
-        cursor_pos = CursorPos()
-        cursor_pos.header.stamp = self._node.get_clock().now().to_msg()
-        cursor_pos.header.frame_id = self._widget.FrameIDLineEdit.text()
-        cursor_pos.x = pos[0]
-        cursor_pos.y = pos[1]
-        self._cursor_pos_publisher.publish(cursor_pos)
+        self._load_state(state, board)
+
+    def _load_state(self, state: BoardState, board):
+        previous_board = self._game.get_board_markers().copy()
+        previous_epoch = self._epoch
+        self._epoch = state.epoch
+        self._widget.BoardSizeSpinBox.setValue(state.board_size)
+        self._widget.WinLengthSpinBox.setValue(state.win_length)
+        self._game = self._create_game()
+        self._game.load_board_markers(board, state.present_marker)
+        self._widget.BoardWidget.set_board_size(self._game.get_board_size())
+        self._widget.BoardWidget.reset_winner_line()
+        self._record_loaded_board(previous_board, previous_epoch, board)
+        self._update_game()
+
+    def _set_recording_enabled(self, enabled: bool):
+        if self._recorder is not None:
+            self._recorder.close()
+            self._recorder = None
+        if not enabled:
+            return
+
+        from rqt_tic_tac_toe.game_record import default_path
+        from rqt_tic_tac_toe.game_record import GameRecorder
+        try:
+            self._recorder = GameRecorder(default_path())
+        except (OSError, ValueError) as e:
+            self._logger.error('Failed to open the game record: {}'.format(e))
+            self._widget.RecordCheckBox.setChecked(False)
+            return
+        self._logger.info('Recording games to {}'.format(self._recorder.get_path()))
+        # A game in progress can not be replayed from its start, so wait for the next one
+        if self._game.get_move_count() == 0:
+            self._start_recording_game()
+
+    def _start_recording_game(self):
+        if self._recorder is not None:
+            self._recorder.start_game(self._game.get_board_size(), self._game.get_win_length())
+
+    def _record_move(self, row: int, col: int, marker: int):
+        if self._recorder is not None:
+            self._recorder.record_move(row, col, marker)
+
+    def _record_loaded_board(self, previous_board, previous_epoch: int, board):
+        if self._recorder is None:
+            return
+
+        if self._game.get_move_count() == 0:
+            self._start_recording_game()
+            return
+
+        # A board with one more marker of the same game is a move of the opponent
+        added = numpy.argwhere(board != previous_board) \
+            if previous_board.shape == board.shape else []
+        if previous_epoch == self._epoch and len(added) == 1 and \
+           previous_board[tuple(added[0])] == Marker.NONE:
+            row, col = added[0]
+            self._record_move(int(row), int(col), int(board[row][col]))
+        else:
+            self._recorder.stop_game()
+
+    def _open_replay(self):
+        if self._replay is not None:
+            self._stop_replay()
+            return
+
+        from rqt_tic_tac_toe.game_record import default_path
+        from rqt_tic_tac_toe.game_record import GameReplay
+        path, _ = QFileDialog.getOpenFileName(
+            self._widget, 'Open Game Record', default_path(), 'Game records (*.ttr)')
+        if not path:
+            return
+
+        try:
+            replay = GameReplay(path)
+        except (OSError, ValueError) as e:
+            self._logger.error('Failed to open {}: {}'.format(path, e))
+            return
+        if replay.get_game_count() == 0:
+            return
+
+        # Replay from the start of the last game
+        self._replay = replay
+        self._update_hints()
+        start, _ = replay.get_game_range(replay.get_game_count() - 1)
+        self._widget.ReplaySlider.setEnabled(True)
+        self._widget.ReplaySlider.setRange(0, replay.get_record_count() - 1)
+        self._widget.ReplaySlider.setValue(start)
+        self._seek_replay(start)
+        self._replay_timer.start(self._replay_interval())
+
+    def _replay_interval(self) -> int:
+        # Return the ms between the replayed moves
+        return max(int(1000 / self._widget.ReplaySpeedSpinBox.value()), 1)
+
+    def _set_replay_speed(self, speed: float):
+        if self._replay_timer.isActive():
+            self._replay_timer.setInterval(self._replay_interval())
+
+    def _step_replay(self):
+        slider = self._widget.ReplaySlider
+        if slider.value() >= slider.maximum():
+            self._replay_timer.stop()
+            return
+        slider.setValue(slider.value() + 1)
+
+    def _seek_replay(self, record_index: int):
+        if self._replay is None:
+            return
+
+        try:
+            game = self._replay.seek(record_index)
+        except (IndexError, ValueError) as e:
+            self._logger.warning('Failed to replay: {}'.format(e))
+            self._replay_timer.stop()
+            return
+        self._widget.BoardWidget.set_board_size(game.get_board_size())
+        self._widget.BoardWidget.reset_winner_line()
+        self._widget.BoardWidget.set_board_markers(game.get_board_markers())
+        winner, winner_line = game.calc_winner()
+        if winner != Marker.NONE:
+            self._widget.BoardWidget.set_winner_line(winner_line)
+        self._widget.GameStatusLabel.setText('Replay: move {}'.format(game.get_move_count()))
+
+    def _stop_replay(self):
+        if self._replay is None:
+            return
+        self._replay = None
+        self._replay_timer.stop()
+        self._widget.ReplaySlider.setEnabled(False)
+        # Show the present game and its hints again
+        self._widget.BoardWidget.set_board_size(self._game.get_board_size())
+        self._widget.BoardWidget.reset_winner_line()
+        self._update_hints()
+        self._update_game()
+
+    def _mouse_moved(self, x: float, y: float):
+        if self._cursor_throttle.update((x, y), time.monotonic()):
+            self._publish_cursor_pos((x, y))
+        self._cursor_settle_timer.start(int(self._cursor_throttle.get_settle_time() * 1000))
+
+    def _settle_cursor_pos(self):
+        pos = self._cursor_throttle.settle(time.monotonic())
+        if pos is not None:
+            self._publish_cursor_pos(pos)
+
+    def _publish_cursor_pos(self, pos: tuple[float, float]):
+        with self._profiler.measure('_publish_cursor_pos'):
+            cursor_pos = CursorPos()
+            cursor_pos.header.stamp = self._node.get_clock().now().to_msg()
+            cursor_pos.header.frame_id = self._frame_id
+            cursor_pos.x = pos[0]
+            cursor_pos.y = pos[1]
+            if self._cursor_pos_publisher is not None:
+                self._cursor_pos_publisher.publish(cursor_pos)
 
     def _cursor_pos_callback(self, pos: CursorPos):
-        if pos.header.frame_id == self._widget.SyncIDComboBox.currentText():
-            self._widget.BoardWidget.set_sync_mouse_cursor_pos((pos.x, pos.y))
+        with self._profiler.measure('_cursor_pos_callback'):
+            self._cursor_pos_received.emit(pos)
+
+    def _apply_cursor_pos(self, pos: CursorPos):
+        with self._profiler.measure('_apply_cursor_pos'):
+            self._record_stamp_latency('cursor_pos_latency', pos.header.stamp)
+            if pos.header.frame_id == self._widget.SyncIDComboBox.currentText():
+                stamp = pos.header.stamp.sec + pos.header.stamp.nanosec * 1e-9
+                self._widget.BoardWidget.add_sync_mouse_cursor_sample(stamp, (pos.x, pos.y))
+
+    def _record_stamp_latency(self, name: str, stamp):
+        # Record the latency from publishing a message to applying it.
+        # Players on other machines need synchronized clocks for this to be meaningful.
+        if not self._profiler.is_enabled():
+            return
+        now = self._node.get_clock().now().nanoseconds
+        latency = (now - stamp.sec * 1000000000 - stamp.nanosec) * 1e-9
+        self._profiler.record(name, max(latency, 0.0))
+
+    def _set_hints_enabled(self, enabled: bool):
+        if not enabled and self._hint_analyzer is not None:
+            self._hint_analyzer.shutdown()
+            self._hint_analyzer = None
+        self._hint_board = None
+        self._widget.BoardWidget.reset_hint_values()
+        self._update_hints()
+
+    def _update_hints(self):
+        # Analyze the board whenever it changes, and drop the hints of the previous board.
+        # A replay shows another board, so the present game is not analyzed meanwhile.
+        winner, _ = self._game.calc_winner()
+        board = None
+        if self._widget.HintsCheckBox.isChecked() and winner == Marker.NONE and \
+           not self._game.board_is_full() and self._replay is None:
+            board = (self._game.get_board_size(), self._game.get_win_length(),
+                     self._game.get_present_marker(), self._game.get_hash())
+        if board == self._hint_board:
+            return
+
+        self._hint_board = board
+        self._widget.BoardWidget.reset_hint_values()
+        if board is None:
+            if self._hint_analyzer is not None:
+                self._hint_analyzer.cancel()
+            return
+
+        if self._hint_analyzer is None:
+            from rqt_tic_tac_toe.hint import HintAnalyzer
+            self._hint_analyzer = HintAnalyzer(self._hints_received.emit)
+        self._hint_analyzer.analyze(self._game)
+
+    def _apply_hints(self, generation: int, depth: int, scores: dict):
+        # The board may have changed while the signal was queued
+        if self._hint_analyzer is None or generation != self._hint_analyzer.get_generation():
+            return
+
+        from rqt_tic_tac_toe.hint import hint_value
+        self._widget.BoardWidget.set_hint_values(
+            {cell: hint_value(score) for cell, score in scores.items()})
+
+    def _set_profiling_enabled(self, enabled: bool):
+        self._profiler.reset()
+        self._profiler.set_enabled(enabled)
+        if enabled:
+            self._profile_report_timer.start(self._PROFILE_REPORT_INTERVAL)
+        else:
+            self._profile_report_timer.stop()
+            self._widget.BoardWidget.set_overlay_text('')
+
+    def _report_profile(self):
+        # Report the latencies measured since the last report
+        histograms = self._profiler.get_histograms()
+        self._widget.BoardWidget.set_overlay_text(self._profiler.summary_text())
+        self._profiler.reset()
+
+        diagnostics = DiagnosticArray()
+        diagnostics.header.stamp = self._node.get_clock().now().to_msg()
+        for name, histogram in sorted(histograms.items()):
+            status = DiagnosticStatus()
+            status.name = 'rqt_tic_tac_toe: {}'.format(name)
+            status.hardware_id = self._frame_id
+            if histogram.get_missed() > 0:
+                status.level = DiagnosticStatus.WARN
+                status.message = '{} missed frames'.format(histogram.get_missed())
+            else:
+                status.level = DiagnosticStatus.OK
+                status.message = 'OK'
+            status.values = [
+                KeyValue(key='count', value=str(histogram.get_count())),
+                KeyValue(key='mean_ms', value='{:.3f}'.format(histogram.get_mean() * 1e3)),
+                KeyValue(key='p50_ms', value='{:.3f}'.format(histogram.percentile(50) * 1e3)),
+                KeyValue(key='p90_ms', value='{:.3f}'.format(histogram.percentile(90) * 1e3)),
+                KeyValue(key='p99_ms', value='{:.3f}'.format(histogram.percentile(99) * 1e3)),
+                KeyValue(key='max_ms', value='{:.3f}'.format(histogram.get_max() * 1e3)),
+                KeyValue(key='missed_frames', value=str(histogram.get_missed())),
+            ]
+            diagnostics.status.append(status)
+        self._diagnostics_publisher.publish(diagnostics)
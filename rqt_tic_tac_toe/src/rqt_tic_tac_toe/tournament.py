@@ -0,0 +1,246 @@
+# Copyright 2023 ShotaAk
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import itertools
+import math
+import os
+import sys
+import time
+
+from rqt_tic_tac_toe.bitboard_game import BitboardGame
+from rqt_tic_tac_toe.k_in_a_row_game import KInARowGame
+from rqt_tic_tac_toe.marker import Marker
+from rqt_tic_tac_toe.players import create_player
+from rqt_tic_tac_toe.profiler import LatencyHistogram
+
+# z for the 95% confidence intervals
+CONFIDENCE_Z = 1.959964
+
+
+def wilson_interval(successes: int, trials: int, z: float = CONFIDENCE_Z) -> tuple[float, float]:
+    # Return the Wilson score interval of a binomial proportion
+    if trials == 0:
+        return 0.0, 1.0
+    p = successes / trials
+    denominator = 1.0 + z * z / trials
+    center = (p + z * z / (2.0 * trials)) / denominator
+    margin = z * math.sqrt(p * (1.0 - p) / trials + z * z / (4.0 * trials * trials)) / denominator
+    return max(center - margin, 0.0), min(center + margin, 1.0)
+
+
+class PairingResult():
+    # Results of the games between two players, from the point of view of the first one
+
+    def __init__(self, players: tuple[str, str]):
+        self._players = players
+        self._wins = 0
+        self._draws = 0
+        self._losses = 0
+        self._moves = 0
+        self._latencies = (LatencyHistogram(budget=math.inf), LatencyHistogram(budget=math.inf))
+
+    def get_players(self) -> tuple[str, str]:
+        return self._players
+
+    def get_games(self) -> int:
+        return self._wins + self._draws + self._losses
+
+    def get_wins(self) -> int:
+        return self._wins
+
+    def get_draws(self) -> int:
+        return self._draws
+
+    def get_losses(self) -> int:
+        return self._losses
+
+    def get_moves(self) -> int:
+        return self._moves
+
+    def get_latencies(self) -> tuple[LatencyHistogram, LatencyHistogram]:
+        return self._latencies
+
+    def add_game(self, winner: int, moves: int) -> None:
+        # winner is the index of the winning player, or None for a draw
+        if winner is None:
+            self._draws += 1
+        elif winner == 0:
+            self._wins += 1
+        else:
+            self._losses += 1
+        self._moves += moves
+
+    def merge(self, other: 'PairingResult') -> None:
+        self._wins += other._wins
+        self._draws += other._draws
+        self._losses += other._losses
+        self._moves += other._moves
+        for latencies, other_latencies in zip(self._latencies, other._latencies):
+            latencies.merge(other_latencies)
+
+
+def create_headless_game(board_size: int, win_length: int):
+    # The bitboard engine plays the same game as Game without the board array
+    if win_length < board_size:
+        return KInARowGame(board_size=board_size, win_length=win_length, first_marker=Marker.O)
+    return BitboardGame(board_size=board_size, first_marker=Marker.O)
+
+
+def play_game(players: list, board_size: int, win_length: int, time_limit: float,
+              latencies: list = None):
+    # Play a game where players[0] moves first.
+    # Return the index of the winner or None for a draw, and the number of moves.
+    game = create_headless_game(board_size, win_length)
+    markers = {Marker.O: 0, Marker.X: 1}
+    moves = 0
+    while True:
+        winner, _ = game.calc_winner()
+        if winner != Marker.NONE:
+            return markers[winner], moves
+        if game.board_is_full():
+            return None, moves
+
+        index = markers[game.get_present_marker()]
+        start = time.perf_counter()
+        move = players[index].choose_move(game, time_limit)
+        if latencies is not None:
+            latencies[index].record(time.perf_counter() - start)
+        # An illegal move loses the game
+        if move is None or not game.set_marker(move[0], move[1]):
+            return 1 - index, moves
+        moves += 1
+
+
+def play_games(names: tuple[str, str], games: int, board_size: int, win_length: int,
+               time_limit: float, seed: int) -> PairingResult:
+    # Play games between two players alternating the first move. Run in worker processes.
+    players = [create_player(names[0], seed), create_player(names[1], seed + 1)]
+    result = PairingResult(names)
+    for i in range(games):
+        # Swap the players on odd games so that both move first equally often
+        order = [0, 1] if i % 2 == 0 else [1, 0]
+        winner, moves = play_game(
+            [players[order[0]], players[order[1]]], board_size, win_length, time_limit,
+            [result.get_latencies()[order[0]], result.get_latencies()[order[1]]])
+        result.add_game(None if winner is None else order[winner], moves)
+    return result
+
+
+def _format_result(result: PairingResult) -> str:
+    games = result.get_games()
+    win_low, win_high = wilson_interval(result.get_wins(), games)
+    draw_low, draw_high = wilson_interval(result.get_draws(), games)
+    loss_low, loss_high = wilson_interval(result.get_losses(), games)
+    lines = ['{} vs {}: {} games'.format(*result.get_players(), games)]
+    lines.append('  win  {:6.2%} [{:6.2%}, {:6.2%}]'.format(
+        result.get_wins() / max(games, 1), win_low, win_high))
+    lines.append('  draw {:6.2%} [{:6.2%}, {:6.2%}]'.format(
+        result.get_draws() / max(games, 1), draw_low, draw_high))
+    lines.append('  loss {:6.2%} [{:6.2%}, {:6.2%}]'.format(
+        result.get_losses() / max(games, 1), loss_low, loss_high))
+    for name, latencies in zip(result.get_players(), result.get_latencies()):
+        lines.append('  {} move latency mean/p50/p99/max={:.1f}/{:.1f}/{:.1f}/{:.1f}us'.format(
+            name, latencies.get_mean() * 1e6, latencies.percentile(50) * 1e6,
+            latencies.percentile(99) * 1e6, latencies.get_max() * 1e6))
+    return '\n'.join(lines)
+
+
+def run_tournament(names: list, games: int, board_size: int, win_length: int,
+                   time_limit: float = 0.0, workers: int = None, chunk_size: int = 1000,
+                   seed: int = 0, progress=None) -> dict:
+    # Play a round robin of games per pairing and return the results by pairing.
+    # progress is called with each finished chunk to stream the results.
+    pairings = list(itertools.combinations(names, 2))
+    results = {pairing: PairingResult(pairing) for pairing in pairings}
+    # Keep chunks even so that both players move first equally often
+    chunk_size = max(chunk_size + chunk_size % 2, 2)
+    tasks = []
+    for pairing in pairings:
+        for start in range(0, games, chunk_size):
+            tasks.append((pairing, min(chunk_size, games - start)))
+
+    workers = workers if workers else (os.cpu_count() or 1)
+    if workers == 1:
+        for i, (pairing, count) in enumerate(tasks):
+            result = play_games(pairing, count, board_size, win_length, time_limit, seed + 2 * i)
+            results[pairing].merge(result)
+            if progress is not None:
+                progress(result)
+        return results
+
+    # multiprocessing is slow to import, and the workers only need the games and the players
+    from concurrent.futures import as_completed
+    from concurrent.futures import ProcessPoolExecutor
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(play_games, pairing, count, board_size, win_length,
+                                   time_limit, seed + 2 * i)
+                   for i, (pairing, count) in enumerate(tasks)]
+        for future in as_completed(futures):
+            result = future.result()
+            results[result.get_players()].merge(result)
+            if progress is not None:
+                progress(result)
+    return results
+
+
+def main(argv: list = None):
+    import argparse
+    parser = argparse.ArgumentParser(
+        description='Play a round-robin self-play tournament between Tic-Tac-Toe players.')
+    parser.add_argument('players', nargs='+',
+                        help='players: random, greedy, alphabeta, mcts or module:factory')
+    parser.add_argument('--games', type=int, default=10000, help='games per pairing')
+    parser.add_argument('--board-size', type=int, default=3)
+    parser.add_argument('--win-length', type=int, default=None,
+                        help='markers in a row to win (default: board size)')
+    parser.add_argument('--time-limit', type=float, default=0.05, help='seconds per move')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='worker processes (default: number of CPUs)')
+    parser.add_argument('--chunk-size', type=int, default=1000,
+                        help='games per task sent to a worker')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+
+    if len(args.players) < 2:
+        parser.error('at least two players are needed')
+    for name in args.players:
+        # Fail before starting the workers
+        create_player(name)
+
+    start = time.perf_counter()
+    played = [0]
+
+    def progress(result):
+        played[0] += result.get_games()
+        elapsed = time.perf_counter() - start
+        print('{} vs {}: +{} games, {} games in {:.1f}s ({:.0f} games/s)'.format(
+            *result.get_players(), result.get_games(), played[0], elapsed,
+            played[0] / max(elapsed, 1e-9)), flush=True)
+
+    results = run_tournament(
+        args.players, args.games, args.board_size, args.win_length or args.board_size,
+        args.time_limit, args.workers, args.chunk_size, args.seed, progress)
+    elapsed = time.perf_counter() - start
+
+    print()
+    for result in results.values():
+        print(_format_result(result))
+    moves = sum(result.get_moves() for result in results.values())
+    print('{} games, {} moves in {:.1f}s: {:.0f} games/s'.format(
+        played[0], moves, elapsed, played[0] / max(elapsed, 1e-9)))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
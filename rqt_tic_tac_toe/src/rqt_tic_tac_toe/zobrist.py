@@ -0,0 +1,90 @@
+# Copyright 2023 ShotaAk
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import functools
+import random
+
+from rqt_tic_tac_toe.symmetry import board_symmetries
+
+# Fixed seed so that every process computes the same keys
+ZOBRIST_SEED = 0x7469637461630000
+
+
+@functools.lru_cache(maxsize=None)
+def zobrist_keys(board_size: int, num_players: int = 2) -> tuple:
+    # Return random 64-bit keys indexed by [player][cell]
+    rng = random.Random(ZOBRIST_SEED + board_size)
+    return tuple(
+        tuple(rng.getrandbits(64) for _ in range(board_size * board_size))
+        for _ in range(num_players))
+
+
+@functools.lru_cache(maxsize=None)
+def symmetric_zobrist_keys(board_size: int, num_players: int = 2) -> tuple:
+    # Return keys indexed by [symmetry][player][cell].
+    # XORing them for every stone gives the hash of each transformed board at once.
+    keys = zobrist_keys(board_size, num_players)
+    return tuple(
+        tuple(
+            tuple(player_keys[permutation[cell]] for cell in range(board_size * board_size))
+            for player_keys in keys)
+        for permutation in board_symmetries(board_size))
+
+
+@functools.lru_cache(maxsize=None)
+def packed_zobrist_keys(board_size: int, num_players: int = 2) -> tuple:
+    # Return the keys of all symmetries packed 64 bits each into one int,
+    # indexed by [player][cell], so that a single XOR updates the hashes of every symmetry
+    keys = symmetric_zobrist_keys(board_size, num_players)
+    return tuple(
+        tuple(sum(symmetry_keys[player][cell] << (64 * index)
+                  for index, symmetry_keys in enumerate(keys))
+              for cell in range(board_size * board_size))
+        for player in range(num_players))
+
+
+class ZobristHash():
+    # Zobrist hashes of a board under each of its symmetries, updated per stone in O(1).
+    # XORing a stone twice removes it, so placing and taking back a stone are the same update.
+
+    _MASK = (1 << 64) - 1
+
+    def __init__(self, board_size: int, num_players: int = 2):
+        self._BOARD_SIZE = board_size
+        self._keys = packed_zobrist_keys(board_size, num_players)
+        self._symmetry_count = len(board_symmetries(board_size))
+        self._hashes = 0
+
+    def copy(self) -> 'ZobristHash':
+        zobrist_hash = ZobristHash.__new__(ZobristHash)
+        zobrist_hash._BOARD_SIZE = self._BOARD_SIZE
+        zobrist_hash._keys = self._keys
+        zobrist_hash._symmetry_count = self._symmetry_count
+        zobrist_hash._hashes = self._hashes
+        return zobrist_hash
+
+    def get_hash(self) -> int:
+        # The first symmetry is the identity
+        return self._hashes & self._MASK
+
+    def get_symmetric_hash(self) -> int:
+        # The same for all boards that are rotations or reflections of each other
+        return min((self._hashes >> (64 * index)) & self._MASK
+                   for index in range(self._symmetry_count))
+
+    def toggle(self, row: int, col: int, player: int) -> None:
+        self._hashes ^= self._keys[player][row * self._BOARD_SIZE + col]
+
+    def reset(self) -> None:
+        self._hashes = 0
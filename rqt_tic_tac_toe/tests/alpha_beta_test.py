@@ -0,0 +1,182 @@
+# Copyright 2023 ShotaAk
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import functools
+import random
+
+from conftest import play_moves
+from rqt_tic_tac_toe.alpha_beta import AlphaBetaPlayer
+from rqt_tic_tac_toe.alpha_beta import WIN_THRESHOLD
+from rqt_tic_tac_toe.bitboard_game import BitboardGame
+from rqt_tic_tac_toe.game import Game
+from rqt_tic_tac_toe.k_in_a_row_game import KInARowGame
+from rqt_tic_tac_toe.marker import Marker
+from rqt_tic_tac_toe.symmetry import board_symmetries
+
+
+@functools.lru_cache(maxsize=None)
+def _minimax(game: BitboardGame) -> int:
+    # Return 1 if the player to move wins, 0 for a draw and -1 for a loss
+    if game.calc_winner()[0] != Marker.NONE:
+        return -1
+    if game.board_is_full():
+        return 0
+
+    best = -1
+    for row in range(game.get_board_size()):
+        for col in range(game.get_board_size()):
+            child = game.copy()
+            if child.set_marker(row, col):
+                best = max(best, -_minimax(child))
+    return best
+
+
+def test_board_symmetries():
+    symmetries = board_symmetries(3)
+    assert len(symmetries) == 8
+    assert symmetries[0] == tuple(range(9))
+    assert len(set(symmetries)) == 8
+    for permutation in symmetries:
+        # The center stays in place
+        assert permutation[4] == 4
+        assert sorted(permutation) == list(range(9))
+
+
+def test_choose_move_on_finished_game():
+    # O O
+    # X
+    game = play_moves(Game(board_size=2), [(0, 0), (1, 0), (0, 1)])
+    assert AlphaBetaPlayer().choose_move(game) is None
+
+
+def test_take_the_win():
+    # O O .
+    # X X .
+    # . . .
+    game = play_moves(Game(board_size=3), [(0, 0), (1, 0), (0, 1), (1, 1)])
+    assert AlphaBetaPlayer().choose_move(game) == (0, 2)
+
+
+def test_block_the_opponent():
+    # O O .
+    # X . .
+    # . . .
+    game = play_moves(Game(board_size=3), [(0, 0), (1, 0), (0, 1)])
+    assert AlphaBetaPlayer().choose_move(game) == (0, 2)
+
+
+def test_optimal_moves():
+    rng = random.Random(0)
+    player = AlphaBetaPlayer()
+    for _ in range(30):
+        game = BitboardGame(board_size=3, first_marker=Marker.O)
+        for _ in range(rng.randrange(5)):
+            empty = [(row, col) for row in range(3) for col in range(3)
+                     if game.get_board_markers()[row][col] == Marker.NONE]
+            game.set_marker(*rng.choice(empty))
+        if game.calc_winner()[0] != Marker.NONE:
+            continue
+
+        child = game.copy()
+        assert child.set_marker(*player.choose_move(game, time_limit=10.0))
+        assert -_minimax(child) == _minimax(game)
+
+
+def test_self_play_is_a_draw():
+    player = AlphaBetaPlayer()
+    game = Game(board_size=3)
+    while game.calc_winner()[0] == Marker.NONE and not game.board_is_full():
+        assert game.set_marker(*player.choose_move(game, time_limit=10.0))
+    assert game.calc_winner()[0] == Marker.NONE
+
+
+def test_time_limit():
+    player = AlphaBetaPlayer()
+    game = Game(board_size=6)
+    row, col = player.choose_move(game, time_limit=0.05)
+    assert 0 <= row < 6 and 0 <= col < 6
+
+
+def test_analyze_scores_every_move():
+    rng = random.Random(1)
+    player = AlphaBetaPlayer()
+    for _ in range(20):
+        game = BitboardGame(board_size=3, first_marker=Marker.O)
+        for _ in range(rng.randrange(1, 5)):
+            empty = [(row, col) for row in range(3) for col in range(3)
+                     if game.get_board_markers()[row][col] == Marker.NONE]
+            game.set_marker(*rng.choice(empty))
+        if game.calc_winner()[0] != Marker.NONE:
+            continue
+
+        scores = player.analyze(game, depth=9)
+        assert len(scores) == (game.get_board_markers() == Marker.NONE).sum()
+        for (row, col), score in scores.items():
+            child = game.copy()
+            assert child.set_marker(row, col)
+            result = -_minimax(child)
+            assert (score > WIN_THRESHOLD) == (result == 1)
+            assert (score < -WIN_THRESHOLD) == (result == -1)
+
+
+def test_analyze_stops():
+    player = AlphaBetaPlayer()
+    game = Game(board_size=5)
+    assert player.analyze(game, depth=25, should_stop=lambda: True) is None
+    assert player.analyze(Game(board_size=3), depth=1) is not None
+
+
+def test_heuristic_stays_below_wins():
+    # X has 11 of the 12 markers in a row it needs, which no heuristic score should
+    # mistake for a win
+    board = [[Marker.NONE] * 12 for _ in range(12)]
+    board[0][:11] = [Marker.X] * 11
+    for i in range(11):
+        board[3 + i // 6][2 * (i % 6)] = Marker.O
+    game = Game(board_size=12)
+    game.load_board_markers(board, Marker.O)
+
+    player = AlphaBetaPlayer()
+    scores = player.analyze(game, depth=1)
+    assert all(abs(score) <= WIN_THRESHOLD for score in scores.values())
+    assert player.choose_move(game, time_limit=1.0) == (0, 11)
+    assert player.get_completed_depth() > 1
+
+
+def test_moves_next_to_stones_first():
+    player = AlphaBetaPlayer()
+    game = KInARowGame(board_size=15, win_length=5, first_marker=Marker.O)
+    game.set_marker(0, 14)
+    game.set_marker(1, 13)
+    player.analyze(game, depth=1)
+
+    empty = sum(1 << (row * 15 + col) for row in range(15) for col in range(15)
+                if game.get_board_markers()[row][col] == Marker.NONE)
+    moves = [divmod(cell, 15) for cell in player._ordered_moves(empty, -1)]
+    assert len(moves) == 15 * 15 - 2
+    assert all(row <= 2 and col >= 12 for row, col in moves[:6])
+
+
+def test_analyze_keeps_the_table_between_depths():
+    game = Game(board_size=4)
+    game.set_marker(1, 1)
+
+    fresh = AlphaBetaPlayer()
+    fresh.analyze(game, depth=5)
+    fresh_nodes = fresh.get_searched_nodes()
+
+    deepening = AlphaBetaPlayer()
+    deepening.analyze(game, depth=4)
+    deepening.analyze(game, depth=5)
+    assert deepening.get_searched_nodes() < fresh_nodes
@@ -0,0 +1,71 @@
+# Copyright 2023 ShotaAk
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import random
+
+import numpy
+import pytest
+
+from rqt_tic_tac_toe.batch import evaluate_boards
+from rqt_tic_tac_toe.game import Game
+from rqt_tic_tac_toe.marker import Marker
+
+
+def _random_games(board_size: int, count: int, seed: int) -> list:
+    # Play random games and stop each of them at a random move or at the first win
+    rng = random.Random(seed)
+    games = []
+    for _ in range(count):
+        game = Game(board_size=board_size, first_marker=Marker.O)
+        cells = [(row, col) for row in range(board_size) for col in range(board_size)]
+        rng.shuffle(cells)
+        for row, col in cells[:rng.randrange(len(cells) + 1)]:
+            if game.calc_winner()[0] != Marker.NONE:
+                break
+            game.set_marker(row, col)
+        games.append(game)
+    return games
+
+
+def test_invalid_shape():
+    with pytest.raises(ValueError):
+        evaluate_boards(numpy.zeros((3, 3)))
+    with pytest.raises(ValueError):
+        evaluate_boards(numpy.zeros((1, 2, 3)))
+
+
+def test_empty_batch():
+    winners, winner_lines, full, legal = evaluate_boards(numpy.zeros((0, 3, 3)))
+    assert winners.shape == (0,)
+    assert winner_lines.shape == (0, 2, 2)
+    assert full.shape == (0,)
+    assert legal.shape == (0, 3, 3)
+
+
+@pytest.mark.parametrize('board_size', [2, 3, 4, 5, 6])
+def test_same_result_as_game(board_size):
+    games = _random_games(board_size, 200, seed=board_size)
+    boards = numpy.array([game.get_board_markers() for game in games])
+
+    winners, winner_lines, full, legal = evaluate_boards(boards)
+    for index, game in enumerate(games):
+        winner, winner_line = game.calc_winner()
+        assert winners[index] == winner
+        if winner == Marker.NONE:
+            assert numpy.all(winner_lines[index] == -1)
+            assert numpy.array_equal(legal[index], game.get_board_markers() == Marker.NONE)
+        else:
+            assert [tuple(end) for end in winner_lines[index]] == winner_line
+            assert not legal[index].any()
+        assert full[index] == game.board_is_full()
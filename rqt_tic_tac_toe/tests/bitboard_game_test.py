@@ -0,0 +1,83 @@
+# Copyright 2023 ShotaAk
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import random
+
+import numpy
+import pytest
+
+from rqt_tic_tac_toe.bitboard_game import BitboardGame
+from rqt_tic_tac_toe.game import Game
+from rqt_tic_tac_toe.marker import Marker
+
+
+def test_set_marker():
+    game = BitboardGame(board_size=2, first_marker=Marker.O)
+    assert game.get_present_marker() == Marker.O
+
+    # Setting marker on out of range position should fail
+    assert game.set_marker(-1, 0) is False
+    assert game.set_marker(0, 2) is False
+
+    assert game.set_marker(0, 0) is True
+    assert game.get_present_marker() == Marker.X
+    # Setting marker on already set position should fail
+    assert game.set_marker(0, 0) is False
+    assert game.get_present_marker() == Marker.X
+
+
+def test_get_board_markers():
+    game = BitboardGame(board_size=2, first_marker=Marker.O)
+
+    # Board markers should be:
+    # O X
+    # X O
+    game.set_marker(0, 0)
+    game.set_marker(1, 0)
+    game.set_marker(1, 1)
+    game.set_marker(0, 1)
+
+    expected = numpy.array([[Marker.O, Marker.X], [Marker.X, Marker.O]])
+    assert numpy.array_equal(game.get_board_markers(), expected)
+    assert game.board_is_full() is True
+
+
+def test_copy_hash_and_equality():
+    game = BitboardGame(board_size=3, first_marker=Marker.O)
+    game.set_marker(1, 1)
+
+    copied = game.copy()
+    assert copied == game
+    assert hash(copied) == hash(game)
+
+    copied.set_marker(0, 0)
+    assert copied != game
+    assert game.get_board_markers()[0][0] == Marker.NONE
+    assert copied.get_board_markers()[0][0] == Marker.X
+
+
+@pytest.mark.parametrize('board_size', [2, 3, 4, 5, 6])
+def test_same_result_as_game(board_size):
+    rng = random.Random(board_size)
+    for _ in range(50):
+        game = Game(board_size=board_size, first_marker=Marker.O)
+        bitboard = BitboardGame(board_size=board_size, first_marker=Marker.O)
+        cells = [(row, col) for row in range(board_size) for col in range(board_size)]
+        rng.shuffle(cells)
+        for row, col in cells:
+            assert bitboard.set_marker(row, col) == game.set_marker(row, col)
+            assert bitboard.calc_winner() == game.calc_winner()
+            assert bitboard.board_is_full() == game.board_is_full()
+            assert bitboard.get_present_marker() == game.get_present_marker()
+        assert numpy.array_equal(bitboard.get_board_markers(), game.get_board_markers())
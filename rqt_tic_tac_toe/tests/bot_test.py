@@ -0,0 +1,154 @@
+# Copyright 2023 ShotaAk
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import time
+
+from rqt_tic_tac_toe.bot import Bot
+from rqt_tic_tac_toe.game import Game
+from rqt_tic_tac_toe.marker import Marker
+from rqt_tic_tac_toe.players import GreedyPlayer
+from rqt_tic_tac_toe.snapshot import DELTA_APPLY
+from rqt_tic_tac_toe.snapshot import DELTA_GAP
+from rqt_tic_tac_toe.snapshot import DELTA_STALE
+from rqt_tic_tac_toe.snapshot import fill_board_state
+
+
+class _Message():
+    pass
+
+
+def _command(game, row: int, col: int, epoch: int = 0, action: int = 0):
+    # Make the move on the opponent's game and return its Command
+    command = _Message()
+    command.marker = game.get_present_marker()
+    if action == 0:
+        game.set_marker(row, col)
+    elif action == 1:
+        game.undo()
+    else:
+        game.redo()
+    command.row = row
+    command.column = col
+    command.epoch = epoch
+    command.sequence = game.get_move_count()
+    command.board_hash = game.get_hash()
+    command.action = action
+    return command
+
+
+def _state(game, epoch: int):
+    state = _Message()
+    fill_board_state(state, game, epoch)
+    return state
+
+
+class _SlowPlayer():
+
+    def choose_move(self, game, time_limit: float = 0.0):
+        time.sleep(time_limit * 2)
+        return None
+
+
+def test_marker():
+    # The first of the sorted names plays O, as on the match server
+    assert Bot('bot', 'alice', GreedyPlayer(), 0.1).get_marker() == Marker.X
+    assert Bot('alice', 'bot', GreedyPlayer(), 0.1).get_marker() == Marker.O
+
+
+def test_play_against_opponent():
+    bot = Bot('bot', 'alice', GreedyPlayer(seed=0), 0.1)
+    opponent = Game()
+    assert bot.play() is None
+
+    assert bot.apply_command(_command(opponent, 0, 0)) == DELTA_APPLY
+    move = bot.play()
+    assert bot.get_game().get_board_markers()[move] == Marker.X
+    opponent.set_marker(*move)
+    assert bot.get_game().get_hash() == opponent.get_hash()
+    assert bot.play() is None
+    assert bot.get_latency().get_count() == 1
+
+    # Already applied
+    command = _command(opponent, 1, 1)
+    assert bot.apply_command(command) == DELTA_APPLY
+    assert bot.apply_command(command) == DELTA_STALE
+
+
+def test_apply_command_gap():
+    bot = Bot('bot', 'alice', GreedyPlayer(), 0.1)
+    opponent = Game()
+    _command(opponent, 0, 0)
+    assert bot.apply_command(_command(opponent, 0, 1)) == DELTA_GAP
+
+    # A move on a board that had diverged is detected by the hash
+    bot = Bot('bot', 'alice', GreedyPlayer(), 0.1)
+    opponent = Game()
+    bot.apply_command(_command(opponent, 0, 0))
+    board = bot.get_game().get_board_markers().copy()
+    board[0][0], board[2][2] = Marker.NONE, Marker.O
+    bot.get_game().load_board_markers(board, Marker.X)
+    assert bot.apply_command(_command(opponent, 1, 1)) == DELTA_GAP
+
+
+def test_apply_undo():
+    bot = Bot('bot', 'alice', GreedyPlayer(), 0.1)
+    opponent = Game()
+    bot.apply_command(_command(opponent, 0, 0))
+    assert bot.apply_command(_command(opponent, 0, 0, epoch=1, action=1)) == DELTA_APPLY
+    assert bot.get_epoch() == 1
+    assert bot.get_game().get_move_count() == 0
+    assert bot.apply_command(_command(opponent, 0, 0, epoch=2, action=2)) == DELTA_APPLY
+    assert bot.get_game().get_hash() == opponent.get_hash()
+
+
+def test_apply_state():
+    bot = Bot('bot', 'alice', GreedyPlayer(), 0.1)
+    opponent = Game(board_size=4)
+    opponent.set_marker(1, 1)
+    assert bot.apply_state(_state(opponent, 1)) is True
+    assert bot.get_epoch() == 1
+    assert bot.get_game().get_board_size() == 4
+    assert bot.get_game().get_hash() == opponent.get_hash()
+
+    # Older and equal boards are ignored
+    assert bot.apply_state(_state(Game(), 0)) is False
+    assert bot.apply_state(_state(opponent, 1)) is False
+
+
+def test_ignore_malformed_state():
+    bot = Bot('bot', 'alice', GreedyPlayer(), 0.1)
+    opponent = Game(board_size=5)
+    opponent.set_marker(1, 1)
+    for field, value in [('cells', b'\x00'), ('board_size', 0), ('board_size', 1000),
+                         ('win_length', 0), ('present_marker', Marker.NONE),
+                         ('cells', b'\x33' * 7)]:
+        state = _state(opponent, 1)
+        setattr(state, field, value)
+        assert bot.apply_state(state) is False
+        assert bot.get_epoch() == 0
+        assert bot.get_game().get_board_size() == 3
+    assert bot.apply_state(_state(opponent, 1)) is True
+
+
+def test_engine_over_the_time_limit():
+    bot = Bot('alice', 'bot', _SlowPlayer(), 0.01)
+    move = bot.play()
+    # The bot never passes even if the engine gives up
+    assert move is not None
+    assert bot.get_game().get_move_count() == 1
+    assert bot.get_latency().get_missed() == 1
+
+    bot.reset(3, 3)
+    assert bot.get_epoch() == 1
+    assert bot.get_game().get_move_count() == 0
@@ -0,0 +1,64 @@
+# Copyright 2023 ShotaAk
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from rqt_tic_tac_toe.command_queue import CommandQueue
+
+
+class _Header():
+
+    def __init__(self, frame_id: str):
+        self.frame_id = frame_id
+
+
+class _Command():
+
+    def __init__(self, frame_id: str, sequence: int, row: int = 0, col: int = 0):
+        self.header = _Header(frame_id)
+        self.epoch = 0
+        self.sequence = sequence
+        self.action = 0
+        self.row = row
+        self.column = col
+
+
+def test_drain_is_scheduled_once_per_batch():
+    queue = CommandQueue()
+    assert queue.push(_Command('a', 1)) is True
+    assert queue.push(_Command('a', 2)) is False
+    assert [command.sequence for command in queue.drain()] == [1, 2]
+
+    assert queue.drain() == []
+    assert queue.push(_Command('a', 3)) is True
+
+
+def test_drain_drops_duplicates():
+    queue = CommandQueue()
+    for sequence in [1, 2, 1, 3, 2]:
+        queue.push(_Command('a', sequence))
+    queue.push(_Command('b', 1))
+    queue.push(_Command('a', 3, row=1))
+
+    commands = queue.drain()
+    assert [(command.header.frame_id, command.sequence, command.row) for command in commands] == \
+        [('a', 1, 0), ('a', 2, 0), ('a', 3, 0), ('b', 1, 0), ('a', 3, 1)]
+
+
+def test_full_queue_drops_oldest():
+    queue = CommandQueue(max_size=3)
+    assert queue.get_max_size() == 3
+    for sequence in range(5):
+        queue.push(_Command('a', sequence))
+
+    assert queue.get_dropped_count() == 2
+    assert [command.sequence for command in queue.drain()] == [2, 3, 4]
@@ -0,0 +1,101 @@
+# Copyright 2023 ShotaAk
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import pytest
+
+from rqt_tic_tac_toe.cursor_interpolator import CursorInterpolator
+from rqt_tic_tac_toe.cursor_throttle import DEFAULT_MAX_RATE
+
+# The sender clock runs 100 s ahead of the receiver, and messages take 20 ms
+CLOCK_OFFSET = 100.0
+LATENCY = 0.02
+
+
+def _add_samples(interpolator, samples):
+    for now, pos in samples:
+        interpolator.add_sample(now + CLOCK_OFFSET, pos, now + LATENCY)
+
+
+def test_no_samples():
+    interpolator = CursorInterpolator()
+    assert interpolator.position(0.0) is None
+    assert interpolator.is_animating(0.0) is False
+
+
+def test_interpolate():
+    interpolator = CursorInterpolator(delay=0.1, max_extrapolation=0.1, smoothing=0.0)
+    _add_samples(interpolator, [(0.0, (0.0, 0.0)), (0.1, (1.0, 0.5))])
+
+    # Positions are replayed 0.1 s behind the sender, in the receiver clock
+    assert interpolator.position(0.1 + LATENCY) == pytest.approx((0.0, 0.0))
+    assert interpolator.position(0.15 + LATENCY) == pytest.approx((0.5, 0.25))
+    assert interpolator.position(0.2 + LATENCY) == pytest.approx((1.0, 0.5))
+    assert interpolator.is_animating(0.2 + LATENCY) is True
+
+
+def test_default_delay_interpolates_published_samples():
+    # Samples published at the default rate of the throttle zigzag, so any extrapolation
+    # leaves the range of the samples around the rendered time
+    interval = 1.0 / DEFAULT_MAX_RATE
+    xs = [float(i % 2) for i in range(11)]
+    interpolator = CursorInterpolator()
+    received = 0
+    for step in range(200):
+        now = 0.005 + step * 0.01
+        while received < len(xs) and received * interval + LATENCY <= now:
+            interpolator.add_sample(received * interval + CLOCK_OFFSET, (xs[received], 0.0), now)
+            received += 1
+        render_time = now - LATENCY - interval
+        if render_time <= 0.0 or render_time >= (len(xs) - 1) * interval:
+            continue
+        index = int(render_time / interval)
+        x, _ = interpolator.position(now)
+        assert min(xs[index], xs[index + 1]) <= x <= max(xs[index], xs[index + 1])
+
+
+def test_extrapolate():
+    interpolator = CursorInterpolator(delay=0.0, max_extrapolation=0.05, smoothing=0.0)
+    _add_samples(interpolator, [(0.0, (0.0, 0.0)), (0.1, (0.2, 0.0))])
+
+    assert interpolator.position(0.13 + LATENCY) == pytest.approx((0.26, 0.0))
+    # Extrapolation stops at the horizon so that the cursor does not run away
+    assert interpolator.position(1.0 + LATENCY) == pytest.approx((0.3, 0.0))
+    assert interpolator.is_animating(1.0 + LATENCY) is False
+
+
+def test_smooth_jitter():
+    interpolator = CursorInterpolator(delay=0.0, max_extrapolation=0.0, smoothing=0.1)
+    interpolator.add_sample(0.0, (0.0, 0.0), 0.02)
+    # A late sample barely moves the offset and an early one resets it
+    interpolator.add_sample(0.1, (0.1, 0.0), 0.22)
+    assert interpolator.position(0.22) == pytest.approx((0.1, 0.0))
+    assert interpolator.position(0.1 + 0.04) == pytest.approx((0.1, 0.0))
+    interpolator.add_sample(0.2, (0.2, 0.0), 0.21)
+    assert interpolator.position(0.21) == pytest.approx((0.2, 0.0))
+
+
+def test_drop_out_of_order_samples():
+    interpolator = CursorInterpolator(delay=0.0, max_extrapolation=0.0, smoothing=0.0)
+    _add_samples(interpolator, [(0.0, (0.0, 0.0)), (0.1, (1.0, 0.0)), (0.05, (0.0, 1.0))])
+    assert interpolator.position(0.05 + LATENCY) == pytest.approx((0.5, 0.0))
+
+
+def test_reset_after_pause():
+    interpolator = CursorInterpolator(delay=0.1, reset_gap=1.0, smoothing=0.0)
+    _add_samples(interpolator, [(0.0, (0.0, 0.0)), (5.0, (1.0, 1.0))])
+    # The old sample should not be interpolated
+    assert interpolator.position(5.0 + LATENCY) == (1.0, 1.0)
+
+    interpolator.reset()
+    assert interpolator.position(5.0) is None
@@ -0,0 +1,51 @@
+# Copyright 2023 ShotaAk
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from rqt_tic_tac_toe.cursor_throttle import CursorThrottle
+
+
+def test_first_position_is_published():
+    throttle = CursorThrottle(max_rate=10.0, dead_band=0.1)
+    assert throttle.update((0.5, 0.5), now=0.0) is True
+
+
+def test_dead_band():
+    throttle = CursorThrottle(max_rate=10.0, dead_band=0.1)
+    throttle.update((0.5, 0.5), now=0.0)
+
+    # Small moves should be dropped even if the rate allows publishing
+    assert throttle.update((0.55, 0.45), now=1.0) is False
+    assert throttle.update((0.7, 0.5), now=2.0) is True
+
+
+def test_max_rate():
+    throttle = CursorThrottle(max_rate=10.0, dead_band=0.0)
+    throttle.update((0.0, 0.0), now=0.0)
+
+    assert throttle.update((0.2, 0.0), now=0.05) is False
+    assert throttle.update((0.3, 0.0), now=0.1) is True
+    assert throttle.update((0.4, 0.0), now=0.15) is False
+
+
+def test_settle():
+    throttle = CursorThrottle(max_rate=10.0, dead_band=0.1)
+    assert throttle.settle(now=0.0) is None
+
+    throttle.update((0.5, 0.5), now=0.0)
+    # Nothing to publish when the last position is already published
+    assert throttle.settle(now=0.5) is None
+
+    throttle.update((0.52, 0.5), now=1.0)
+    assert throttle.settle(now=1.5) == (0.52, 0.5)
+    assert throttle.settle(now=2.0) is None
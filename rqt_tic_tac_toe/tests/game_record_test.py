@@ -0,0 +1,185 @@
+# Copyright 2023 ShotaAk
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+
+import pytest
+
+from rqt_tic_tac_toe.game import Game
+from rqt_tic_tac_toe.game_record import GameRecorder
+from rqt_tic_tac_toe.game_record import GameReplay
+from rqt_tic_tac_toe.game_record import HEADER_SIZE
+from rqt_tic_tac_toe.game_record import main
+from rqt_tic_tac_toe.game_record import RECORD_DTYPE
+from rqt_tic_tac_toe.marker import Marker
+
+GAMES = [
+    (3, 3, [(1, 1), (0, 0), (0, 2), (2, 0), (1, 0), (1, 2), (0, 1), (2, 1), (2, 2)]),
+    (15, 5, [(7, 3), (0, 0), (7, 4), (0, 1), (7, 5), (0, 2), (7, 6), (0, 3), (7, 7)]),
+    (2, 2, [(0, 0), (1, 1), (0, 1)]),
+]
+
+
+def _record_games(path, games):
+    recorder = GameRecorder(path)
+    for board_size, win_length, moves in games:
+        recorder.start_game(board_size, win_length, stamp=0.0)
+        game = Game(board_size)
+        for row, col in moves:
+            recorder.record_move(row, col, game.get_present_marker(), stamp=1.0)
+            game.set_marker(row, col)
+    recorder.close()
+
+
+def test_record_size(tmp_path):
+    # Records are fixed-size so that they can be memory-mapped
+    assert RECORD_DTYPE.itemsize == 16
+
+    path = str(tmp_path / 'games.ttr')
+    _record_games(path, GAMES)
+    records = sum(len(moves) + 1 for _, _, moves in GAMES)
+    assert os.path.getsize(path) == HEADER_SIZE + records * RECORD_DTYPE.itemsize
+
+
+def test_replay(tmp_path):
+    path = str(tmp_path / 'games.ttr')
+    _record_games(path, GAMES[:2])
+    # Appending to the file continues the game ids
+    _record_games(path, GAMES[2:])
+
+    replay = GameReplay(path)
+    assert replay.get_game_count() == 3
+    assert list(replay.get_records()['game_id'][replay.get_game_range(2)[0]:]) == [3, 3, 3, 3]
+
+    for game_index, (board_size, win_length, moves) in enumerate(GAMES):
+        steps = list(replay.replay(game_index))
+        assert len(steps) == len(moves) + 1
+        game = steps[-1][1]
+        assert game.get_board_size() == board_size
+        assert game.get_win_length() == win_length
+        assert game.get_move_count() == len(moves)
+
+    winner, _ = list(replay.replay(1))[-1][1].calc_winner()
+    assert winner == Marker.O
+
+
+def test_seek(tmp_path):
+    path = str(tmp_path / 'games.ttr')
+    _record_games(path, GAMES)
+    replay = GameReplay(path)
+
+    start, end = replay.get_game_range(1)
+    assert replay.find_game(start) == 1
+    assert replay.find_game(end - 1) == 1
+    assert replay.seek(start).get_move_count() == 0
+    game = replay.seek(start + 3)
+    assert game.get_move_count() == 3
+    assert game.get_board_markers()[0][0] == Marker.X
+
+    with pytest.raises(IndexError):
+        replay.seek(replay.get_record_count())
+
+
+def test_illegal_records(tmp_path, capsys):
+    path = str(tmp_path / 'games.ttr')
+    recorder = GameRecorder(path)
+    recorder.start_game(3, 3)
+    recorder.record_move(1, 1, Marker.O)
+    # The marker of the other player
+    recorder.record_move(0, 0, Marker.O)
+    recorder.close()
+
+    replay = GameReplay(path)
+    with pytest.raises(ValueError):
+        replay.seek(2)
+    steps = replay.replay(0)
+    assert len([next(steps), next(steps)]) == 2
+    with pytest.raises(ValueError):
+        next(steps)
+    assert main([path, '--game', '0']) == 1
+    assert 'record 2 is not a legal move' in capsys.readouterr().err
+
+
+def test_drop_partial_record(tmp_path):
+    path = str(tmp_path / 'games.ttr')
+    _record_games(path, GAMES[:1])
+    with open(path, 'ab') as f:
+        f.write(b'\0' * 5)
+
+    _record_games(path, GAMES[1:2])
+    replay = GameReplay(path)
+    assert replay.get_game_count() == 2
+    assert replay.seek(replay.get_record_count() - 1).calc_winner()[0] == Marker.O
+
+
+def test_stop_game(tmp_path):
+    path = str(tmp_path / 'games.ttr')
+    recorder = GameRecorder(path)
+    recorder.record_move(0, 0, Marker.O)
+    recorder.start_game(3, 3)
+    recorder.record_move(0, 0, Marker.O)
+    recorder.stop_game()
+    recorder.record_move(1, 1, Marker.X)
+    recorder.close()
+    assert GameReplay(path).get_record_count() == 2
+
+
+def test_concurrent_recorders(tmp_path):
+    path = str(tmp_path / 'games.ttr')
+    _record_games(path, GAMES[:1])
+    first = GameRecorder(path)
+    second = GameRecorder(path)
+    assert first.get_path() == path
+    assert second.get_path() == str(tmp_path / 'games_1.ttr')
+    assert first.start_game(3, 3) == 2
+    assert second.start_game(3, 3) == 1
+    first.record_move(1, 1, Marker.O)
+    second.record_move(0, 0, Marker.O)
+    first.close()
+    second.close()
+
+    assert GameReplay(path).get_records()['game_id'].tolist()[-2:] == [2, 2]
+    assert GameReplay(second.get_path()).get_records()['game_id'].tolist() == [1, 1]
+    # The file of a closed recorder is used again
+    recorder = GameRecorder(path)
+    assert recorder.get_path() == path
+    recorder.close()
+
+
+def test_invalid_file(tmp_path):
+    path = str(tmp_path / 'games.ttr')
+    with open(path, 'wb') as f:
+        f.write(b'not a game record')
+    with pytest.raises(ValueError):
+        GameReplay(path)
+    with pytest.raises(ValueError):
+        GameRecorder(path)
+
+
+def test_main(tmp_path, capsys):
+    path = str(tmp_path / 'games.ttr')
+    _record_games(path, GAMES)
+    assert main([path]) == 0
+    assert '3 games, 24 records' in capsys.readouterr().out
+
+    assert main([path, '--game', '0', '--move', '1']) == 0
+    assert capsys.readouterr().out.splitlines() == ['. . .', '. O .', '. . .']
+
+    assert main([path, '--game', '-1']) == 0
+    assert capsys.readouterr().out.splitlines()[-1] == 'Winner: {}'.format(Marker.O)
+
+    empty_path = str(tmp_path / 'empty.ttr')
+    GameRecorder(empty_path).close()
+    assert main([empty_path, '--game', '0']) == 1
+    assert 'has no games' in capsys.readouterr().err
@@ -16,7 +16,7 @@ import numpy
 import pytest
 
 from rqt_tic_tac_toe.game import Game
-from rqt_tic_tac_toe_msgs.msg import Marker
+from rqt_tic_tac_toe.marker import Marker
 
 
 def test_initialize_board_size():
@@ -143,3 +143,105 @@ def test_board_is_full():
     game.set_marker(0, 1)
 
     assert game.board_is_full() is True
+
+
+def test_calc_winner_keeps_first_winner():
+    # O O O
+    # X X
+    # X
+    game = Game(board_size=3, first_marker=Marker.O)
+    game.set_marker(0, 0)
+    game.set_marker(1, 0)
+    game.set_marker(0, 1)
+    game.set_marker(1, 1)
+    game.set_marker(0, 2)
+    assert game.calc_winner() == (Marker.O, [(0, 0), (0, 2)])
+
+    # Markers set after the game has been decided should not change the winner
+    game.set_marker(2, 0)
+    game.set_marker(2, 2)
+    game.set_marker(1, 2)
+    assert game.calc_winner() == (Marker.O, [(0, 0), (0, 2)])
+
+
+def test_calc_winner_on_large_board():
+    game = Game(board_size=6, first_marker=Marker.O)
+    for i in range(5):
+        game.set_marker(i, 5 - i)
+        game.set_marker(i, 0)
+    assert game.calc_winner()[0] == Marker.NONE
+    assert game.board_is_full() is False
+
+    game.set_marker(5, 0)
+    assert game.calc_winner() == (Marker.O, [(0, 5), (5, 0)])
+
+
+def test_load_board_markers():
+    game = Game(board_size=3, first_marker=Marker.O)
+    assert game.get_move_count() == 0
+    game.set_marker(1, 1)
+    assert game.get_move_count() == 1
+
+    board = numpy.array([[Marker.X, Marker.O, Marker.NONE],
+                         [Marker.X, Marker.O, Marker.NONE],
+                         [Marker.X, Marker.NONE, Marker.O]])
+    game.load_board_markers(board, Marker.O)
+    assert (game.get_board_markers() == board).all()
+    assert game.get_present_marker() == Marker.O
+    assert game.get_move_count() == 6
+    assert game.calc_winner() == (Marker.X, [(0, 0), (2, 0)])
+
+    # Moves after loading should continue from the loaded board
+    assert game.set_marker(0, 0) is False
+    assert game.set_marker(0, 2) is True
+    assert game.get_move_count() == 7
+
+
+def test_make_and_unmake_move():
+    game = Game(board_size=3, first_marker=Marker.O)
+    assert game.unmake_move() is None
+
+    moves = [(0, 0), (1, 0), (0, 1), (1, 1), (0, 2)]
+    for row, col in moves:
+        assert game.make_move(row, col) is True
+    assert game.make_move(0, 0) is False
+    assert game.calc_winner() == (Marker.O, [(0, 0), (0, 2)])
+    assert game.get_last_move() == (0, 2)
+
+    # Unmaking every move restores the winner, the present marker and the board
+    assert game.unmake_move() == (0, 2)
+    assert game.calc_winner() == (Marker.NONE, [])
+    assert game.get_present_marker() == Marker.O
+    for row, col in reversed(moves[:-1]):
+        assert game.unmake_move() == (row, col)
+    assert game.get_move_count() == 0
+    assert (game.get_board_markers() == Marker.NONE).all()
+
+    # Line counts are rolled back too
+    for row, col in moves:
+        game.make_move(row, col)
+    assert game.calc_winner() == (Marker.O, [(0, 0), (0, 2)])
+
+
+def test_undo_and_redo():
+    game = Game(board_size=3, first_marker=Marker.O)
+    assert game.can_undo() is False
+    game.set_marker(1, 1)
+    game.set_marker(0, 0)
+
+    assert game.undo() == (0, 0)
+    assert game.get_present_marker() == Marker.X
+    assert game.can_redo() is True
+    assert game.get_next_move() == (0, 0)
+    assert game.redo() == (0, 0)
+    assert game.get_board_markers()[0][0] == Marker.X
+    assert game.redo() is None
+
+    # A new move discards the undone moves
+    game.undo()
+    game.set_marker(2, 2)
+    assert game.can_redo() is False
+
+    # The history of a loaded board is unknown
+    game.load_board_markers(game.get_board_markers().copy(), Marker.O)
+    assert game.can_undo() is False
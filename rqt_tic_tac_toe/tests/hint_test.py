@@ -0,0 +1,93 @@
+# Copyright 2023 ShotaAk
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import threading
+
+from rqt_tic_tac_toe.alpha_beta import WIN_SCORE
+from rqt_tic_tac_toe.game import Game
+from rqt_tic_tac_toe.hint import analyze_progressively
+from rqt_tic_tac_toe.hint import hint_value
+from rqt_tic_tac_toe.hint import HintAnalyzer
+from rqt_tic_tac_toe.search_worker import board_snapshot
+from rqt_tic_tac_toe.solution_table import default_path
+from rqt_tic_tac_toe.solution_table import write_solution_table
+
+
+def test_hint_value():
+    assert hint_value(WIN_SCORE - 3) == 1.0
+    assert hint_value(-WIN_SCORE + 3) == -1.0
+    assert hint_value(0) == 0.0
+    assert 0.0 < hint_value(100) < 0.5
+    assert -0.5 < hint_value(-100) < 0.0
+
+
+def test_analyze_progressively():
+    game = Game(board_size=3)
+    for row, col in [(0, 0), (1, 1), (0, 1)]:
+        game.set_marker(row, col)
+
+    depths = []
+    for depth, scores in analyze_progressively(board_snapshot(game), 9, lambda: False):
+        depths.append(depth)
+    assert depths == list(range(1, len(depths) + 1))
+    # X must block the row of O to draw, and every other move loses
+    assert scores[(0, 2)] == 0
+    assert all(hint_value(score) == -1.0 for cell, score in scores.items() if cell != (0, 2))
+
+    # Shallow depths may finish before the search checks should_stop
+    stop = [False]
+    for depth, _ in analyze_progressively(board_snapshot(Game(board_size=5)), 25, lambda: stop[0]):
+        stop[0] = True
+    assert depth < 5
+
+
+def test_analyze_solved_board(tmp_path, monkeypatch):
+    monkeypatch.setenv('ROS_HOME', str(tmp_path))
+    write_solution_table(default_path(3), 3)
+    game = Game(board_size=3)
+    for row, col in [(0, 0), (1, 1), (0, 1)]:
+        game.set_marker(row, col)
+
+    # The exact results are given at once
+    results = list(analyze_progressively(board_snapshot(game), 9, lambda: False))
+    assert len(results) == 1
+    depth, scores = results[0]
+    assert depth == 6
+    assert scores[(0, 2)] == 0
+    assert all(hint_value(score) == -1.0 for cell, score in scores.items() if cell != (0, 2))
+
+
+def test_hint_analyzer():
+    results = []
+    finished = threading.Event()
+
+    def callback(generation, depth, scores):
+        results.append((generation, depth, scores))
+        if len(scores) == 9 and depth == 9:
+            finished.set()
+
+    analyzer = HintAnalyzer(callback)
+    try:
+        # The analysis of the large board is abandoned for the next board
+        analyzer.analyze(Game(board_size=6))
+        generation = analyzer.analyze(Game(board_size=3))
+        assert finished.wait(30.0)
+    finally:
+        analyzer.shutdown()
+
+    last_generation, last_depth, scores = results[-1]
+    assert last_generation == generation
+    assert last_depth == 9
+    # Every move on the empty board draws with perfect play
+    assert set(scores.values()) == {0}
@@ -0,0 +1,145 @@
+# Copyright 2023 ShotaAk
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import random
+
+import numpy
+import pytest
+
+from conftest import play_moves
+from rqt_tic_tac_toe.bitboard_game import line_masks
+from rqt_tic_tac_toe.game import Game
+from rqt_tic_tac_toe.k_in_a_row_game import KInARowGame
+from rqt_tic_tac_toe.marker import Marker
+
+
+def test_initialize():
+    game = KInARowGame(board_size=19, win_length=5)
+    assert game.get_board_size() == 19
+    assert game.get_win_length() == 5
+    assert game.get_stones() == {}
+
+    # Win length can not exceed the board size
+    game = KInARowGame(board_size=3, win_length=5)
+    assert game.get_win_length() == 3
+
+
+def test_set_marker():
+    game = KInARowGame(board_size=15, win_length=5, first_marker=Marker.O)
+
+    assert game.set_marker(-1, 0) is False
+    assert game.set_marker(0, 15) is False
+
+    assert game.set_marker(7, 7) is True
+    assert game.set_marker(7, 7) is False
+    assert game.get_present_marker() == Marker.X
+    assert game.get_stones() == {(7, 7): Marker.O}
+
+
+@pytest.mark.parametrize('d_row, d_col', [(0, 1), (1, 0), (1, 1), (1, -1)])
+def test_five_in_a_row(d_row, d_col):
+    game = KInARowGame(board_size=19, win_length=5, first_marker=Marker.O)
+    # O plays the run out of order, and X plays far away
+    for i in [0, 1, 3, 4]:
+        play_moves(game, [(9 + d_row * i, 9 + d_col * i), (0, i)])
+        assert game.calc_winner()[0] == Marker.NONE
+
+    play_moves(game, [(9 + d_row * 2, 9 + d_col * 2)])
+    assert game.calc_winner() == (Marker.O, [(9, 9), (9 + d_row * 4, 9 + d_col * 4)])
+
+
+def test_get_board_markers():
+    game = KInARowGame(board_size=5, win_length=3, first_marker=Marker.O)
+    play_moves(game, [(0, 0), (4, 4)])
+    board = game.get_board_markers()
+    play_moves(game, [(2, 2)])
+
+    expected = numpy.full((5, 5), Marker.NONE)
+    expected[0][0] = Marker.O
+    expected[4][4] = Marker.X
+    expected[2][2] = Marker.O
+    assert numpy.array_equal(board, expected)
+    assert numpy.array_equal(game.get_board_markers(), expected)
+
+
+def test_same_result_as_game_on_full_lines():
+    rng = random.Random(0)
+    for board_size in [2, 3, 4, 5, 6]:
+        game = Game(board_size=board_size, first_marker=Marker.O)
+        k_in_a_row = KInARowGame(board_size=board_size, win_length=board_size, first_marker=Marker.O)
+        cells = [(row, col) for row in range(board_size) for col in range(board_size)]
+        rng.shuffle(cells)
+        for row, col in cells:
+            if game.calc_winner()[0] != Marker.NONE:
+                break
+            game.set_marker(row, col)
+            k_in_a_row.set_marker(row, col)
+            assert k_in_a_row.calc_winner() == game.calc_winner()
+            assert k_in_a_row.board_is_full() == game.board_is_full()
+
+
+def test_line_masks():
+    # 3 in a row on 4x4: 2 per row and column, 4 per diagonal direction
+    assert len(line_masks(4, 3)) == 8 + 8 + 4 + 4
+    assert len(line_masks(4)) == 4 + 4 + 1 + 1
+
+
+def test_load_board_markers():
+    moves = [(7, 3), (0, 0), (7, 4), (0, 1), (7, 5), (0, 2), (7, 6)]
+    played = play_moves(KInARowGame(board_size=15, win_length=5), moves)
+
+    game = KInARowGame(board_size=15, win_length=5)
+    game.set_marker(14, 14)
+    game.load_board_markers(played.get_board_markers(), played.get_present_marker())
+    assert game.get_stones() == played.get_stones()
+    assert game.get_move_count() == len(moves)
+    assert game.get_present_marker() == Marker.X
+    assert game.calc_winner()[0] == Marker.NONE
+
+    game.set_marker(0, 3)
+    assert game.set_marker(7, 7) is True
+    assert game.calc_winner() == (Marker.O, [(7, 3), (7, 7)])
+
+
+def test_make_and_unmake_move():
+    game = KInARowGame(board_size=15, win_length=5, first_marker=Marker.O)
+    board = game.get_board_markers()
+    moves = [(7, i) for i in range(4)] + [(8, 0), (9, 0), (10, 0), (11, 0)]
+    moves = [move for pair in zip(moves[:4], moves[4:]) for move in pair] + [(7, 4)]
+    play_moves(game, moves)
+    assert game.calc_winner() == (Marker.O, [(7, 0), (7, 4)])
+
+    assert game.unmake_move() == (7, 4)
+    assert game.calc_winner() == (Marker.NONE, [])
+    assert game.get_present_marker() == Marker.O
+    assert board[7][4] == Marker.NONE
+    while game.unmake_move() is not None:
+        pass
+    assert game.get_move_count() == 0
+    assert (board == Marker.NONE).all()
+
+
+def test_undo_and_redo():
+    game = play_moves(KInARowGame(board_size=15, win_length=5), [(7, 7), (7, 8)])
+    assert game.undo() == (7, 8)
+    assert game.get_next_move() == (7, 8)
+    assert game.copy().redo() == (7, 8)
+    assert game.redo() == (7, 8)
+    assert game.get_last_move() == (7, 8)
+
+    game.undo()
+    game.set_marker(0, 0)
+    assert game.can_redo() is False
+    game.load_board_markers(game.get_board_markers().copy(), Marker.O)
+    assert game.can_undo() is False
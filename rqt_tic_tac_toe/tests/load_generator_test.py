@@ -0,0 +1,44 @@
+# Copyright 2023 ShotaAk
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from rqt_tic_tac_toe.load_generator import _VirtualPlayer
+from rqt_tic_tac_toe.marker import Marker
+from rqt_tic_tac_toe_msgs.msg import Command
+
+
+def test_virtual_player_fills_commands():
+    player = _VirtualPlayer('load_0', 3, 3, 0)
+    markers = []
+    while True:
+        command = Command()
+        if not player.fill_command(command):
+            break
+        # The message fields take only Python ints
+        for value in [command.row, command.column, command.marker, command.epoch,
+                      command.sequence, command.board_hash]:
+            assert type(value) is int
+        assert command.header.frame_id == 'load_0'
+        assert command.action == Command.PLACE
+        assert command.epoch == 0
+        assert command.sequence == len(markers) + 1
+        assert command.board_hash == player.get_game().get_hash()
+        assert player.get_game().get_board_markers()[command.row][command.column] == \
+            command.marker
+        markers.append(command.marker)
+
+    assert markers[:2] == [Marker.O, Marker.X]
+    assert 5 <= len(markers) <= 9
+    # The next game starts after the game is over
+    assert player.get_epoch() == 1
+    assert player.get_game().get_move_count() == 0
@@ -0,0 +1,53 @@
+# Copyright 2023 ShotaAk
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import subprocess
+import sys
+
+import pytest
+
+from rqt_tic_tac_toe.marker import Marker
+
+
+def _imported_modules(modules):
+    # Import in a fresh interpreter, since this one has loaded everything already
+    code = 'import sys\n'
+    code += ''.join('import {}\n'.format(module) for module in modules)
+    code += 'print("\\n".join(sys.modules))'
+    result = subprocess.run([sys.executable, '-c', code],
+                            stdout=subprocess.PIPE, check=True, universal_newlines=True)
+    return set(result.stdout.split())
+
+
+def test_marker_matches_msg():
+    msg = pytest.importorskip('rqt_tic_tac_toe_msgs.msg')
+    assert Marker.NONE == msg.Marker.NONE
+    assert Marker.O == msg.Marker.O
+    assert Marker.X == msg.Marker.X
+
+
+def test_core_does_not_import_ros_or_qt():
+    imported = _imported_modules([
+        'rqt_tic_tac_toe.alpha_beta', 'rqt_tic_tac_toe.game', 'rqt_tic_tac_toe.game_record',
+        'rqt_tic_tac_toe.hint',
+        'rqt_tic_tac_toe.match', 'rqt_tic_tac_toe.search_worker', 'rqt_tic_tac_toe.tournament'])
+    for module in ['python_qt_binding', 'rclpy', 'rqt_tic_tac_toe_msgs']:
+        assert module not in imported
+
+
+def test_headless_games_do_not_import_numpy():
+    imported = _imported_modules([
+        'rqt_tic_tac_toe.bitboard_game', 'rqt_tic_tac_toe.k_in_a_row_game',
+        'rqt_tic_tac_toe.players', 'rqt_tic_tac_toe.tournament'])
+    assert 'numpy' not in imported
@@ -0,0 +1,122 @@
+# Copyright 2023 ShotaAk
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import re
+
+import pytest
+
+from rqt_tic_tac_toe.game import Game
+from rqt_tic_tac_toe.k_in_a_row_game import KInARowGame
+from rqt_tic_tac_toe.marker import Marker
+from rqt_tic_tac_toe.match import create_game
+from rqt_tic_tac_toe.match import Match
+from rqt_tic_tac_toe.match import match_namespace
+from rqt_tic_tac_toe.match import MatchRegistry
+from rqt_tic_tac_toe.match import player_marker
+
+
+def test_create_game():
+    assert isinstance(create_game(3, 3), Game)
+    assert isinstance(create_game(15, 5), KInARowGame)
+
+
+def test_match_namespace():
+    assert match_namespace('alice', 'bob') == match_namespace('bob', 'alice')
+    assert match_namespace('alice', 'bob') != match_namespace('alice', 'carol')
+
+    # Names that differ only in characters invalid for topics should not share a match
+    namespace = match_namespace('a-b', 'c')
+    assert re.fullmatch('[0-9A-Za-z_/]+', namespace)
+    assert namespace != match_namespace('a_b', 'c')
+
+
+def test_player_marker():
+    assert player_marker('alice', 'bob') == Marker.O
+    assert player_marker('bob', 'alice') == Marker.X
+
+
+def test_play():
+    match = Match('bob', 'alice', 3, 3)
+    assert match.get_players() == ('alice', 'bob')
+
+    # Only the player to move can place a marker, on top of the present board
+    assert match.play('bob', 0, 0, 0, 1) is False
+    assert match.play('carol', 0, 0, 0, 1) is False
+    assert match.play('alice', 0, 0, 0, 2) is False
+    assert match.play('alice', 0, 0, 1, 1) is False
+    assert match.play('alice', 0, 0, 0, 1) is True
+    assert match.play('alice', 1, 1, 0, 2) is False
+    assert match.play('bob', 0, 0, 0, 2) is False
+    assert match.play('bob', 1, 1, 0, 2) is True
+    assert match.get_game().get_move_count() == 2
+
+    match.reset(3, 3)
+    assert match.get_epoch() == 1
+    assert match.get_game().get_move_count() == 0
+    assert match.play('alice', 0, 0, 0, 1) is False
+    assert match.play('alice', 0, 0, 1, 1) is True
+
+
+def test_play_after_game_over():
+    match = Match('alice', 'bob', 2, 2)
+    assert match.play('alice', 0, 0, 0, 1)
+    assert match.play('bob', 1, 0, 0, 2)
+    assert match.play('alice', 0, 1, 0, 3)
+    assert match.is_over()
+    assert match.play('bob', 1, 1, 0, 4) is False
+
+
+def test_registry_join():
+    registry = MatchRegistry()
+    match, created = registry.join('alice', 'bob', 3, 3)
+    assert created is True
+    assert registry.join('bob', 'alice', 3, 3) == (match, False)
+    assert registry.get_match(match.get_namespace()) is match
+    assert registry.get_match_count() == 1
+
+    match.play('alice', 1, 1, 0, 1)
+    registry.join('bob', 'alice', 3, 3)
+    assert match.get_game().get_move_count() == 1
+    registry.join('bob', 'alice', 4, 4, reset=True)
+    assert match.get_epoch() == 1
+    assert match.get_game().get_board_size() == 4
+
+
+def test_registry_rejects_unsupported_boards():
+    registry = MatchRegistry()
+    for board_size, win_length in [(2, 2), (26, 5), (1000000, 3), (5, 2), (5, 6)]:
+        with pytest.raises(ValueError):
+            registry.join('alice', 'bob', board_size, win_length)
+    assert registry.get_match_count() == 0
+
+    match, _ = registry.join('alice', 'bob', 3, 3)
+    with pytest.raises(ValueError):
+        registry.join('alice', 'bob', 30, 3, reset=True)
+    assert match.get_game().get_board_size() == 3
+
+
+def test_registry_removes_least_recently_used():
+    removed = []
+    registry = MatchRegistry(max_matches=2, on_removed=removed.append)
+    first, _ = registry.join('a', 'b', 3, 3)
+    second, _ = registry.join('a', 'c', 3, 3)
+    registry.get_match(first.get_namespace())
+    registry.join('a', 'd', 3, 3)
+    assert removed == [second]
+    assert registry.get_match_count() == 2
+    assert registry.get_match(second.get_namespace()) is None
+
+    assert registry.remove(first.get_namespace()) is True
+    assert registry.remove(first.get_namespace()) is False
+    assert removed == [second, first]
@@ -0,0 +1,56 @@
+# Copyright 2023 ShotaAk
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from conftest import play_moves
+from rqt_tic_tac_toe.game import Game
+from rqt_tic_tac_toe.mcts import MCTSPlayer
+from rqt_tic_tac_toe.mcts import search
+
+
+def test_search_visits_every_root_move():
+    visits, playouts = search(board_size=3, own=0, opp=0, time_limit=0.05, seed=0)
+    assert sorted(visits) == list(range(9))
+    assert sum(visits.values()) == playouts
+
+
+def test_choose_move_on_finished_game():
+    game = play_moves(Game(board_size=2), [(0, 0), (1, 0), (0, 1)])
+    assert MCTSPlayer(workers=1).choose_move(game) is None
+
+
+def test_take_the_win():
+    # O O .
+    # X X .
+    # . . .
+    game = play_moves(Game(board_size=3), [(0, 0), (1, 0), (0, 1), (1, 1)])
+    assert MCTSPlayer(workers=1, seed=0).choose_move(game, time_limit=0.2) == (0, 2)
+
+
+def test_block_the_opponent():
+    # O O .
+    # X . .
+    # . . .
+    game = play_moves(Game(board_size=3), [(0, 0), (1, 0), (0, 1)])
+    assert MCTSPlayer(workers=1, seed=0).choose_move(game, time_limit=0.2) == (0, 2)
+
+
+def test_process_pool():
+    player = MCTSPlayer(workers=2, seed=0)
+    try:
+        game = play_moves(Game(board_size=5), [(2, 2)])
+        row, col = player.choose_move(game, time_limit=0.1)
+        assert game.get_board_markers()[row][col] == 0
+        assert player.get_playouts() > 0
+    finally:
+        player.shutdown()
@@ -0,0 +1,61 @@
+# Copyright 2023 ShotaAk
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import pytest
+
+from conftest import play_moves
+from rqt_tic_tac_toe.bitboard_game import BitboardGame
+from rqt_tic_tac_toe.game import Game
+from rqt_tic_tac_toe.k_in_a_row_game import KInARowGame
+from rqt_tic_tac_toe.players import create_player
+from rqt_tic_tac_toe.players import GreedyPlayer
+from rqt_tic_tac_toe.players import RandomPlayer
+
+
+@pytest.mark.parametrize('game_class', [Game, BitboardGame])
+def test_random_player(game_class):
+    game = play_moves(game_class(board_size=3), [(0, 0), (1, 1), (2, 2)])
+    player = RandomPlayer(seed=0)
+    for _ in range(20):
+        row, col = player.choose_move(game)
+        assert game.get_board_markers()[row][col] == 0
+
+    play_moves(game, [(0, 2), (2, 0), (1, 0), (0, 1), (2, 1), (1, 2)])
+    assert player.choose_move(game) is None
+
+
+@pytest.mark.parametrize('game_class', [Game, BitboardGame])
+def test_greedy_player_wins(game_class):
+    # O can win at (0, 2) and should prefer it to blocking X at (1, 2)
+    game = play_moves(game_class(board_size=3), [(0, 0), (1, 0), (0, 1), (1, 1)])
+    assert GreedyPlayer(seed=0).choose_move(game) == (0, 2)
+
+
+@pytest.mark.parametrize('game_class', [Game, BitboardGame])
+def test_greedy_player_blocks(game_class):
+    game = play_moves(game_class(board_size=3), [(0, 0), (1, 0), (2, 2), (1, 1)])
+    assert GreedyPlayer(seed=0).choose_move(game) == (1, 2)
+
+
+def test_greedy_player_on_k_in_a_row():
+    game = play_moves(KInARowGame(board_size=7, win_length=3),
+                       [(0, 0), (3, 3), (6, 6), (3, 4)])
+    assert GreedyPlayer(seed=0).choose_move(game) in [(3, 2), (3, 5)]
+
+
+def test_create_player():
+    assert isinstance(create_player('random'), RandomPlayer)
+    assert isinstance(create_player('rqt_tic_tac_toe.players:GreedyPlayer'), GreedyPlayer)
+    with pytest.raises(ValueError):
+        create_player('unknown')
@@ -0,0 +1,100 @@
+# Copyright 2023 ShotaAk
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import pytest
+
+from rqt_tic_tac_toe.profiler import LatencyHistogram
+from rqt_tic_tac_toe.profiler import Profiler
+from rqt_tic_tac_toe.profiler import StreamStats
+
+
+def test_histogram_percentiles():
+    histogram = LatencyHistogram(budget=0.01)
+    assert histogram.percentile(50) == 0.0
+
+    for _ in range(90):
+        histogram.record(0.001)
+    for _ in range(10):
+        histogram.record(0.05)
+
+    assert histogram.get_count() == 100
+    assert histogram.get_max() == 0.05
+    assert histogram.get_missed() == 10
+    assert histogram.get_mean() == pytest.approx(0.0059)
+    # Percentiles are accurate within a bucket (about 12 %)
+    assert histogram.percentile(50) == pytest.approx(0.001, rel=0.13)
+    assert histogram.percentile(99) == pytest.approx(0.05, rel=0.13)
+    assert histogram.percentile(100) == 0.05
+
+
+def test_histogram_merge():
+    histogram = LatencyHistogram(budget=0.01)
+    histogram.record(0.001)
+    other = LatencyHistogram(budget=0.01)
+    other.record(0.05)
+    other.record(0.05)
+
+    histogram.merge(other)
+    assert histogram.get_count() == 3
+    assert histogram.get_max() == 0.05
+    assert histogram.get_missed() == 2
+    assert histogram.percentile(50) == pytest.approx(0.05, rel=0.13)
+
+
+def test_disabled_profiler_records_nothing():
+    profiler = Profiler()
+    assert profiler.is_enabled() is False
+
+    with profiler.measure('section'):
+        pass
+    assert profiler.get_histograms() == {}
+
+
+def test_enabled_profiler():
+    profiler = Profiler()
+    profiler.set_enabled(True)
+
+    for _ in range(3):
+        with profiler.measure('section'):
+            pass
+    profiler.record('other', 0.002)
+
+    histograms = profiler.get_histograms()
+    assert histograms['section'].get_count() == 3
+    assert histograms['other'].get_max() == 0.002
+    assert 'other n=1' in profiler.summary_text()
+
+    profiler.reset()
+    assert profiler.get_histograms() == {}
+
+
+def test_stream_stats():
+    stats = StreamStats(budget=0.01)
+    assert stats.get_throughput() == 0.0
+
+    stats.add_sent(5)
+    for i in range(4):
+        stats.add_received(0.002 * (i + 1), 10.0 + i * 0.5)
+    # A stamp from a clock ahead of the receiver counts as no latency
+    stats.add_received(-0.001, 12.0)
+
+    assert stats.get_sent() == 5
+    assert stats.get_received() == 5
+    assert stats.get_dropped() == 0
+    assert stats.get_throughput() == pytest.approx(2.0)
+    assert stats.get_latency().get_count() == 5
+    assert stats.get_latency().get_max() == pytest.approx(0.008)
+
+    stats.add_sent(3)
+    assert stats.get_dropped() == 3
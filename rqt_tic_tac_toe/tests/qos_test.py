@@ -0,0 +1,81 @@
+# Copyright 2023 ShotaAk
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import pytest
+from rclpy.qos import DurabilityPolicy
+from rclpy.qos import HistoryPolicy
+from rclpy.qos import ReliabilityPolicy
+
+from rqt_tic_tac_toe.qos import CURSOR_POS_STREAM
+from rqt_tic_tac_toe.qos import DEFAULT_STREAM_QOS
+from rqt_tic_tac_toe.qos import MAX_DEPTH
+from rqt_tic_tac_toe.qos import restore_stream_qos
+from rqt_tic_tac_toe.qos import save_stream_qos
+from rqt_tic_tac_toe.qos import STATE_STREAM
+from rqt_tic_tac_toe.qos import StreamQos
+from rqt_tic_tac_toe.qos import STREAMS
+
+
+class _Settings():
+    # Stand-in of qt_gui.settings.Settings
+
+    def __init__(self):
+        self._values = {}
+
+    def set_value(self, key, value):
+        self._values[key] = value
+
+    def value(self, key, default_value=None):
+        return self._values.get(key, default_value)
+
+
+def test_stream_qos():
+    qos = StreamQos('best_effort', 'volatile', 0)
+    assert qos.get_depth() == 1
+    assert StreamQos(depth=MAX_DEPTH + 1).get_depth() == MAX_DEPTH
+
+    with pytest.raises(ValueError):
+        StreamQos(reliability='lossy')
+    with pytest.raises(ValueError):
+        StreamQos(durability='persistent')
+
+
+def test_to_profile():
+    profile = DEFAULT_STREAM_QOS[CURSOR_POS_STREAM].to_profile()
+    assert profile.history == HistoryPolicy.KEEP_LAST
+    assert profile.depth == 1
+    assert profile.reliability == ReliabilityPolicy.BEST_EFFORT
+    assert profile.durability == DurabilityPolicy.VOLATILE
+
+    profile = DEFAULT_STREAM_QOS[STATE_STREAM].to_profile()
+    assert profile.reliability == ReliabilityPolicy.RELIABLE
+    assert profile.durability == DurabilityPolicy.TRANSIENT_LOCAL
+
+
+def test_save_and_restore():
+    settings = _Settings()
+    assert restore_stream_qos(settings) == DEFAULT_STREAM_QOS
+    assert sorted(DEFAULT_STREAM_QOS) == sorted(STREAMS)
+
+    stream_qos = dict(DEFAULT_STREAM_QOS)
+    stream_qos[STATE_STREAM] = StreamQos('best_effort', 'volatile', 5)
+    save_stream_qos(stream_qos, settings)
+    assert restore_stream_qos(settings) == stream_qos
+
+    # Broken settings fall back to the default
+    settings.set_value('qos_state_reliability', 'lossy')
+    settings.set_value('qos_cursor_pos_depth', 'many')
+    restored = restore_stream_qos(settings)
+    assert restored[STATE_STREAM] == DEFAULT_STREAM_QOS[STATE_STREAM]
+    assert restored[CURSOR_POS_STREAM] == DEFAULT_STREAM_QOS[CURSOR_POS_STREAM]
@@ -0,0 +1,114 @@
+# Copyright 2023 ShotaAk
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import numpy
+import pytest
+
+from rqt_tic_tac_toe.marker import Marker
+from rqt_tic_tac_toe.snapshot import classify_delta
+from rqt_tic_tac_toe.snapshot import classify_history_delta
+from rqt_tic_tac_toe.snapshot import DELTA_APPLY
+from rqt_tic_tac_toe.snapshot import DELTA_GAP
+from rqt_tic_tac_toe.snapshot import DELTA_STALE
+from rqt_tic_tac_toe.snapshot import is_newer_snapshot
+from rqt_tic_tac_toe.snapshot import pack_cells
+from rqt_tic_tac_toe.snapshot import unpack_board_state
+from rqt_tic_tac_toe.snapshot import unpack_cells
+
+
+def test_pack_cells():
+    board = numpy.array([[Marker.O, Marker.X, Marker.NONE],
+                         [Marker.NONE, Marker.X, Marker.O],
+                         [Marker.NONE, Marker.NONE, Marker.O]])
+    data = pack_cells(board)
+    # 9 cells fit in 3 bytes
+    assert len(data) == 3
+    assert data[0] == Marker.O | Marker.X << 2 | Marker.NONE << 4 | Marker.NONE << 6
+    assert (unpack_cells(data, 3) == board).all()
+
+
+@pytest.mark.parametrize('board_size', [2, 3, 4, 7, 19, 25])
+def test_pack_and_unpack_random_boards(board_size):
+    rng = numpy.random.default_rng(board_size)
+    board = rng.choice([Marker.NONE, Marker.O, Marker.X], size=(board_size, board_size))
+    data = pack_cells(board)
+    assert len(data) == (board_size * board_size + 3) // 4
+    assert (unpack_cells(data, board_size) == board).all()
+
+
+def test_unpack_short_data():
+    with pytest.raises(ValueError):
+        unpack_cells(bytes(2), 3)
+
+
+
+class _State():
+    # Stand-in of rqt_tic_tac_toe_msgs/msg/BoardState
+
+    def __init__(self, board, win_length, present_marker=Marker.O):
+        self.board_size = len(board)
+        self.win_length = win_length
+        self.present_marker = present_marker
+        self.cells = pack_cells(numpy.array(board))
+
+
+def test_unpack_board_state():
+    sizes = range(2, 26)
+    board = [[Marker.O, Marker.NONE, Marker.NONE],
+             [Marker.NONE, Marker.X, Marker.NONE],
+             [Marker.NONE, Marker.NONE, Marker.NONE]]
+    numpy.testing.assert_array_equal(unpack_board_state(_State(board, 3), sizes, sizes), board)
+
+    bad_states = [
+        _State([[Marker.NONE] * 30] * 30, 3),
+        _State(board, 26),
+        _State(board, 3, present_marker=Marker.NONE),
+        _State([[Marker.O, Marker.NONE, Marker.NONE], [Marker.NONE, 3, Marker.NONE],
+                [Marker.NONE, Marker.NONE, Marker.NONE]], 3),
+    ]
+    short_state = _State(board, 3)
+    short_state.cells = short_state.cells[:1]
+    bad_states.append(short_state)
+    for state in bad_states:
+        with pytest.raises(ValueError):
+            unpack_board_state(state, sizes, sizes)
+
+
+def test_classify_delta():
+    assert classify_delta(1, 5, 1, 4) == DELTA_APPLY
+    # Already applied or from an old game
+    assert classify_delta(1, 4, 1, 4) == DELTA_STALE
+    assert classify_delta(1, 3, 1, 4) == DELTA_STALE
+    assert classify_delta(0, 9, 1, 4) == DELTA_STALE
+    # Commands were lost
+    assert classify_delta(1, 6, 1, 4) == DELTA_GAP
+    assert classify_delta(2, 1, 1, 4) == DELTA_GAP
+
+
+def test_classify_history_delta():
+    # Undo
+    assert classify_history_delta(2, 3, 1, 4, -1) == DELTA_APPLY
+    # Redo
+    assert classify_history_delta(2, 5, 1, 4, 1) == DELTA_APPLY
+    assert classify_history_delta(1, 3, 1, 4, -1) == DELTA_STALE
+    # Commands were lost or the boards differ
+    assert classify_history_delta(3, 3, 1, 4, -1) == DELTA_GAP
+    assert classify_history_delta(2, 2, 1, 4, -1) == DELTA_GAP
+
+
+def test_is_newer_snapshot():
+    assert is_newer_snapshot(1, 5, 1, 4) is True
+    assert is_newer_snapshot(2, 0, 1, 4) is True
+    assert is_newer_snapshot(1, 4, 1, 4) is False
+    assert is_newer_snapshot(0, 9, 1, 4) is False
@@ -0,0 +1,120 @@
+# Copyright 2023 ShotaAk
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import pytest
+
+from conftest import play_moves
+from rqt_tic_tac_toe.game import Game
+from rqt_tic_tac_toe.solution_table import load_solution_table
+from rqt_tic_tac_toe.solution_table import solve
+from rqt_tic_tac_toe.solution_table import SolutionTable
+from rqt_tic_tac_toe.solution_table import write_solution_table
+
+
+@pytest.fixture(scope='module')
+def table_3x3(tmp_path_factory):
+    path = str(tmp_path_factory.mktemp('tables') / 'solution_3x3.bin')
+    write_solution_table(path, 3)
+    return SolutionTable(path)
+
+
+def test_solve_counts_positions():
+    # Number of reachable 3x3 positions up to symmetry
+    assert len(solve(3)) == 765
+
+    with pytest.raises(ValueError):
+        solve(7)
+
+
+def test_empty_board_is_a_draw(table_3x3):
+    value, best_moves = table_3x3.lookup(Game(board_size=3))
+    assert value == 0
+    assert len(best_moves) == 9
+
+
+def test_lookup(table_3x3):
+    # O O .
+    # X X .
+    # . . .
+    game = play_moves(Game(board_size=3), [(0, 0), (1, 0), (0, 1), (1, 1)])
+    value, best_moves = table_3x3.lookup(game)
+    assert value == 1
+    assert (0, 2) in best_moves
+    assert table_3x3.choose_move(game) == (0, 2)
+
+    # O . .
+    # . . .
+    # . . .
+    # X loses unless it takes the center
+    game = play_moves(Game(board_size=3), [(0, 0)])
+    assert table_3x3.lookup(game) == (0, [(1, 1)])
+
+
+def test_lookup_is_symmetric(table_3x3):
+    # . . O
+    # . . .
+    # . . .
+    game = play_moves(Game(board_size=3), [(0, 2)])
+    assert table_3x3.lookup(game) == (0, [(1, 1)])
+
+    # Corner opening answered by an edge loses
+    # . . .
+    # . . X
+    # . . O
+    game = play_moves(Game(board_size=3), [(2, 2), (1, 2)])
+    value, best_moves = table_3x3.lookup(game)
+    assert value == 1
+    assert (1, 1) in best_moves
+
+
+def test_lookup_moves(table_3x3):
+    # O O .
+    # . X .
+    # . . .
+    game = play_moves(Game(board_size=3), [(0, 0), (1, 1), (0, 1)])
+    values = table_3x3.lookup_moves(game)
+    assert len(values) == 6
+    # X must block the row of O to draw, and every other move loses
+    assert values.pop((0, 2)) == 0
+    assert set(values.values()) == {-1}
+
+    # O O X
+    # . X .
+    # . . .
+    # O must block the diagonal of X in turn
+    game.set_marker(0, 2)
+    assert table_3x3.lookup_moves(game)[(2, 0)] == 0
+    assert table_3x3.lookup_moves(game)[(2, 2)] == -1
+
+
+def test_lookup_other_board_size(table_3x3):
+    assert table_3x3.lookup(Game(board_size=4)) is None
+
+
+def test_load_solution_table(tmp_path):
+    assert load_solution_table(2, str(tmp_path)) is None
+
+    # A table generated after a failed load is found
+    write_solution_table(str(tmp_path / 'solution_2x2.bin'), 2)
+    table = load_solution_table(2, str(tmp_path))
+    assert table.get_board_size() == 2
+    assert load_solution_table(2, str(tmp_path)) is table
+    assert table.lookup(Game(board_size=2))[0] == 1
+
+
+def test_invalid_file(tmp_path):
+    path = tmp_path / 'invalid.bin'
+    path.write_bytes(b'\0' * 64)
+    with pytest.raises(ValueError):
+        SolutionTable(str(path))
@@ -0,0 +1,76 @@
+# Copyright 2023 ShotaAk
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import pytest
+
+from rqt_tic_tac_toe.players import GreedyPlayer
+from rqt_tic_tac_toe.tournament import main
+from rqt_tic_tac_toe.tournament import play_game
+from rqt_tic_tac_toe.tournament import run_tournament
+from rqt_tic_tac_toe.tournament import wilson_interval
+
+
+class _IllegalPlayer():
+
+    def choose_move(self, game, time_limit):
+        return (-1, -1)
+
+
+def test_wilson_interval():
+    assert wilson_interval(0, 0) == (0.0, 1.0)
+    low, high = wilson_interval(50, 100)
+    assert low == pytest.approx(0.4038, abs=1e-4)
+    assert high == pytest.approx(0.5962, abs=1e-4)
+    # The interval stays inside [0, 1] at the extremes
+    low, high = wilson_interval(0, 10)
+    assert low == 0.0
+    assert 0.0 < high < 0.5
+
+
+def test_play_game():
+    assert play_game([_IllegalPlayer(), GreedyPlayer()], 3, 3, 0.0) == (1, 0)
+    winner, moves = play_game([GreedyPlayer(seed=0), _IllegalPlayer()], 3, 3, 0.0)
+    assert (winner, moves) == (0, 1)
+
+
+def test_run_tournament():
+    streamed = []
+    results = run_tournament(['random', 'greedy', 'alphabeta'], 20, 3, 3, time_limit=0.01,
+                             workers=1, chunk_size=10, progress=streamed.append)
+    assert sorted(results) == [
+        ('greedy', 'alphabeta'), ('random', 'alphabeta'), ('random', 'greedy')]
+    assert len(streamed) == 6
+
+    for result in results.values():
+        assert result.get_games() == 20
+        assert result.get_wins() + result.get_draws() + result.get_losses() == 20
+        assert result.get_latencies()[0].get_count() > 0
+
+    # The perfect player never loses
+    assert results[('random', 'alphabeta')].get_wins() == 0
+    assert results[('greedy', 'alphabeta')].get_wins() == 0
+
+
+def test_run_tournament_in_processes():
+    results = run_tournament(['random', 'greedy'], 100, 3, 3, workers=2, chunk_size=25)
+    result = results[('random', 'greedy')]
+    assert result.get_games() == 100
+    assert result.get_losses() > result.get_wins()
+
+
+def test_main(capsys):
+    assert main(['random', 'greedy', '--games', '10', '--workers', '1']) == 0
+    out = capsys.readouterr().out
+    assert 'random vs greedy: 10 games' in out
+    assert 'games/s' in out
@@ -0,0 +1,82 @@
+# Copyright 2023 ShotaAk
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import numpy
+import pytest
+
+from rqt_tic_tac_toe.game import Game
+from rqt_tic_tac_toe.k_in_a_row_game import KInARowGame
+from rqt_tic_tac_toe.marker import Marker
+from rqt_tic_tac_toe.zobrist import ZobristHash
+from rqt_tic_tac_toe.zobrist import zobrist_keys
+
+
+def test_toggle():
+    zobrist_hash = ZobristHash(3)
+    assert zobrist_hash.get_hash() == 0
+    zobrist_hash.toggle(0, 1, 0)
+    first = zobrist_hash.get_hash()
+    assert first == zobrist_keys(3)[0][1]
+    zobrist_hash.toggle(2, 2, 1)
+    copied = zobrist_hash.copy()
+    zobrist_hash.toggle(2, 2, 1)
+    assert zobrist_hash.get_hash() == first
+    assert copied.get_hash() != first
+
+    zobrist_hash.reset()
+    assert zobrist_hash.get_hash() == 0
+
+
+@pytest.mark.parametrize('create_game', [
+    lambda: Game(board_size=4),
+    lambda: KInARowGame(board_size=4, win_length=3),
+])
+def test_game_hash(create_game):
+    game = create_game()
+    empty_hash = game.get_hash()
+    hashes = [empty_hash]
+    for row, col in [(0, 0), (1, 2), (3, 1)]:
+        game.set_marker(row, col)
+        assert game.get_hash() not in hashes
+        hashes.append(game.get_hash())
+
+    # Loading the same board gives the same hash
+    loaded = create_game()
+    loaded.load_board_markers(game.get_board_markers().copy(), game.get_present_marker())
+    assert loaded.get_hash() == game.get_hash()
+
+    # Unmaking moves restores the previous hashes
+    while game.unmake_move() is not None:
+        hashes.pop()
+        assert game.get_hash() == hashes[-1]
+    assert game.get_hash() == empty_hash
+
+
+@pytest.mark.parametrize('create_game', [
+    lambda: Game(board_size=3),
+    lambda: KInARowGame(board_size=5, win_length=4),
+])
+def test_symmetric_hash(create_game):
+    game = create_game()
+    game.set_marker(0, 1)
+    game.set_marker(1, 1)
+    game.set_marker(2, 0)
+    board = game.get_board_markers().copy()
+
+    for transformed in [numpy.rot90(board), numpy.rot90(board, 2), numpy.fliplr(board),
+                        numpy.transpose(board)]:
+        other = create_game()
+        other.load_board_markers(transformed, Marker.X)
+        assert other.get_symmetric_hash() == game.get_symmetric_hash()
+        assert other.get_hash() != game.get_hash()